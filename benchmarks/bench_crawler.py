@@ -0,0 +1,78 @@
+# benchmarks/bench_crawler.py
+# 在本机启动一个模拟商品页的 HTTP 服务，测量批量抓取模式的吞吐（页/秒）
+#
+# 用法：python benchmarks/bench_crawler.py --pages 2000 --concurrency 64 --per-host 64
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.crawler import JsonLdCrawler  # noqa: E402
+
+
+def make_page(i, padding_kb=20):
+    product = {
+        "@context": "https://schema.org",
+        "@type": "Product",
+        "name": f"商品 {i}",
+        "sku": f"SKU{i:06d}",
+        "offers": {"@type": "Offer", "price": f"{i % 500}.99", "priceCurrency": "USD"},
+    }
+    body = "<p>" + ("lorem ipsum " * 85 * padding_kb) + "</p>"
+    return (
+        "<html><head><title>p</title>"
+        f'<script type="application/ld+json">{json.dumps(product, ensure_ascii=False)}</script>'
+        "</head><body>" + body + "</body></html>"
+    ).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # 支持 keep-alive
+    page_cache = {}
+
+    def do_GET(self):
+        i = int(self.path.rsplit("/", 1)[-1] or 0)
+        body = self.page_cache.get(i % 100)
+        if body is None:
+            body = self.page_cache[i % 100] = make_page(i % 100)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量抓取吞吐基准")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--per-host", type=int, default=64)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/p/"
+
+    crawler = JsonLdCrawler(concurrency=args.concurrency, per_host=args.per_host)
+    urls = (f"{base}{i}" for i in range(args.pages))
+    start = time.perf_counter()
+    pages = blocks = 0
+    for record in crawler.crawl(urls):
+        pages += 1
+        blocks += len(record["blocks"])
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    print(f"{pages} 页，{blocks} 个块，用时 {elapsed:.2f}s，{pages / elapsed:.0f} 页/秒")
+
+
+if __name__ == "__main__":
+    main()
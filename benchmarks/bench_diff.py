@@ -0,0 +1,70 @@
+# benchmarks/bench_diff.py
+# 对比原 find_json_diff 与结构化差异引擎在大型 ItemList 上的耗时和差异条数
+#
+# 用法：python benchmarks/bench_diff.py --items 20000
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.core import find_json_diff  # noqa: E402
+from engine.diff import apply_patch, diff_json  # noqa: E402
+
+
+def make_item_list(n):
+    return {
+        "@context": "https://schema.org",
+        "@type": "ItemList",
+        "itemListElement": [
+            {"@type": "ListItem", "position": i + 1, "item": {
+                "@type": "Product", "@id": f"https://example.com/p/{i}", "name": f"商品 {i}", "sku": f"SKU{i:06d}",
+                "offers": {"@type": "Offer", "price": f"{i % 500}.99", "priceCurrency": "USD"}}}
+            for i in range(n)
+        ],
+    }
+
+
+def make_offers(n):
+    return {"@context": "https://schema.org", "@type": "Product", "name": "商品",
+            "offers": [{"@type": "Offer", "sku": f"SKU{i:06d}", "price": i % 500} for i in range(n)]}
+
+
+def measure(name, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<16} {elapsed * 1000:10.1f} ms  差异条数 {len(result)}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 差异引擎对比")
+    parser.add_argument("--items", type=int, default=20000)
+    args = parser.parse_args()
+
+    # 场景一：在列表头部插入一个 offer，并修改一个价格
+    doc_a = make_offers(args.items)
+    doc_b = copy.deepcopy(doc_a)
+    doc_b["offers"].insert(0, {"@type": "Offer", "sku": "SKU-NEW", "price": 1})
+    doc_b["offers"][args.items // 2]["price"] = -1
+    print(f"场景一：{args.items} 个 offers，头部插入 1 个并修改 1 个价格")
+    measure("find_json_diff", find_json_diff, doc_a, doc_b)
+    ops = measure("diff_json", diff_json, doc_a, doc_b)
+    assert apply_patch(copy.deepcopy(doc_a), ops) == doc_b
+
+    # 场景二：ItemList 中删除一个元素、修改一个嵌套字段
+    doc_a = make_item_list(args.items)
+    doc_b = copy.deepcopy(doc_a)
+    del doc_b["itemListElement"][10]
+    doc_b["itemListElement"][-1]["item"]["offers"]["price"] = "0.01"
+    print(f"场景二：{args.items} 个 ListItem，删除 1 个并修改 1 个嵌套价格")
+    measure("find_json_diff", find_json_diff, doc_a, doc_b)
+    ops = measure("diff_json", diff_json, doc_a, doc_b)
+    assert apply_patch(copy.deepcopy(doc_a), ops) == doc_b
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_extract.py
+# 对比 BeautifulSoup 全量 DOM 提取与流式字节扫描提取在大页面上的耗时与峰值内存
+#
+# 用法：python benchmarks/bench_extract.py --pages 20 --size-mb 2
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.extract import extract_jsonld_bs4, iter_jsonld  # noqa: E402
+
+
+def make_large_page(seed, size_mb):
+    # 生成接近真实商品页的大页面：head 中两个 JSON-LD 块，body 中大量标签、内联脚本和一个 JSON-LD 块
+    rnd = random.Random(seed)
+    product = {
+        "@context": "https://schema.org",
+        "@type": "Product",
+        "name": f"商品 {seed}",
+        "sku": f"SKU{seed:06d}",
+        "offers": [{"@type": "Offer", "price": rnd.randint(1, 999), "priceCurrency": "USD"} for _ in range(20)],
+    }
+    crumbs = {"@context": "https://schema.org", "@type": "BreadcrumbList", "itemListElement": [
+        {"@type": "ListItem", "position": i + 1, "name": f"分类 {i}"} for i in range(5)]}
+    parts = [
+        "<!DOCTYPE html><html><head><title>商品</title>",
+        '<script src="/app.js"></script>',
+        f'<script type="application/ld+json">{json.dumps(product, ensure_ascii=False)}</script>',
+        f'<script type="application/ld+json">{json.dumps(crumbs, ensure_ascii=False)}</script>',
+        "</head><body>",
+    ]
+    target = size_mb * 1024 * 1024
+    size = sum(len(p) for p in parts)
+    while size < target:
+        block = (f'<div class="item-{rnd.randint(0, 9999)}"><a href="/p/{rnd.randint(0, 99999)}">链接</a>'
+                 f"<span>{'文本内容 ' * rnd.randint(5, 40)}</span></div>")
+        if rnd.random() < 0.01:
+            block += "<script>window.__state = {\"k\": [1, 2, 3]};</script>"
+        parts.append(block)
+        size += len(block)
+    parts.append('<script type="application/ld+json">{"@context": "https://schema.org", "@type": "WebPage"}</script>')
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def chunked(data, size=64 * 1024):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def measure(name, func, pages):
+    tracemalloc.start()
+    start = time.perf_counter()
+    blocks = 0
+    for page in pages:
+        blocks += len(func(page))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<18} {elapsed * 1000 / len(pages):9.2f} ms/页  峰值内存 {peak / 1024 / 1024:8.2f} MB  块数 {blocks}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON-LD 提取方式对比")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--size-mb", type=int, default=2)
+    args = parser.parse_args()
+
+    pages = [make_large_page(i, args.size_mb) for i in range(args.pages)]
+    print(f"{args.pages} 个页面，每页约 {args.size_mb} MB")
+    measure("BeautifulSoup", lambda p: extract_jsonld_bs4(p.decode("utf-8")), pages)
+    measure("流式扫描", lambda p: list(iter_jsonld(chunked(p))), pages)
+    measure("流式扫描(head)", lambda p: list(iter_jsonld(chunked(p), head_only=True)), pages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_incremental.py
+# 比较整体诊断与增量诊断在大 @graph 文档上的耗时：修改单个实体的字段、插入一个实体、修改 @context，
+# 并校验增量结果与 diagnose_jsonld 完全一致
+#
+# 用法：python benchmarks/bench_incremental.py --profile large --edits 10
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import PROFILES, generate_corpus  # noqa: E402
+from engine import diagnose_jsonld  # noqa: E402
+from engine.incremental import IncrementalDiagnoser  # noqa: E402
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="增量诊断耗时对比")
+    parser.add_argument("--profile", default="large", choices=list(PROFILES))
+    parser.add_argument("--type", default="Product", help="模板名")
+    parser.add_argument("--edits", type=int, default=10, help="单字段修改的次数")
+    args = parser.parse_args()
+
+    doc = generate_corpus(args.profile, [args.type])[args.type]
+    # 所有实体引用同一个机构，模拟真实页面中常见的跨实体 @id 引用
+    doc["@graph"].append({"@type": "Organization", "@id": "#org", "name": "示例公司"})
+    for node in doc["@graph"][:-1]:
+        node["publisher"] = {"@id": "#org"}
+    text = json.dumps(doc, ensure_ascii=False, indent=2)
+    print(f"{args.type} / {args.profile}：{len(text.encode('utf-8')) / 1024 / 1024:.2f} MB，{len(doc['@graph'])} 个顶层实体")
+
+    full_time, _ = timed(lambda: diagnose_jsonld(text, schema=True))
+    diagnoser = IncrementalDiagnoser()
+    first_time, _ = timed(lambda: diagnoser.diagnose(text))
+    print(f"  整体诊断            {full_time * 1000:9.1f} ms")
+    print(f"  增量诊断（首次）    {first_time * 1000:9.1f} ms")
+
+    rng = random.Random(0)
+    edit_times = []
+    for i in range(args.edits):
+        pos = text.index('"name": "', rng.randrange(len(text) // 2)) + len('"name": "')
+        text = f"{text[:pos]}修改{i} {text[pos:]}"
+        elapsed, result = timed(lambda: diagnoser.diagnose(text))
+        edit_times.append(elapsed)
+    print(f"  修改单个字段        {statistics.median(edit_times) * 1000:9.1f} ms（中位数，重新校验 {result['incremental']['rechecked']} 个实体）")
+
+    pos = text.index("\n    {", len(text) // 2)
+    text = f'{text[:pos]}\n    {{"@type": "Thing", "name": "新实体"}},{text[pos:]}'
+    elapsed, result = timed(lambda: diagnoser.diagnose(text))
+    print(f"  插入一个实体        {elapsed * 1000:9.1f} ms")
+
+    text = text.replace('"@context": "https://schema.org"', '"@context": "http://schema.org"', 1)
+    elapsed, result = timed(lambda: diagnoser.diagnose(text))
+    print(f"  修改 @context       {elapsed * 1000:9.1f} ms（整体重建：{result['incremental']['full']}）")
+
+    expected = diagnose_jsonld(text, schema=True)
+    same = result["issues"] == expected["issues"] and result["stats"] == expected["stats"] and result["data"] == expected["data"]
+    print(f"  与整体诊断结果{'一致' if same else '不一致!'}")
+
+
+if __name__ == "__main__":
+    main()
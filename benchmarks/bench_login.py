@@ -0,0 +1,74 @@
+# benchmarks/bench_login.py
+# 并发登录压测：不同密码哈希成本下的登录延迟 p50 / p99 和吞吐量（含用户表查询、KDF 校验，以及校验缓存命中的情况）
+#
+# 用法：python benchmarks/bench_login.py --clients 8 --logins 20 --concurrency 4
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.passwords import PasswordHasher  # noqa: E402
+from engine.users import UserStore  # noqa: E402
+
+SETTINGS = [
+    ("scrypt n=2^13", {"scheme": "scrypt", "scrypt_n": 2 ** 13}),
+    ("scrypt n=2^14", {"scheme": "scrypt", "scrypt_n": 2 ** 14}),
+    ("scrypt n=2^15", {"scheme": "scrypt", "scrypt_n": 2 ** 15}),
+    ("pbkdf2 100k", {"scheme": "pbkdf2_sha256", "pbkdf2_iterations": 100000}),
+    ("pbkdf2 600k", {"scheme": "pbkdf2_sha256", "pbkdf2_iterations": 600000}),
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_logins(store, hasher, clients, logins):
+    # 每个客户端线程模拟一个会话，用各自的账号连续登录
+    def client(i):
+        latencies = []
+        for _ in range(logins):
+            start = time.perf_counter()
+            user = store.get(f"user{i}")
+            assert user and hasher.verify("correct horse", user["password"])
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = [x for result in pool.map(client, range(clients)) for x in result]
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并发登录延迟基准")
+    parser.add_argument("--clients", type=int, default=8, help="并发登录的会话数")
+    parser.add_argument("--logins", type=int, default=20, help="每个会话的登录次数")
+    parser.add_argument("--concurrency", type=int, default=4, help="同时进行的 KDF 计算数上限")
+    args = parser.parse_args()
+
+    print(f"{args.clients} 个并发会话 × {args.logins} 次登录，KDF 并发上限 {args.concurrency}，CPU {os.cpu_count()} 核")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, options in SETTINGS:
+            for cached in (False, True):
+                hasher = PasswordHasher(max_concurrent=args.concurrency, cache_size=1024 if cached else 0, **options)
+                store = UserStore(os.path.join(tmp, f"users-{label}-{cached}.db"))
+                for i in range(args.clients):
+                    store.add(f"user{i}", hasher.hash("correct horse"))
+                latencies, elapsed = run_logins(store, hasher, args.clients, args.logins)
+                store.close()
+                mode = "缓存" if cached else "无缓存"
+                print(
+                    f"  {label:<14} {mode:<4} p50 {statistics.median(latencies) * 1000:8.1f} ms  "
+                    f"p99 {percentile(latencies, 99) * 1000:8.1f} ms  {len(latencies) / elapsed:8.1f} 次/秒"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_serialize.py
+# 比较各序列化后端在 1 KB / 100 KB / 10 MB JSON-LD 上紧凑、缩进和分段输出的吞吐量，并校验输出与标准库逐字节一致
+#
+# 用法：python benchmarks/bench_serialize.py --repeat 5
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import serialize  # noqa: E402
+
+
+def make_graph(target_bytes):
+    # 生成约 target_bytes 大小的 @graph 文档
+    node = lambda i: {
+        "@type": "Product", "@id": f"https://example.com/p/{i}", "name": f"商品 {i}", "sku": f"SKU{i:06d}",
+        "description": "适合户外运动的轻量背包，容量 30L。", "image": [f"https://example.com/img/{i}-{j}.jpg" for j in range(2)],
+        "offers": {"@type": "Offer", "price": round(i % 500 + 0.99, 2), "priceCurrency": "CNY", "availability": "https://schema.org/InStock"},
+        "aggregateRating": {"@type": "AggregateRating", "ratingValue": 4.5, "reviewCount": i},
+    }
+    per_node = len(json.dumps(node(0), ensure_ascii=False).encode("utf-8"))
+    return {"@context": "https://schema.org", "@graph": [node(i) for i in range(max(1, target_bytes // per_node))]}
+
+
+def measure(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="序列化后端吞吐量对比")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复次数，取最快一次")
+    args = parser.parse_args()
+
+    sizes = [("1 KB", 1024), ("100 KB", 100 * 1024), ("10 MB", 10 * 1024 * 1024)]
+    print(f"可用后端：{', '.join(serialize.available_backends())}")
+    for label, target in sizes:
+        doc = make_graph(target)
+        expected = {
+            "紧凑": json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            "缩进": json.dumps(doc, ensure_ascii=False, indent=2).encode("utf-8"),
+        }
+        repeat = args.repeat if target < 1024 * 1024 else max(1, args.repeat // 2)
+        print(f"\n{label}（实际 {len(expected['紧凑']) / 1024:.1f} KB）")
+        for backend in serialize.available_backends():
+            serialize.set_backend(backend)
+            for mode, pretty in (("紧凑", False), ("缩进", True)):
+                cases = [
+                    ("dumps", lambda: serialize.dumps_bytes(doc, pretty=pretty)),
+                    ("iter_dumps", lambda: b"".join(serialize.iter_dumps(doc, pretty=pretty))),
+                ]
+                for name, func in cases:
+                    elapsed, output = measure(func, repeat)
+                    status = "一致" if output == expected[mode] else "不一致!"
+                    rate = len(output) / elapsed / 1024 / 1024
+                    print(f"  {backend:<7} {mode} {name:<11} {elapsed * 1000:9.2f} ms  {rate:8.1f} MB/s  {status}")
+
+
+if __name__ == "__main__":
+    main()
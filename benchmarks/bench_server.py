@@ -0,0 +1,95 @@
+# benchmarks/bench_server.py
+# HTTP 服务压测：启动 engine.server（或连接已运行的服务），用多个 keep-alive 连接并发发送小请求，
+# 统计吞吐量与延迟分位数，并与逐个请求提交（--max-batch 1）对比
+#
+# 用法：
+#   python benchmarks/bench_server.py --op validate --connections 32 --requests 20000 --workers 2
+#   python benchmarks/bench_server.py --url http://127.0.0.1:8765 --op generate
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAYLOADS = {
+    "validate": {"text": json.dumps({"@context": "https://schema.org", "@type": "Product", "name": "示例商品",
+                                     "offers": {"@type": "Offer", "price": "19.99", "priceCurrency": "USD"}}, ensure_ascii=False),
+                 "schema": True},
+    "generate": {"type": "Product", "fields": {"name": "示例商品", "brand.name": "示例品牌", "offers.price": "19.99", "offers.priceCurrency": "USD"}},
+    "diff": {"old": {"@type": "Product", "name": "A", "offers": {"price": "1"}}, "new": {"@type": "Product", "name": "B", "offers": {"price": "2"}}},
+    "paths": {"data": {"@type": "Product", "name": "A", "offers": [{"price": "1"}, {"price": "2"}]}},
+}
+
+
+async def client(host, port, path, body, count, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    request = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+               f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+    for _ in range(count):
+        start = time.perf_counter()
+        writer.write(request)
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.lower().split(b"content-length:", 1)[1].split(b"\r\n", 1)[0])
+        await reader.readexactly(length)
+        if not head.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(head.decode("latin-1"))
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def load(host, port, op, connections, requests):
+    body = json.dumps(PAYLOADS[op], ensure_ascii=False).encode("utf-8")
+    latencies = []
+    per_client = requests // connections
+    start = time.perf_counter()
+    await asyncio.gather(*[client(host, port, f"/{op}", body, per_client, latencies) for _ in range(connections)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, latencies
+
+
+def start_server(port, workers, max_batch):
+    proc = subprocess.Popen([sys.executable, "-m", "engine.server", "--port", str(port), "--workers", str(workers),
+                             "--max-batch", str(max_batch)], cwd=ROOT, stderr=subprocess.PIPE)
+    proc.stderr.readline() # 等待启动完成
+    return proc
+
+
+def report(label, rate, latencies):
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"  {label:<22} {rate:9.0f} 请求/秒   p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="engine.server 压测")
+    parser.add_argument("--url", default=None, help="已运行的服务地址；不指定时自动启动")
+    parser.add_argument("--op", default="validate", choices=list(PAYLOADS))
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=2, help="自动启动服务时的计算进程数")
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    print(f"{args.op}：{args.connections} 个连接，{args.requests} 个请求")
+    if args.url:
+        parts = urlsplit(args.url)
+        report("已运行的服务", *asyncio.run(load(parts.hostname, parts.port, args.op, args.connections, args.requests)))
+        return
+    for label, max_batch in (("逐个提交", 1), ("微批处理", 64)):
+        proc = start_server(args.port, args.workers, max_batch)
+        try:
+            report(label, *asyncio.run(load("127.0.0.1", args.port, args.op, args.connections, args.requests)))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_startup.py
+# 应用启动与重跑耗时：冷启动（新进程导入 + 首次运行登录页）、登录后首次打开各页面、以及同一页面上一次交互触发的重跑耗时。
+# 使用 streamlit.testing 在进程内驱动脚本，不需要启动服务器；--script 可指定其他版本的入口脚本做对比
+#
+# 用法：python benchmarks/bench_startup.py --reruns 20
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PAGES = ["首页", "结构化生成器", "管理后台", "JSON-LD 对比", "解析诊断", "外部资源", "高级功能"]
+
+_COLD_START = """
+import os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, os.path.dirname(sys.argv[1])) # streamlit run 会把脚本所在目录加入 sys.path，这里保持一致
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(script, runs, workdir):
+    # 每次在新进程中导入并运行登录页，包含 streamlit 自身的导入开销
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _COLD_START, script], check=True, capture_output=True, text=True, cwd=workdir)
+        timings.append(float(output.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def login(script):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(script, default_timeout=120)
+    at.run()
+    at.text_input(key="username_input").input("Eric")
+    at.text_input(key="password_input").input("1314")
+    at.button[0].click().run()
+    assert at.session_state.authenticated, "登录失败"
+    return at
+
+
+def timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="应用冷启动与页面重跑耗时")
+    parser.add_argument("--script", default=os.path.join(ROOT, "app.py"), help="入口脚本，默认 app.py")
+    parser.add_argument("--cold-runs", type=int, default=3, help="冷启动次数")
+    parser.add_argument("--reruns", type=int, default=20, help="每个页面的重跑次数")
+    args = parser.parse_args()
+    script = os.path.abspath(args.script)
+    sys.path.insert(0, os.path.dirname(script))
+
+    # 用户数据写到临时目录，不影响当前目录下的 users.db
+    with tempfile.TemporaryDirectory() as tmp:
+        timings = cold_start(script, args.cold_runs, tmp)
+        print(f"冷启动（新进程，登录页）：中位数 {statistics.median(timings) * 1000:.0f} ms")
+
+        os.chdir(tmp)
+        at = login(script)
+        print(f"{'页面':<12} {'首次打开':>10} {'重跑中位数':>10} {'重跑 p95':>10}")
+        for page in PAGES:
+            at.sidebar.radio[0].set_value(page)
+            first = timed_run(at)
+            reruns = sorted(timed_run(at) for _ in range(args.reruns))
+            p95 = reruns[min(len(reruns) - 1, int(len(reruns) * 0.95))]
+            print(f"{page:<12} {first * 1000:9.1f}ms {statistics.median(reruns) * 1000:9.1f}ms {p95 * 1000:9.1f}ms")
+        os.chdir(ROOT)
+
+
+if __name__ == "__main__":
+    main()
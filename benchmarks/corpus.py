@@ -0,0 +1,124 @@
+# benchmarks/corpus.py
+# 合成 JSON-LD 语料：以模板库中每种类型的模板为种子，生成大小、嵌套深度、数组宽度可控的 @graph 文档，
+# 同一 seed 下结果完全相同，便于不同版本之间对比基准数据
+#
+# 用法：python benchmarks/corpus.py --type Product --bytes 100000 --width 5 --depth 3 > product.json
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.templates import TemplateRegistry  # noqa: E402
+
+# 档位：目标字节数 / 数组宽度 / 额外嵌套深度
+PROFILES = {
+    "small": {"target_bytes": 2 * 1024, "width": 2, "depth": 2},
+    "medium": {"target_bytes": 200 * 1024, "width": 5, "depth": 4},
+    "large": {"target_bytes": 5 * 1024 * 1024, "width": 10, "depth": 6},
+}
+
+
+def load_seeds():
+    # {模板名: 第一个实体}，去掉 @context，由生成的文档统一提供
+    registry = TemplateRegistry()
+    seeds = {}
+    for name in registry.names():
+        data = registry.get(name)["data"]
+        node = data[0] if isinstance(data, list) else data
+        if isinstance(node, dict):
+            seeds[name] = {k: v for k, v in node.items() if k != "@context"}
+    return seeds
+
+
+def _vary(value, rng, index):
+    # 复制模板值并做确定性的改动，避免所有节点完全相同（影响哈希对齐和缓存）；
+    # @type 等关键字、schema.org 枚举值和数值字符串保持原样
+    if isinstance(value, dict):
+        return {k: v if k.startswith("@") else _vary(v, rng, index) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_vary(v, rng, index) for v in value]
+    if isinstance(value, str):
+        if value.startswith("https://schema.org") or value.replace(".", "", 1).isdigit() or len(value) < 4:
+            return value
+        if value.startswith("http"):
+            return f"{value.rstrip('/')}/{index}"
+        return f"{value} {index}"
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return round(value * (1 + rng.random() / 10), 2)
+    return value
+
+
+def _widen(node, width, rng, index):
+    # 把所有列表扩展（或截断）到 width 个元素
+    if isinstance(node, dict):
+        return {k: _widen(v, width, rng, index) for k, v in node.items()}
+    if isinstance(node, list) and node:
+        return [_widen(_vary(node[i % len(node)], rng, index * width + i), width, rng, index) for i in range(width)]
+    return node
+
+
+def _nest(depth, index):
+    # 额外的嵌套链：hasPart -> hasPart -> ...，模拟深层的组成关系
+    node = None
+    for level in range(depth, 0, -1):
+        part = {"@type": "CreativeWork", "name": f"第 {level} 层 {index}", "position": level}
+        if node is not None:
+            part["hasPart"] = node
+        node = part
+    return node
+
+
+def make_node(seed, rng, index, width, depth):
+    node = _widen(_vary(copy.deepcopy(seed), rng, index), width, rng, index)
+    node_type = node.get("@type", "Thing")
+    node_type = node_type[0] if isinstance(node_type, list) and node_type else node_type
+    node["@id"] = f"https://example.com/{str(node_type).lower()}/{index}#id"
+    if depth > 0:
+        node["hasPart"] = _nest(depth, index)
+    return node
+
+
+def generate_document(seed, target_bytes, width=2, depth=2, seed_value=0):
+    # 生成 {"@context", "@graph": [...]}，节点数按单个节点的序列化大小推算，使文档大小接近 target_bytes
+    rng = random.Random(seed_value)
+    first = make_node(seed, rng, 0, width, depth)
+    per_node = len(json.dumps(first, ensure_ascii=False).encode("utf-8"))
+    count = max(1, target_bytes // per_node)
+    graph = [first] + [make_node(seed, rng, i, width, depth) for i in range(1, count)]
+    return {"@context": "https://schema.org", "@graph": graph}
+
+
+def generate_corpus(profile="small", types=None, seed_value=0):
+    # 返回 {类型名: 文档}
+    settings = PROFILES[profile]
+    seeds = load_seeds()
+    names = types or list(seeds)
+    return {
+        name: generate_document(seeds[name], settings["target_bytes"], settings["width"], settings["depth"], seed_value)
+        for name in names
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成 JSON-LD 语料")
+    parser.add_argument("--type", required=True, help="模板名，如 Product")
+    parser.add_argument("--bytes", type=int, default=100 * 1024, help="目标文档大小")
+    parser.add_argument("--width", type=int, default=3, help="数组宽度")
+    parser.add_argument("--depth", type=int, default=2, help="额外嵌套深度")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    seeds = load_seeds()
+    if args.type not in seeds:
+        parser.error(f"未知模板：{args.type}（可选：{', '.join(seeds)}）")
+    doc = generate_document(seeds[args.type], args.bytes, args.width, args.depth, args.seed)
+    json.dump(doc, sys.stdout, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
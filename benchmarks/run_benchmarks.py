@@ -0,0 +1,171 @@
+# benchmarks/run_benchmarks.py
+# 引擎基准套件：对合成语料（benchmarks/corpus.py）中的每种模板类型，测量解析、序列化、嵌套构建、
+# 字段路径提取、差异对比和诊断的耗时、吞吐量与峰值内存（tracemalloc），结果可保存为 JSON 基线，
+# 之后用 --compare 自动对比并在退化超过阈值时以非零状态退出
+#
+# 用法：
+#   python benchmarks/run_benchmarks.py --profiles small,medium --save baseline.json
+#   python benchmarks/run_benchmarks.py --profiles small,medium --compare baseline.json --threshold 1.25
+import argparse
+import copy
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import PROFILES, generate_corpus  # noqa: E402
+from engine import build_nested_json, diagnose_jsonld, diff_json, flatten_json, get_all_paths  # noqa: E402
+from engine.paths import TreeBuilder  # noqa: E402
+from engine.serialize import dumps, get_backend  # noqa: E402
+
+
+def mutate(doc):
+    # 对比用的修改版：删除一个节点、在头部插入一个节点、修改最后一个节点的名称
+    changed = copy.deepcopy(doc)
+    graph = changed["@graph"]
+    if len(graph) > 2:
+        del graph[len(graph) // 2]
+    graph.insert(0, {"@type": "Thing", "@id": "https://example.com/new#id", "name": "新节点"})
+    graph[-1]["name"] = "已修改"
+    return changed
+
+
+def prepare(doc):
+    # 各操作的输入在计时之外准备好，只测量操作本身
+    text = json.dumps(doc, ensure_ascii=False)
+    flat = flatten_json(doc)
+    paths, values = list(flat), list(flat.values())
+    changed = mutate(doc)
+    return {
+        "parse": (lambda: json.loads(text)),
+        "serialize": (lambda: dumps(doc, pretty=True)),
+        "build": (lambda: build_nested_json(flat)),
+        "tree_build": (lambda: TreeBuilder(paths).build(values)),
+        "paths": (lambda: get_all_paths(doc)),
+        "diff": (lambda: diff_json(doc, changed)),
+        "diagnose": (lambda: diagnose_jsonld(text, schema=True)),
+    }, len(text.encode("utf-8"))
+
+
+def measure(func, min_time, max_runs):
+    # 至少运行 3 次且累计 min_time 秒，取中位数
+    func() # 预热（包括词表加载、路径编译缓存等）
+    timings = []
+    total = 0.0
+    while len(timings) < 3 or (total < min_time and len(timings) < max_runs):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        total += elapsed
+    return statistics.median(timings)
+
+
+def peak_memory(func):
+    # 单次运行期间新增的峰值内存（字节），不含输入本身
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return max(0, peak - base)
+
+
+def run(profiles, types, min_time, max_runs, ops):
+    results = {}
+    for profile in profiles:
+        corpus = generate_corpus(profile, types)
+        for type_name, doc in corpus.items():
+            cases, size = prepare(doc)
+            for op in ops:
+                seconds = measure(cases[op], min_time, max_runs)
+                results[f"{profile}/{type_name}/{op}"] = {
+                    "seconds": seconds,
+                    "mb_per_s": size / seconds / 1024 / 1024 if seconds else 0.0,
+                    "peak_kb": peak_memory(cases[op]) / 1024,
+                    "input_kb": size / 1024,
+                }
+            print(f"  {profile:<7} {type_name:<20} {size / 1024:9.1f} KB  " + "  ".join(
+                f"{op} {results[f'{profile}/{type_name}/{op}']['seconds'] * 1000:.2f}ms" for op in ops
+            ), flush=True)
+    return results
+
+
+def summarize(results, ops):
+    # 按 档位 × 操作 汇总：总耗时、合计吞吐、最大峰值内存
+    print(f"\n{'档位':<8}{'操作':<12}{'总耗时 ms':>12}{'MB/s':>10}{'峰值内存 KB':>14}")
+    profiles = sorted({key.split("/")[0] for key in results}, key=list(PROFILES).index)
+    for profile in profiles:
+        for op in ops:
+            rows = [r for key, r in results.items() if key.startswith(f"{profile}/") and key.endswith(f"/{op}")]
+            seconds = sum(r["seconds"] for r in rows)
+            size_mb = sum(r["input_kb"] for r in rows) / 1024
+            print(f"{profile:<8}{op:<12}{seconds * 1000:12.2f}{size_mb / seconds if seconds else 0:10.1f}{max(r['peak_kb'] for r in rows):14.1f}")
+
+
+def compare(results, baseline, threshold):
+    # 返回退化条目列表：耗时或峰值内存超过基线的 threshold 倍（过小的绝对值忽略，避免噪声）
+    regressions = []
+    for key, current in sorted(results.items()):
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        time_ratio = current["seconds"] / previous["seconds"] if previous["seconds"] else 1.0
+        mem_ratio = current["peak_kb"] / previous["peak_kb"] if previous["peak_kb"] > 16 else 1.0
+        if (time_ratio > threshold and current["seconds"] > 0.0005) or mem_ratio > threshold:
+            regressions.append((key, time_ratio, mem_ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="引擎基准套件")
+    parser.add_argument("--profiles", default="small,medium", help=f"逗号分隔的档位：{', '.join(PROFILES)}")
+    parser.add_argument("--types", default=None, help="逗号分隔的模板名，默认全部")
+    parser.add_argument("--ops", default="parse,serialize,build,tree_build,paths,diff,diagnose", help="逗号分隔的操作")
+    parser.add_argument("--min-time", type=float, default=0.2, help="每项至少累计运行的秒数")
+    parser.add_argument("--max-runs", type=int, default=50, help="每项最多运行次数")
+    parser.add_argument("--save", default=None, help="把结果保存为 JSON 基线")
+    parser.add_argument("--compare", default=None, help="与已有基线对比")
+    parser.add_argument("--threshold", type=float, default=1.25, help="退化判定倍数")
+    args = parser.parse_args()
+
+    profiles = [p for p in args.profiles.split(",") if p]
+    types = args.types.split(",") if args.types else None
+    ops = [op for op in args.ops.split(",") if op]
+    results = run(profiles, types, args.min_time, args.max_runs, ops)
+    summarize(results, ops)
+
+    if args.save:
+        meta = {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "json_backend": get_backend(),
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n基线已保存到 {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.threshold)
+        print(f"\n与基线 {args.compare}（{baseline['meta'].get('created', '?')}）对比，阈值 {args.threshold}x：")
+        if not regressions:
+            print("  未发现退化")
+            return 0
+        for key, time_ratio, mem_ratio in regressions:
+            print(f"  退化 {key:<40} 耗时 {time_ratio:5.2f}x  峰值内存 {mem_ratio:5.2f}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
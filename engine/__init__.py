@@ -0,0 +1,31 @@
+# engine/__init__.py
+# 结构化数据核心引擎：不依赖 Streamlit / pandas，可在批处理任务和服务中直接导入
+from .core import (
+    build_nested_json,
+    find_json_diff,
+    find_common_fields,
+    get_all_paths,
+    flatten_json,
+    diagnose_jsonld,
+    check_jsonld_structure,
+)
+from .diff import diff_json, apply_patch, format_patch, pointer_to_path
+from .paths import compile_path, format_path, iter_paths, TreeBuilder
+
+__all__ = [
+    "build_nested_json",
+    "find_json_diff",
+    "find_common_fields",
+    "get_all_paths",
+    "flatten_json",
+    "diagnose_jsonld",
+    "check_jsonld_structure",
+    "diff_json",
+    "apply_patch",
+    "format_patch",
+    "pointer_to_path",
+    "compile_path",
+    "format_path",
+    "iter_paths",
+    "TreeBuilder",
+]
@@ -0,0 +1,192 @@
+# engine/batch_diagnose.py
+# 批量诊断：对目录或 JSONL 文件中的大量 JSON-LD 文档做语法与结构检查，多进程分块并行
+#
+# 用法示例：
+#   python -m engine.batch_diagnose export.jsonl -o report.jsonl --workers 8
+#   python -m engine.batch_diagnose ./snippets/ -o report.jsonl --all
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .cache import SqliteCache, content_key
+from .core import diagnose_jsonld
+from .serialize import dumps
+
+DEFAULT_CHUNK_SIZE = 2000
+DOCUMENT_SUFFIXES = (".json", ".jsonld")
+
+
+# ----------------- 任务切分 -----------------
+def iter_tasks(path, chunk_size=DEFAULT_CHUNK_SIZE, schema=False, cache_path=None):
+    # 目录：按文件路径分块，由子进程自行读取；JSONL：按行分块，每行一个文档
+    options = {"schema": schema, "cache": cache_path}
+    if os.path.isdir(path):
+        batch = []
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.lower().endswith(DOCUMENT_SUFFIXES):
+                    batch.append(os.path.join(root, name))
+                    if len(batch) >= chunk_size:
+                        yield ("files", batch, options)
+                        batch = []
+        if batch:
+            yield ("files", batch, options)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            batch = []
+            start_line = 1
+            for line_no, line in enumerate(f, 1):
+                if not batch:
+                    start_line = line_no
+                batch.append(line)
+                if len(batch) >= chunk_size:
+                    yield ("lines", (path, start_line, batch), options)
+                    batch = []
+            if batch:
+                yield ("lines", (path, start_line, batch), options)
+
+
+# ----------------- 子进程执行 -----------------
+_worker_caches = {} # 每个子进程按路径打开一次磁盘缓存
+
+
+def diagnose_record(text, schema):
+    # 可直接序列化的诊断结果，批量报告与 HTTP 服务共用；单个文档的异常只记入该文档的结果
+    try:
+        result = diagnose_jsonld(text, schema=schema)
+    except (RecursionError, ValueError) as e:
+        return {"valid": False, "warnings": [], "error": {"message": f"诊断失败: {type(e).__name__}: {e}"}}
+    record = {"valid": result["valid"], "warnings": result["warnings"]}
+    if result["issues"]:
+        record["issues"] = result["issues"]
+    error = result["error"]
+    if error is not None:
+        record["error"] = {"message": error.msg, "line": error.lineno, "column": error.colno, "pos": error.pos}
+    return record
+
+
+def _diagnose_docs(docs, options):
+    # docs: [(文档 id, 文本)]；启用缓存时，内容未变化的文档只需计算一次哈希即可复用上次的诊断结果
+    schema = options["schema"]
+    cache_path = options["cache"]
+    if cache_path is None:
+        return [{"id": doc_id, **diagnose_record(text, schema)} for doc_id, text in docs]
+    cache = _worker_caches.get(cache_path)
+    if cache is None:
+        cache = _worker_caches[cache_path] = SqliteCache(cache_path)
+    keys = [content_key("diagnose", text, schema) for _, text in docs] # 与诊断的文本完全一致，错误的行列号才不会串用
+    cached = cache.get_many(keys)
+    records = []
+    misses = []
+    for (doc_id, text), key in zip(docs, keys):
+        record = cached.get(key)
+        if record is None:
+            record = cached[key] = diagnose_record(text, schema)
+            misses.append((key, record))
+        records.append({"id": doc_id, **record})
+    if misses:
+        cache.set_many(misses)
+    return records
+
+
+def load_chunk(kind, payload):
+    # 读取一个分块的文档，返回 ([(文档 id, 文本)], [(文档 id, 读取错误)])；文档 id 为文件路径或 "文件:行号"
+    docs = []
+    failures = []
+    if kind == "files":
+        for file_path in payload:
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    docs.append((file_path, f.read()))
+            except (OSError, UnicodeDecodeError) as e:
+                failures.append((file_path, e))
+    else:
+        source, start_line, lines = payload
+        for offset, line in enumerate(lines):
+            if line.strip():
+                docs.append((f"{source}:{start_line + offset}", line))
+    return docs, failures
+
+
+def run_chunk(task):
+    # 在子进程中诊断一个分块，返回该块所有文档的结果
+    kind, payload, options = task
+    docs, failures = load_chunk(kind, payload)
+    records = [{"id": doc_id, "valid": False, "warnings": [], "error": {"message": f"读取失败: {e}"}} for doc_id, e in failures]
+    records.extend(_diagnose_docs(docs, options))
+    return records
+
+
+def diagnose_batch(tasks, workers=None):
+    # 保持有限数量的分块在途，按完成顺序产出结果，内存占用与输入规模无关
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = set()
+        for task in tasks:
+            running.add(pool.submit(run_chunk, task))
+            if len(running) >= workers * 2:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+# ----------------- 报告输出 -----------------
+def write_report(records, out, include_all=False):
+    # 逐条写出有问题的文档（include_all 时写出全部），返回汇总统计
+    summary = {"total": 0, "valid": 0, "invalid": 0, "with_warnings": 0, "schema_errors": 0}
+    warning_counts = Counter()
+    for record in records:
+        summary["total"] += 1
+        if record["valid"]:
+            summary["valid"] += 1
+        else:
+            summary["invalid"] += 1
+        if record["warnings"]:
+            summary["with_warnings"] += 1
+            warning_counts.update(record["warnings"])
+        issues = record.get("issues", ())
+        if any(issue["level"] == "error" for issue in issues):
+            summary["schema_errors"] += 1
+        if include_all or not record["valid"] or record["warnings"] or issues:
+            out.write(dumps(record) + "\n")
+    summary["warnings"] = dict(warning_counts)
+    return summary
+
+
+# ----------------- 命令行入口 -----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量诊断 JSON-LD 文档（目录或 JSONL 文件）")
+    parser.add_argument("path", help="包含 .json/.jsonld 文件的目录，或每行一个文档的 JSONL 文件")
+    parser.add_argument("-o", "--output", default="-", help="报告输出（JSONL，最后一行为汇总），默认标准输出")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="每个任务分块包含的文档数")
+    parser.add_argument("--all", action="store_true", help="同时输出没有问题的文档")
+    parser.add_argument("--schema", action="store_true", help="同时按 schema.org 词表校验类型与属性")
+    parser.add_argument("--cache", default=None, help="SQLite 结果缓存文件，重复审计时跳过未变化的文档")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    records = diagnose_batch(iter_tasks(args.path, args.chunk_size, schema=args.schema, cache_path=args.cache), workers=args.workers)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        summary = write_report(records, out, include_all=args.all)
+        summary["elapsed"] = round(time.perf_counter() - start, 3)
+        out.write(dumps({"summary": summary}) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    rate = summary["total"] / summary["elapsed"] if summary["elapsed"] else 0.0
+    print(f"完成：{summary['total']} 个文档，{summary['invalid']} 个语法错误，"
+          f"{summary['with_warnings']} 个含警告（{rate:.0f} 文档/秒）", file=sys.stderr)
+    return 1 if summary["invalid"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+# engine/cache.py
+# 内容寻址的结果缓存：以「引擎版本 + 操作名 + 参数 + 输入字节」的哈希为键，
+# 进程内使用带容量上限的 LRU，批处理任务可叠加 SQLite 磁盘缓存，未变化的输入只需计算一次哈希
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+ENGINE_VERSION = "2" # 解析 / 诊断 / 对比逻辑的输出发生变化时递增，旧缓存自动失效
+
+_MISSING = object()
+
+
+def content_key(op, data, params=None):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{ENGINE_VERSION}\0{op}\0{params!r}\0".encode("utf-8"))
+    h.update(data if isinstance(data, (bytes, bytearray)) else str(data).encode("utf-8"))
+    return h.digest()
+
+
+# ----------------- 进程内 LRU -----------------
+class MemoryCache:
+    def __init__(self, max_items=1024, max_bytes=256 * 1024 * 1024):
+        # max_bytes 按输入大小估算，避免少量超大文档占满内存
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict() # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._items.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, size=1):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._items[key] = (value, size)
+            self._bytes += size
+            while len(self._items) > self.max_items or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def __len__(self):
+        return len(self._items)
+
+
+# ----------------- SQLite 磁盘缓存 -----------------
+class SqliteCache:
+    def __init__(self, path, max_bytes=2 * 1024 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._written = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL") # 允许多个批处理进程并发读写
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key BLOB PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, atime REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_atime ON cache (atime)")
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            self._conn.execute("UPDATE cache SET atime = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return pickle.loads(row[0])
+
+    def get_many(self, keys):
+        # 批量查询：返回 {key: value}，只包含命中的键；一个分块只需一次查询和一次事务
+        found = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                found.update(self._conn.execute(f"SELECT key, value FROM cache WHERE key IN ({placeholders})", batch).fetchall())
+            if found:
+                self._conn.execute("BEGIN")
+                self._conn.executemany("UPDATE cache SET atime = ? WHERE key = ?", [(now, key) for key in found])
+                self._conn.execute("COMMIT")
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return {key: pickle.loads(blob) for key, blob in found.items()}
+
+    def set(self, key, value, size=None):
+        self.set_many([(key, value)])
+
+    def set_many(self, items):
+        now = time.time()
+        rows = [(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now) for key, value in items]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, size, atime) VALUES (?, ?, ?, ?)",
+                [(key, blob, len(blob), atime) for key, blob, atime in rows],
+            )
+            self._conn.execute("COMMIT")
+            self._written += sum(len(blob) for _, blob, _ in rows)
+            # 每写入约 1% 容量检查一次总大小，超出时按最久未访问淘汰
+            if self._written > self.max_bytes // 100:
+                self._written = 0
+                self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = total - int(self.max_bytes * 0.9)
+        removed = 0
+        keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY atime"):
+            keys.append((key,))
+            removed += size
+            if removed >= target:
+                break
+        self._conn.executemany("DELETE FROM cache WHERE key = ?", keys)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ----------------- 组合缓存 -----------------
+class ResultCache:
+    def __init__(self, memory=None, disk=None):
+        # 内存缓存在前、磁盘缓存在后，磁盘命中的结果会回填到内存
+        self.memory = memory if memory is not None else MemoryCache()
+        self.disk = disk
+
+    def get_or_compute(self, op, data, compute, params=None):
+        key = content_key(op, data, params)
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            if self.disk is not None:
+                self.disk.set(key, value)
+        self.memory.set(key, value, size=len(data))
+        return value
@@ -0,0 +1,351 @@
+# engine/cluster.py
+# 模板簇与近似重复检测：找出全站共用的样板 JSON-LD 块（如每页相同的 Organization），
+# 以及只有少数字段不同的近似副本页面。
+#   1. 规范化哈希（与快照对比的 content_hash 相同，与键顺序、缩进无关）先合并完全相同的文档；
+#   2. 每组取一个文档，对其叶子字段的「路径=值」集合（列表下标归一化为 []）计算 MinHash 签名
+#      （每个字段只做一次 blake2b 哈希，各排列用乘法移位哈希从中派生）；
+#   3. LSH 分段：签名切成若干段，任一段相同的文档成为候选，与这些桶中的所有候选组比较签名相似度
+#      （每个桶最多保留 MAX_BUCKET_CANDIDATES 个组），达到阈值即用并查集合并，整体耗时与文档数成线性关系。
+# 每个簇以其中最大的完全相同组的第一个文档为代表，对比页可以只把页面与其代表文档做差异对比
+#
+# 用法示例：
+#   python -m engine.cluster crawl.jsonl -o clusters.jsonl --workers 8
+#   python -m engine.cluster ./snippets/ -o clusters.jsonl --threshold 0.9 --min-pages 10
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError: # 可选依赖，没有时用纯 Python 计算，签名完全相同
+    np = None
+
+from .batch_diagnose import DEFAULT_CHUNK_SIZE, iter_tasks, load_chunk
+from .graph import iter_entities, type_names
+from .paths import format_pattern, iter_paths
+from .serialize import dumps
+from .snapshot_diff import content_hash
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_THRESHOLD = 0.8
+MAX_BUCKET_CANDIDATES = 128 # 每个 LSH 桶保留的候选组数上限，限制大模板簇中每个新文档的比较次数
+_MASK = (1 << 64) - 1
+_NP_BLOCK = 4096 # numpy 路径每次处理的特征数，限制 特征数 × 签名长度 的中间矩阵大小
+
+
+# ----------------- 特征与签名 -----------------
+def document_of(record, default_id):
+    # 爬虫输出的 {"url", "blocks"} 记录以 url 为文档 id、blocks 为内容；其他 JSON 原样作为文档
+    if isinstance(record, dict) and isinstance(record.get("url"), str) and isinstance(record.get("blocks"), list):
+        return record["url"], record["blocks"]
+    return default_id, record
+
+
+def features(data):
+    # 叶子字段的 "路径=值" 集合；@context 的写法差异不影响相似度
+    result = set()
+    for segments, value in iter_paths(data, leaves_only=True):
+        if "@context" in segments:
+            continue
+        path = format_pattern(segments)
+        result.add(f"{path}={value}" if isinstance(value, str) else f"{path}={dumps(value)}")
+    return result
+
+
+@lru_cache(maxsize=8)
+def _permutations(num_perm):
+    # 固定种子的乘法移位哈希参数 (奇数 a, b)，各进程、各次运行的签名可以直接比较
+    rng = random.Random(num_perm)
+    params = tuple((rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(num_perm))
+    if np is None:
+        return params, None
+    return params, (np.array([a for a, _ in params], dtype=np.uint64), np.array([b for _, b in params], dtype=np.uint64))
+
+
+def minhash(feature_set, num_perm=DEFAULT_NUM_PERM):
+    # 每个排列取 ((a * h + b) mod 2^64) 的高 32 位的最小值；两个签名相同位置的比例即为 Jaccard 相似度的估计。
+    # 没有特征时返回 None
+    if not feature_set:
+        return None
+    hashes = [int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little") for feature in feature_set]
+    params, vectors = _permutations(num_perm)
+    if vectors is None:
+        return array("I", [min(((a * h + b) & _MASK) >> 32 for h in hashes) for a, b in params])
+    # uint64 乘加按 2^64 取模回绕，与纯 Python 的结果逐位一致
+    a, b = vectors
+    values = np.array(hashes, dtype=np.uint64)
+    mins = None
+    for start in range(0, len(values), _NP_BLOCK):
+        block = (np.multiply.outer(values[start:start + _NP_BLOCK], a) + b) >> np.uint64(32)
+        block = block.min(axis=0)
+        mins = block if mins is None else np.minimum(mins, block)
+    return array("I", mins.astype(np.uint32).tobytes())
+
+
+def similarity(sig1, sig2):
+    return sum(a == b for a, b in zip(sig1, sig2)) / len(sig1)
+
+
+def fingerprint(data, num_perm=DEFAULT_NUM_PERM):
+    # (规范化哈希, MinHash 签名, [(顶层实体哈希, 类型)])，可在子进程中计算后传回
+    blocks = []
+    seen = set()
+    for entity in iter_entities(data):
+        digest = content_hash(entity)
+        if digest not in seen:
+            seen.add(digest)
+            blocks.append((digest, ",".join(type_names(entity["@type"]))))
+    return content_hash(data), minhash(features(data), num_perm), blocks
+
+
+# ----------------- 聚类 -----------------
+class ClusterIndex:
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS, threshold=DEFAULT_THRESHOLD):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.documents = 0
+        self.failed = 0
+        self._rows = num_perm // bands
+        self._groups = {}     # 规范化哈希 -> 组号（完全相同的文档为一组）
+        self._members = []    # 组号 -> [文档 id]
+        self._signatures = [] # 组号 -> MinHash 签名
+        self._matrix = None   # 安装了 numpy 时：签名矩阵（行号为组号），一次比较所有候选
+        self._parent = []     # 并查集：组号 -> 父组号
+        self._buckets = {}    # (段号, 段内容) -> 落入该桶的组号列表（最多 MAX_BUCKET_CANDIDATES 个）
+        self._doc_group = {}  # 文档 id -> 组号
+        self._blocks = {}     # 顶层实体哈希 -> [类型, 页面数, 示例文档 id]
+        self._clusters = None # clusters() 的缓存，加入新文档后失效
+        self._doc_cluster = {}
+
+    def add(self, doc_id, data):
+        self.add_fingerprint(doc_id, fingerprint(data, self.num_perm))
+
+    def add_fingerprint(self, doc_id, fp):
+        digest, signature, blocks = fp
+        self.documents += 1
+        self._clusters = None
+        for block_hash, type_name in blocks:
+            entry = self._blocks.get(block_hash)
+            if entry is None:
+                self._blocks[block_hash] = [type_name, 1, doc_id]
+            else:
+                entry[1] += 1
+
+        group = self._groups.get(digest)
+        if group is not None:
+            self._members[group].append(doc_id)
+            self._doc_group[doc_id] = group
+            return
+        group = self._groups[digest] = len(self._members)
+        self._members.append([doc_id])
+        self._signatures.append(signature)
+        self._parent.append(group)
+        self._doc_group[doc_id] = group
+        if signature is None:
+            return
+        # 与各桶中的所有候选组比较（桶内候选数有上限，总比较次数与文档数成线性关系）
+        raw = signature.tobytes()
+        width = self._rows * signature.itemsize
+        candidates = set()
+        for band in range(self.bands):
+            key = (band, raw[band * width:(band + 1) * width])
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._buckets[key] = [group]
+                continue
+            candidates.update(bucket)
+            if len(bucket) < MAX_BUCKET_CANDIDATES:
+                bucket.append(group)
+        if np is not None:
+            self._store_row(group, signature)
+        for candidate in self._similar(signature, candidates):
+            self._union(candidate, group)
+
+    def _store_row(self, group, signature):
+        matrix = self._matrix
+        if matrix is None or group >= len(matrix):
+            grown = np.zeros((max(1024, 2 * group), self.num_perm), dtype=np.uint32)
+            if matrix is not None:
+                grown[:len(matrix)] = matrix
+            matrix = self._matrix = grown
+        matrix[group] = np.frombuffer(signature, dtype=np.uint32)
+
+    def _similar(self, signature, candidates):
+        # 相似度达到阈值的候选组号；numpy 路径与逐个调用 similarity() 的结果相同
+        if not candidates:
+            return []
+        if np is None:
+            return [c for c in candidates if similarity(signature, self._signatures[c]) >= self.threshold]
+        ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        matches = (self._matrix[ids] == np.frombuffer(signature, dtype=np.uint32)).sum(axis=1)
+        return ids[matches / self.num_perm >= self.threshold].tolist()
+
+    def _find(self, group):
+        parent = self._parent
+        while parent[group] != group:
+            parent[group] = parent[parent[group]]
+            group = parent[group]
+        return group
+
+    def _union(self, a, b):
+        a, b = self._find(a), self._find(b)
+        if a != b:
+            self._parent[max(a, b)] = min(a, b)
+
+    # ----------------- 查询 -----------------
+    def clusters(self, min_size=1):
+        # [{"id", "size", "representative", "exact_groups", "members"}]，按大小从大到小；
+        # 代表文档为簇中最大的完全相同组的第一个文档，members 按组从大到小排列
+        if self._clusters is None:
+            by_root = {}
+            for group in range(len(self._members)):
+                by_root.setdefault(self._find(group), []).append(group)
+            clusters = []
+            for groups in by_root.values():
+                groups.sort(key=lambda g: (-len(self._members[g]), g))
+                members = [doc_id for g in groups for doc_id in self._members[g]]
+                clusters.append({"representative": members[0], "size": len(members), "exact_groups": len(groups), "members": members})
+            clusters.sort(key=lambda c: -c["size"])
+            for i, cluster in enumerate(clusters):
+                cluster["id"] = i
+            self._clusters = clusters
+            self._doc_cluster = {doc_id: cluster for cluster in clusters for doc_id in cluster["members"]}
+        return [c for c in self._clusters if c["size"] >= min_size]
+
+    def cluster_of(self, doc_id):
+        self.clusters()
+        return self._doc_cluster.get(doc_id)
+
+    def representative(self, doc_id):
+        cluster = self.cluster_of(doc_id)
+        return cluster["representative"] if cluster else None
+
+    def is_exact_duplicate(self, doc_a, doc_b):
+        group = self._doc_group.get(doc_a)
+        return group is not None and group == self._doc_group.get(doc_b)
+
+    def estimate_similarity(self, doc_a, doc_b):
+        # 两个文档的 Jaccard 相似度估计；完全相同为 1.0
+        if self.is_exact_duplicate(doc_a, doc_b):
+            return 1.0
+        sig_a = self._signatures[self._doc_group[doc_a]]
+        sig_b = self._signatures[self._doc_group[doc_b]]
+        return similarity(sig_a, sig_b) if sig_a is not None and sig_b is not None else 0.0
+
+    def shared_blocks(self, min_pages=2):
+        # 在至少 min_pages 个文档中原样出现的顶层实体：[{"hash", "type", "pages", "sample"}]，按页面数从多到少
+        blocks = [{"hash": digest.hex(), "type": type_name, "pages": pages, "sample": sample}
+                  for digest, (type_name, pages, sample) in self._blocks.items() if pages >= min_pages]
+        blocks.sort(key=lambda b: -b["pages"])
+        return blocks
+
+    def summary(self):
+        clusters = self.clusters()
+        return {
+            "documents": self.documents,
+            "failed": self.failed,
+            "exact_groups": len(self._members),
+            "clusters": len(clusters),
+            "near_duplicate_clusters": sum(1 for c in clusters if c["exact_groups"] > 1),
+            "duplicated_documents": sum(c["size"] for c in clusters if c["size"] > 1),
+        }
+
+
+# ----------------- 并行计算 -----------------
+def run_chunk(task):
+    # 在子进程中计算一个分块的指纹，返回 ([(文档 id, 指纹)], 失败数)
+    kind, payload, options = task
+    docs, failures = load_chunk(kind, payload)
+    fingerprints = []
+    failed = len(failures)
+    for default_id, text in docs:
+        # 解析或计算指纹失败（包括嵌套过深）时只记为一个失败的文档
+        try:
+            doc_id, data = document_of(json.loads(text), default_id)
+            fingerprints.append((doc_id, fingerprint(data, options["num_perm"])))
+        except (RecursionError, ValueError):
+            failed += 1
+    return fingerprints, failed
+
+
+def cluster_batch(tasks, index, workers=None):
+    # map：各进程计算指纹；reduce：主进程按输入顺序加入索引，结果与进程数无关
+    workers = workers or os.cpu_count() or 1
+
+    def collect(result):
+        fingerprints, failed = result
+        index.failed += failed
+        index.documents += failed
+        for doc_id, fp in fingerprints:
+            index.add_fingerprint(doc_id, fp)
+
+    if workers == 1:
+        for task in tasks:
+            collect(run_chunk(task))
+        return index
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = deque()
+        for task in tasks:
+            running.append(pool.submit(run_chunk, task))
+            if len(running) >= workers * 2:
+                collect(running.popleft().result())
+        while running:
+            collect(running.popleft().result())
+    return index
+
+
+def _cluster_tasks(path, chunk_size, num_perm):
+    for kind, payload, _ in iter_tasks(path, chunk_size):
+        yield kind, payload, {"num_perm": num_perm}
+
+
+# ----------------- 命令行入口 -----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检测 JSON-LD 语料中的样板块、完全相同与近似重复的页面")
+    parser.add_argument("path", help="包含 .json/.jsonld 文件的目录，或每行一个文档的 JSONL 文件（可为爬虫输出）")
+    parser.add_argument("-o", "--output", default="-", help="报告输出（JSONL：簇、共用块，最后一行为汇总），默认标准输出")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="近似重复的相似度阈值（0~1）")
+    parser.add_argument("--num-perm", type=int, default=DEFAULT_NUM_PERM, help="MinHash 签名长度")
+    parser.add_argument("--bands", type=int, default=DEFAULT_BANDS, help="LSH 分段数，须整除签名长度")
+    parser.add_argument("--min-size", type=int, default=2, help="只输出至少包含这么多文档的簇")
+    parser.add_argument("--min-pages", type=int, default=2, help="只输出至少在这么多文档中出现的共用块")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="每个任务分块包含的文档数")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = ClusterIndex(args.num_perm, args.bands, args.threshold)
+    cluster_batch(_cluster_tasks(args.path, args.chunk_size, args.num_perm), index, workers=args.workers)
+    summary = index.summary()
+    summary["elapsed"] = round(time.perf_counter() - start, 3)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for cluster in index.clusters(args.min_size):
+            out.write(dumps({"cluster": cluster["id"], **{k: v for k, v in cluster.items() if k != "id"}}) + "\n")
+        for block in index.shared_blocks(args.min_pages):
+            out.write(dumps({"shared_block": block.pop("hash"), **block}) + "\n")
+        out.write(dumps({"summary": summary}) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    rate = summary["documents"] / summary["elapsed"] if summary["elapsed"] else 0.0
+    print(f"完成：{summary['documents']} 个文档，{summary['exact_groups']} 组内容不同，{summary['clusters']} 个簇，"
+          f"其中 {summary['near_duplicate_clusters']} 个含近似副本（{rate:.0f} 文档/秒）", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+# engine/core.py
+# 从 app.py 中抽出的纯函数：生成 / 对比 / 字段提取 / 诊断，均不调用任何 UI 接口
+import json
+
+from .paths import compile_path, format_path, iter_paths
+
+
+# ----------------- 嵌套 JSON 构建 -----------------
+def build_nested_json(flat_dict, warn=None):
+    # warn: 可选的告警回调（如 st.warning），为 None 时静默处理
+    # 路径经 compile_path 编译并缓存为 (键, 下标, ...) 元组，重复调用不再做正则切分
+    nested = {}
+    for k, v in flat_dict.items():
+        parts = compile_path(k)
+        last = len(parts) - 1
+
+        current = nested
+        for i, part in enumerate(parts):
+            if isinstance(part, int):
+                if not isinstance(current, list):
+                    # 如果路径中间不是列表，但遇到了索引，创建列表
+                    if warn:
+                        warn(f"Warning: Path '{k}' expects a list at '{format_path(parts[:i])}', but found a dict. Attempting to convert.")
+                    # 尝试修复，但这种自动转换在复杂场景可能不够健壮
+                    if i > 0 and isinstance(current, dict) and parts[i-1] in current:
+                        current[parts[i-1]] = [] # 将父级的键设为列表
+                        current = current[parts[i-1]]
+                    else:
+                        raise ValueError(f"Expected list at {format_path(parts[:i])}, got {type(current)}")
+
+                while len(current) <= part:
+                    current.append({})
+
+                if i == last:
+                    current[part] = v
+                else:
+                    # 如果下一个是字典键，确保当前元素是字典
+                    if not isinstance(parts[i+1], int) and not isinstance(current[part], dict):
+                        current[part] = {}
+                    current = current[part]
+            else: # 是字典键
+                if not isinstance(current, dict):
+                    # 如果路径中间不是字典，但遇到了键，创建字典
+                    if warn:
+                        warn(f"Warning: Path '{k}' expects a dict at '{format_path(parts[:i])}', but found a list. Attempting to convert.")
+                    if i > 0 and isinstance(current, list) and len(current) > 0 and isinstance(current[-1], dict):
+                        current = current[-1] # 尝试使用列表的最后一个字典
+                    else:
+                        raise ValueError(f"Expected dict at {format_path(parts[:i])}, got {type(current)}")
+
+                if i == last:
+                    current[part] = v
+                elif isinstance(parts[i+1], int): # 如果下一个是数组索引
+                    current = current.setdefault(part, [])
+                else:
+                    current = current.setdefault(part, {})
+    return nested
+
+
+# ----------------- JSON 差异对比 -----------------
+def find_json_diff(dict1, dict2, path=""):
+    diffs = []
+    # 检查键在 dict1 但不在 dict2
+    for k in set(dict1.keys()) - set(dict2.keys()):
+        diffs.append(f"仅在片段 A 中存在: `{path}{k}` = `{dict1[k]}`")
+    # 检查键在 dict2 但不在 dict1
+    for k in set(dict2.keys()) - set(dict1.keys()):
+        diffs.append(f"仅在片段 B 中存在: `{path}{k}` = `{dict2[k]}`")
+
+    # 检查共同键的值
+    for k in set(dict1.keys()) & set(dict2.keys()):
+        new_path = f"{path}{k}." if path else f"{k}."
+        v1 = dict1[k]
+        v2 = dict2[k]
+
+        if isinstance(v1, dict) and isinstance(v2, dict):
+            diffs.extend(find_json_diff(v1, v2, new_path))
+        elif isinstance(v1, list) and isinstance(v2, list):
+            if len(v1) != len(v2):
+                diffs.append(f"列表长度不同: `{path}{k}` (A: {len(v1)}, B: {len(v2)})")
+            for i in range(min(len(v1), len(v2))):
+                if isinstance(v1[i], dict) and isinstance(v2[i], dict):
+                    diffs.extend(find_json_diff(v1[i], v2[i], f"{new_path}[{i}]."))
+                elif v1[i] != v2[i]:
+                    diffs.append(f"列表元素不同: `{path}{k}[{i}]` (A: `{v1[i]}`, B: `{v2[i]}`)")
+            if len(v1) > len(v2):
+                for i in range(len(v2), len(v1)):
+                    diffs.append(f"仅在片段 A 中存在列表元素: `{path}{k}[{i}]` = `{v1[i]}`")
+            elif len(v2) > len(v1):
+                for i in range(len(v1), len(v2)):
+                    diffs.append(f"仅在片段 B 中存在列表元素: `{path}{k}[{i}]` = `{v2[i]}`")
+        elif v1 != v2:
+            diffs.append(f"值不同: `{path}{k}` (A: `{v1}`, B: `{v2}`)")
+    return diffs
+
+
+# ----------------- 共同字段 -----------------
+def find_common_fields(dict1, dict2, path=""):
+    # 非递归先序遍历，输出顺序与原递归实现一致；栈中的字符串是待输出的路径，元组是待展开的一对对象
+    common_fields = []
+    stack = [(dict1, dict2, path)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            common_fields.append(item)
+            continue
+        d1, d2, prefix = item
+        pending = []
+        for k in set(d1.keys()) & set(d2.keys()):
+            new_path = f"{prefix}{k}"
+            pending.append(new_path)
+            v1 = d1[k]
+            v2 = d2[k]
+            if isinstance(v1, dict) and isinstance(v2, dict):
+                pending.append((v1, v2, f"{new_path}."))
+            elif isinstance(v1, list) and isinstance(v2, list):
+                for i in range(min(len(v1), len(v2))):
+                    if isinstance(v1[i], dict) and isinstance(v2[i], dict):
+                        pending.append((v1[i], v2[i], f"{new_path}[{i}]."))
+        stack.extend(reversed(pending))
+    return common_fields
+
+
+# ----------------- 字段路径提取 -----------------
+def get_all_paths(data, current_path=""):
+    # 与 build_nested_json 共用片段元组表示，非递归遍历，深层嵌套也不会触发递归上限
+    return [format_path(segments, current_path) for segments, _ in iter_paths(data)]
+
+
+def flatten_json(data, current_path=""):
+    # get_all_paths 的取值版本：返回 {叶子路径: 值}，路径写法与 build_nested_json 的输入一致
+    return {format_path(segments, current_path): value for segments, value in iter_paths(data, leaves_only=True)}
+
+
+# ----------------- 解析诊断 -----------------
+def check_jsonld_structure(parsed_json):
+    # 对已解析的数据做基本的 JSON-LD 结构检查，返回警告文本列表
+    warnings = []
+    if not isinstance(parsed_json, dict):
+        warnings.append("警告：JSON-LD 通常应为一个 JSON 对象 (即以 `{}` 包裹)。")
+        if not isinstance(parsed_json, list):
+            return warnings # 标量值无法继续做字段检查
+    if "@context" not in parsed_json:
+        warnings.append("警告：建议 JSON-LD 中包含 `@context` 字段，通常设置为 'https://schema.org'。")
+    if "@type" not in parsed_json:
+        warnings.append("警告：建议 JSON-LD 中包含 `@type` 字段，以指定 Schema 类型。")
+    return warnings
+
+
+def diagnose_jsonld(text, schema=False):
+    # 返回 {"valid", "data", "warnings", "error"}；语法错误时 error 为 JSONDecodeError
+    # schema=True 时额外按 schema.org 词表校验，结果放在 "issues" 中，文档的节点索引（GraphIndex）放在 "graph" 中，
+    # 节点统计（GraphIndex.summary()）放在 "stats" 中
+    try:
+        parsed_json = json.loads(text)
+    except json.JSONDecodeError as e:
+        return {"valid": False, "data": None, "warnings": [], "error": e, "issues": []}
+    except RecursionError: # 嵌套过深，按语法错误处理，调用方仍可读取 msg / lineno / colno / pos
+        error = json.JSONDecodeError("Document is nested too deeply", text, 0)
+        return {"valid": False, "data": None, "warnings": [], "error": error, "issues": []}
+    result = {"valid": True, "data": parsed_json, "warnings": check_jsonld_structure(parsed_json), "error": None, "issues": []}
+    if schema:
+        from .graph import GraphIndex
+        from .schema_validator import validate_jsonld # 按需加载词表，保持核心模块导入轻量
+        result["graph"] = GraphIndex(parsed_json)
+        result["issues"] = validate_jsonld(parsed_json, graph=result["graph"])
+        result["stats"] = result["graph"].summary()
+    return result
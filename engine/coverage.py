@@ -0,0 +1,208 @@
+# engine/coverage.py
+# 语料字段覆盖率：统计每种 @type 的实体中各字段路径出现在多少个文档里。数组下标统一记为 "[]"（offers[3].price -> offers[].price），
+# 同一文档内重复出现只计一次。多进程分块统计，各进程返回 Counter 部分结果后合并；统计结果可保存为 JSON，有新文档时在原结果上累加
+#
+# 用法示例：
+#   python -m engine.coverage crawl.jsonl --state coverage.json --workers 8
+#   python -m engine.coverage ./snippets/ --state coverage.json --csv coverage.csv --type Product
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .batch_diagnose import DEFAULT_CHUNK_SIZE, iter_tasks, load_chunk
+from .graph import iter_entities, type_names
+from .paths import format_pattern, iter_paths
+
+STATE_VERSION = 1
+
+
+# ----------------- 字段路径 -----------------
+def field_paths(entity):
+    # 实体的字段路径集合（与 get_all_paths 相同的遍历，下标归一化为 "[]"）；
+    # @ 开头的关键字（@type、@id、@context 等）及其下的内容不算字段
+    return {format_pattern(segments) for segments, _ in iter_paths(entity, skip_keywords=True)}
+
+
+# ----------------- 统计结果 -----------------
+class FieldCoverage:
+    def __init__(self):
+        self.documents = 0          # 统计过的文档数（含解析失败的）
+        self.failed = 0             # 解析失败的文档数
+        self.types = Counter()      # 类型 -> 含该类型实体的文档数
+        self.fields = Counter()     # (类型, 字段路径) -> 含该字段的文档数
+
+    def add(self, data):
+        # 统计一个已解析的文档
+        self._count(self._collect(data))
+
+    def _collect(self, data):
+        # 类型 -> 文档中该类型实体的字段路径集合
+        seen = {}
+        for entity in iter_entities(data):
+            paths = field_paths(entity)
+            for type_name in type_names(entity["@type"]):
+                if type_name in seen:
+                    seen[type_name] |= paths
+                else:
+                    seen[type_name] = set(paths)
+        return seen
+
+    def _count(self, seen):
+        self.documents += 1
+        for type_name, paths in seen.items():
+            self.types[type_name] += 1
+            self.fields.update((type_name, path) for path in paths)
+
+    def add_text(self, text):
+        # 解析或统计失败（包括嵌套过深）时只记为一个失败的文档
+        try:
+            data = json.loads(text)
+            paths = self._collect(data)
+        except (RecursionError, ValueError):
+            self.documents += 1
+            self.failed += 1
+            return False
+        self._count(paths)
+        return True
+
+    def merge(self, other):
+        # 归并其他进程或之前保存的部分结果
+        self.documents += other.documents
+        self.failed += other.failed
+        self.types.update(other.types)
+        self.fields.update(other.fields)
+        return self
+
+    # ----------------- 查询 -----------------
+    def rows(self, type_name=None, min_coverage=0.0):
+        # [{"type", "path", "documents", "coverage"}]，按类型、覆盖率从高到低排序；coverage 为该类型文档中的占比
+        rows = []
+        for (row_type, path), count in self.fields.items():
+            if type_name is not None and row_type != type_name:
+                continue
+            coverage = count / self.types[row_type]
+            if coverage >= min_coverage:
+                rows.append({"type": row_type, "path": path, "documents": count, "coverage": coverage})
+        rows.sort(key=lambda r: (r["type"], -r["documents"], r["path"]))
+        return rows
+
+    # ----------------- 保存 / 加载 -----------------
+    def to_dict(self):
+        fields = {}
+        for (type_name, path), count in self.fields.items():
+            fields.setdefault(type_name, {})[path] = count
+        return {"version": STATE_VERSION, "documents": self.documents, "failed": self.failed, "types": dict(self.types), "fields": fields}
+
+    @classmethod
+    def from_dict(cls, state):
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported coverage state version: {state.get('version')!r}")
+        coverage = cls()
+        coverage.documents = state["documents"]
+        coverage.failed = state["failed"]
+        coverage.types = Counter(state["types"])
+        coverage.fields = Counter({(type_name, path): count for type_name, paths in state["fields"].items() for path, count in paths.items()})
+        return coverage
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path) # 原子替换，中断时不会留下写了一半的统计文件
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @staticmethod
+    def is_state(data):
+        # 是否为 to_dict() 保存的统计结果（而不是 JSON-LD 文档）
+        return isinstance(data, dict) and data.get("version") == STATE_VERSION and isinstance(data.get("fields"), dict) and "types" in data
+
+
+# ----------------- 并行统计 -----------------
+def run_chunk(task):
+    # 在子进程中统计一个分块，只把 Counter 部分结果传回主进程
+    kind, payload, _ = task
+    docs, failures = load_chunk(kind, payload)
+    coverage = FieldCoverage()
+    coverage.documents += len(failures)
+    coverage.failed += len(failures)
+    for _, text in docs:
+        coverage.add_text(text)
+    return coverage
+
+
+def coverage_batch(tasks, workers=None, coverage=None):
+    # map：各进程统计分块；reduce：按完成顺序归并到 coverage（传入已有结果即为增量更新）
+    coverage = coverage if coverage is not None else FieldCoverage()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            coverage.merge(run_chunk(task))
+        return coverage
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = set()
+        for task in tasks:
+            running.add(pool.submit(run_chunk, task))
+            if len(running) >= workers * 2:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    coverage.merge(future.result())
+        for future in running:
+            coverage.merge(future.result())
+    return coverage
+
+
+# ----------------- 命令行入口 -----------------
+def write_csv(rows, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["type", "path", "documents", "coverage"])
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, "coverage": round(row["coverage"], 4)})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="统计语料中各类型的字段覆盖率（目录或 JSONL 文件）")
+    parser.add_argument("paths", nargs="+", help="包含 .json/.jsonld 文件的目录，或每行一个文档的 JSONL 文件（可为爬虫输出）")
+    parser.add_argument("--state", default=None, help="统计结果文件：存在时在其基础上累加新文档，完成后写回")
+    parser.add_argument("--csv", default=None, help="导出覆盖率明细 CSV")
+    parser.add_argument("--type", default=None, help="只显示指定类型")
+    parser.add_argument("--top", type=int, default=20, help="每种类型显示的字段数")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="每个任务分块包含的文档数")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    coverage = FieldCoverage.load(args.state) if args.state and os.path.exists(args.state) else FieldCoverage()
+    before = coverage.documents
+    for path in args.paths:
+        coverage = coverage_batch(iter_tasks(path, args.chunk_size), workers=args.workers, coverage=coverage)
+    elapsed = time.perf_counter() - start
+    if args.state:
+        coverage.save(args.state)
+    rows = coverage.rows(args.type)
+    if args.csv:
+        write_csv(rows, args.csv)
+
+    for type_name, total in sorted(coverage.types.items(), key=lambda item: -item[1]):
+        if args.type is not None and type_name != args.type:
+            continue
+        print(f"{type_name}（{total} 个文档）")
+        for row in [r for r in rows if r["type"] == type_name][:args.top]:
+            print(f"  {row['coverage'] * 100:6.1f}%  {row['documents']:>9}  {row['path']}")
+    added = coverage.documents - before
+    rate = added / elapsed if elapsed else 0.0
+    print(f"完成：本次 {added} 个文档（{rate:.0f} 文档/秒），累计 {coverage.documents} 个，解析失败 {coverage.failed} 个", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# engine/diff.py
+# 结构化差异引擎：输出 RFC 6902 风格的补丁操作，列表按 @id / sku / name 对齐（ListItem 取其 item 的标识），否则按内容哈希做序列对齐
+from difflib import SequenceMatcher
+
+from .serialize import dumps_bytes
+
+LIST_ALIGN_KEYS = ("@id", "sku", "name")
+
+
+# ----------------- JSON Pointer -----------------
+def _escape(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token):
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def pointer_to_path(pointer):
+    # "/offers/1/price" -> "offers[1].price"，用于界面展示，与字段提取的路径写法一致
+    path = ""
+    for token in pointer.split("/")[1:]:
+        token = _unescape(token)
+        if token.isdigit():
+            path += f"[{token}]"
+        else:
+            path = f"{path}.{token}" if path else token
+    return path
+
+
+# ----------------- 列表对齐 -----------------
+def _identity(item, key):
+    # ListItem 等包装对象本身没有标识时，取其 "item" 子对象的标识
+    value = item.get(key)
+    if value is None and isinstance(item.get("item"), dict):
+        value = item["item"].get(key)
+    return value
+
+
+def _align_key(list1, list2):
+    # 两个列表中所有元素都是对象、都带有同一个标识字段且取值唯一时，返回该字段名
+    items = list1 + list2
+    if not items or not all(isinstance(item, dict) for item in items):
+        return None
+    for key in LIST_ALIGN_KEYS:
+        values1 = [_identity(item, key) for item in list1]
+        values2 = [_identity(item, key) for item in list2]
+        values = values1 + values2
+        if all(isinstance(v, (str, int, float)) for v in values) and len(set(values1)) == len(values1) and len(set(values2)) == len(values2):
+            return key
+    return None
+
+
+def _tokens(items, key):
+    if key is not None:
+        return [(key, _identity(item, key)) for item in items]
+    # 无标识字段时按内容哈希，内容完全相同的元素才会被视为同一元素
+    return [hash(dumps_bytes(item, sort_keys=True)) if isinstance(item, (dict, list)) else (type(item).__name__, item) for item in items]
+
+
+# ----------------- 差异计算 -----------------
+def _diff_values(v1, v2, pointer, ops):
+    if v1 == v2:
+        return
+    if isinstance(v1, dict) and isinstance(v2, dict):
+        _diff_dicts(v1, v2, pointer, ops)
+    elif isinstance(v1, list) and isinstance(v2, list):
+        _diff_lists(v1, v2, pointer, ops)
+    else:
+        ops.append({"op": "replace", "path": pointer, "value": v2, "old": v1})
+
+
+def _diff_dicts(d1, d2, pointer, ops):
+    for k, v1 in d1.items():
+        child = f"{pointer}/{_escape(k)}"
+        if k not in d2:
+            ops.append({"op": "remove", "path": child, "old": v1})
+        else:
+            _diff_values(v1, d2[k], child, ops)
+    for k, v2 in d2.items():
+        if k not in d1:
+            ops.append({"op": "add", "path": f"{pointer}/{_escape(k)}", "value": v2})
+
+
+def _diff_lists(list1, list2, pointer, ops):
+    # 先去掉公共前后缀，只对中间变化区域做序列对齐；补丁按顺序应用时下标始终有效
+    start = 0
+    end1, end2 = len(list1), len(list2)
+    while start < end1 and start < end2 and list1[start] == list2[start]:
+        start += 1
+    while end1 > start and end2 > start and list1[end1 - 1] == list2[end2 - 1]:
+        end1 -= 1
+        end2 -= 1
+    mid1, mid2 = list1[start:end1], list2[start:end2]
+    key = _align_key(mid1, mid2)
+    matcher = SequenceMatcher(None, _tokens(mid1, key), _tokens(mid2, key), autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        base = start + j1 # 此时已处理部分等于 list2[:base]，后面接 list1 的剩余元素
+        if tag == "equal":
+            for k in range(i2 - i1):
+                _diff_values(mid1[i1 + k], mid2[j1 + k], f"{pointer}/{base + k}", ops)
+        elif tag == "delete":
+            for k in range(i2 - i1):
+                ops.append({"op": "remove", "path": f"{pointer}/{base}", "old": mid1[i1 + k]})
+        elif tag == "insert":
+            for k in range(j2 - j1):
+                ops.append({"op": "add", "path": f"{pointer}/{base + k}", "value": mid2[j1 + k]})
+        else: # replace：按位置配对，对象之间继续细化，多余部分删除或插入
+            paired = min(i2 - i1, j2 - j1)
+            for k in range(paired):
+                v1, v2 = mid1[i1 + k], mid2[j1 + k]
+                if isinstance(v1, dict) and isinstance(v2, dict) and key is None:
+                    _diff_dicts(v1, v2, f"{pointer}/{base + k}", ops)
+                else:
+                    ops.append({"op": "replace", "path": f"{pointer}/{base + k}", "value": v2, "old": v1})
+            for k in range(paired, i2 - i1):
+                ops.append({"op": "remove", "path": f"{pointer}/{base + paired}", "old": mid1[i1 + k]})
+            for k in range(paired, j2 - j1):
+                ops.append({"op": "add", "path": f"{pointer}/{base + k}", "value": mid2[j1 + k]})
+
+
+def diff_json(doc1, doc2):
+    # 返回把 doc1 变为 doc2 的补丁操作列表（add / remove / replace），额外的 "old" 字段记录原值
+    ops = []
+    _diff_values(doc1, doc2, "", ops)
+    return ops
+
+
+# ----------------- 补丁应用 -----------------
+def apply_patch(doc, ops):
+    # 按顺序应用补丁（会修改传入的对象），返回结果；根路径 "" 的 replace 直接返回新值
+    for op in ops:
+        if op["path"] == "":
+            doc = op["value"]
+            continue
+        tokens = [_unescape(t) for t in op["path"].split("/")[1:]]
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if op["op"] == "add":
+                parent.insert(index, op["value"])
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = op["value"]
+        else:
+            if op["op"] == "remove":
+                del parent[last]
+            else:
+                parent[last] = op["value"]
+    return doc
+
+
+# ----------------- 界面展示 -----------------
+def format_patch(ops):
+    # 转为与原对比页一致的中文 Markdown 描述
+    lines = []
+    for op in ops:
+        path = pointer_to_path(op["path"]) or "(根)"
+        if op["op"] == "add":
+            lines.append(f"仅在片段 B 中存在: `{path}` = `{op['value']}`")
+        elif op["op"] == "remove":
+            lines.append(f"仅在片段 A 中存在: `{path}` = `{op['old']}`")
+        else:
+            lines.append(f"值不同: `{path}` (A: `{op['old']}`, B: `{op['value']}`)")
+    return lines
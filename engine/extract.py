@@ -0,0 +1,168 @@
+# engine/extract.py
+# 从 HTML 页面中提取所有 <script type="application/ld+json"> 结构化数据块
+import codecs
+import json
+import re
+
+
+# ----------------- 解析单个 JSON-LD 块 -----------------
+def parse_jsonld_block(raw):
+    # 返回 (data, error)，解析失败时 data 为 None，error 为错误描述
+    text = raw.strip()
+    if not text:
+        return None, "空的 JSON-LD 块"
+    try:
+        return json.loads(text), None
+    except json.JSONDecodeError as e:
+        return None, f"JSON 语法错误: {e}"
+    except RecursionError:
+        return None, "JSON 嵌套过深"
+
+
+# ----------------- BeautifulSoup 提取 -----------------
+def extract_jsonld_bs4(html):
+    # 构建完整 DOM 后查找 script 标签，返回原始文本列表（作为流式提取的对照实现）
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    blocks = []
+    for tag in soup.find_all("script", attrs={"type": True}):
+        if tag["type"].split(";")[0].strip().lower() == "application/ld+json":
+            blocks.append(tag.string or tag.get_text())
+    return blocks
+
+
+# ----------------- 字符编码 -----------------
+# 优先使用 HTTP 响应头中的 charset，其次是页面中的 <meta charset> / <meta http-equiv>，都没有时按 UTF-8 解码
+_CHARSET_RE = re.compile(r"""charset\s*=\s*["']?\s*([\w.:-]+)""", re.I)
+DEFAULT_ENCODING = "utf-8"
+
+
+def normalize_encoding(name):
+    # 返回可用于解码的编码名，不认识时返回 None；与浏览器一致，GB2312 / GBK 按其超集 GB18030 解码，
+    # 声明为 UTF-16 / UTF-32 的页面（字节扫描无法处理，实际上几乎都是 UTF-8）按 UTF-8 解码
+    try:
+        name = codecs.lookup(name.strip()).name
+    except (LookupError, ValueError):
+        return None
+    if name in ("gb2312", "gbk"):
+        return "gb18030"
+    if name.startswith(("utf-16", "utf-32")):
+        return DEFAULT_ENCODING
+    return name
+
+
+def charset_from_content_type(value):
+    # 从 Content-Type 头（或 <meta> 标签）中取出 charset，没有或不认识时返回 None
+    match = _CHARSET_RE.search(value or "")
+    return normalize_encoding(match.group(1)) if match else None
+
+
+# ----------------- 流式字节扫描提取 -----------------
+# 不构建 DOM，只在字节流中定位 <script> / <meta> / 注释 / </head>，可直接喂入分块的 HTTP 响应体
+_OPEN_RE = re.compile(rb"<!--|<script\b[^>]*>|<meta\b[^>]*>|</head\s*>", re.I)
+_CLOSE_SCRIPT_RE = re.compile(rb"</script\s*>", re.I)
+_LD_TYPE_RE = re.compile(rb"""\stype\s*=\s*["']?\s*application/ld\+json""", re.I) # 属性名前必须是空白，不匹配 data-type=
+_CLOSE_TAIL = 16 # 跨块的 </script  > 最多保留的尾部字节数
+
+
+class JsonLdStreamExtractor:
+    def __init__(self, head_only=False, encoding=None):
+        # head_only=True 时遇到 </head> 即停止，done 置为 True，调用方可提前断开连接；
+        # encoding：HTTP 响应头声明的编码，为 None 时使用页面中第一个 <meta> 声明的编码，都没有时按 UTF-8
+        self.head_only = head_only
+        self.encoding = normalize_encoding(encoding) if encoding else None
+        self._declared = self.encoding is not None # 编码已确定，不再检查 <meta>
+        self.encoding = self.encoding or DEFAULT_ENCODING
+        self.done = False
+        self._buf = bytearray()
+        self._mode = None # None / "comment" / "script" / "ld"
+        self._scan = 0 # 当前模式下继续查找结束标记的起点
+
+    def feed(self, chunk):
+        # 喂入一块字节，返回本块中新完成的 JSON-LD 文本列表
+        if self.done or not chunk:
+            return []
+        self._buf += chunk
+        return self._drain()
+
+    def close(self):
+        # 输入结束：未闭合的 JSON-LD 脚本按剩余内容返回
+        blocks = []
+        if self._mode == "ld" and not self.done:
+            blocks.append(bytes(self._buf).decode(self.encoding, "replace"))
+        self._buf = bytearray()
+        self._mode = None
+        self.done = True
+        return blocks
+
+    def _drain(self):
+        buf = self._buf
+        pos = 0
+        blocks = []
+        while True:
+            if self._mode is None:
+                m = _OPEN_RE.search(buf, pos)
+                if m is None:
+                    # 保留结尾可能不完整的标签，其余内容直接丢弃
+                    lt = buf.rfind(b"<", pos)
+                    pos = lt if lt != -1 and buf.find(b">", lt) == -1 else len(buf)
+                    break
+                tag = m.group()
+                pos = m.end()
+                if tag == b"<!--":
+                    self._mode = "comment"
+                elif tag[1:2] == b"/": # </head>
+                    if self.head_only:
+                        self.done = True
+                        pos = len(buf)
+                        break
+                elif tag[1:2].lower() == b"m": # <meta>
+                    if not self._declared:
+                        encoding = charset_from_content_type(tag.decode("ascii", "replace"))
+                        if encoding:
+                            self.encoding = encoding
+                            self._declared = True
+                else:
+                    self._mode = "ld" if _LD_TYPE_RE.search(tag) else "script"
+                self._scan = pos
+            elif self._mode == "comment":
+                end = buf.find(b"-->", self._scan)
+                if end == -1:
+                    pos = self._scan = max(pos, len(buf) - 2)
+                    break
+                pos = end + 3
+                self._mode = None
+            else:
+                m = _CLOSE_SCRIPT_RE.search(buf, self._scan)
+                if m is None:
+                    tail = max(pos, len(buf) - _CLOSE_TAIL)
+                    if self._mode == "script":
+                        pos = tail # 非 JSON-LD 脚本内容无需保留
+                    self._scan = tail
+                    break
+                if self._mode == "ld":
+                    blocks.append(bytes(buf[pos:m.start()]).decode(self.encoding, "replace"))
+                pos = m.end()
+                self._mode = None
+        del buf[:pos]
+        self._scan = max(self._scan - pos, 0)
+        return blocks
+
+
+def iter_jsonld(chunks, head_only=False, encoding=None):
+    # 对字节块迭代器逐块提取，读到需要的内容后立即停止消费；encoding 为 HTTP 响应头声明的编码
+    extractor = JsonLdStreamExtractor(head_only=head_only, encoding=encoding)
+    for chunk in chunks:
+        yield from extractor.feed(chunk)
+        if extractor.done:
+            return
+    yield from extractor.close()
+
+
+def extract_jsonld_stream(html, head_only=False, encoding=None):
+    # 整页输入的便捷封装，接受 str 或 bytes；str 已经是解码后的文本，忽略其中的 <meta charset>
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+        encoding = "utf-8"
+    return list(iter_jsonld([html], head_only=head_only, encoding=encoding))
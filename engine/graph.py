@@ -0,0 +1,217 @@
+# engine/graph.py
+# @graph 节点索引：单次遍历整个文档（含 @graph、多个脚本块组成的列表和嵌套实体），
+# 按 @id / @type 建立索引，引用（只有 @id / @type 的占位对象）在访问时才解析，
+# 「所有 Product 节点」「节点 X 的 offers」都是字典查找，不需要反复扫描整棵树
+from .diff import diff_json
+from .paths import format_path
+
+_PREFIXES = ("schema:", "https://schema.org/", "http://schema.org/")
+
+
+def local_name(value):
+    # "schema:Product" / "https://schema.org/Product" -> "Product"
+    if not value.startswith(_PREFIXES):
+        return value
+    for prefix in _PREFIXES:
+        if value.startswith(prefix):
+            return value[len(prefix):]
+    return value
+
+
+def type_names(value):
+    if isinstance(value, str):
+        return [local_name(value)]
+    if isinstance(value, list):
+        return [local_name(v) for v in value if isinstance(v, str)]
+    return []
+
+
+def _only_keywords(node):
+    # 除 @id / @type 等关键字外没有任何属性（带 @graph 的是文档根，不是引用）
+    return "@graph" not in node and all(k.startswith("@") for k in node)
+
+
+def is_reference(value):
+    # {"@id": "..."} 或 {"@type": "...", "@id": "..."}
+    return isinstance(value, dict) and isinstance(value.get("@id"), str) and _only_keywords(value)
+
+
+def iter_entities(data):
+    # 顶层实体：根对象、@graph 成员、顶层列表（多个脚本块）中的元素；爬虫输出的 {"url", "blocks"} 记录取其中的 blocks
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(reversed(value))
+        elif isinstance(value, dict):
+            graph = value.get("@graph")
+            if isinstance(graph, list):
+                stack.extend(reversed(graph))
+            elif isinstance(value.get("blocks"), list) and "url" in value and "@type" not in value:
+                stack.extend(reversed(value["blocks"]))
+            if "@type" in value:
+                yield value
+
+
+def _format_link(link):
+    segments = []
+    while link is not None:
+        link, segment = link
+        segments.append(segment)
+    return format_path(reversed(segments))
+
+
+# ----------------- 节点索引 -----------------
+class GraphIndex:
+    def __init__(self, data):
+        self.data = data
+        self.references = [] # [(路径, @id)]：指向已定义节点的引用
+        self.dangling = []   # [(路径, @id)]：文档中找不到定义的引用
+        self._defs = {}      # @id -> [节点, ...]，同一 @id 可以在多处分别给出部分属性
+        self._by_type = {}   # 类型名 -> [节点, ...]，按文档顺序
+        self._paths = {}     # id(节点) -> 路径链，用于报告问题位置
+        self._merged = {}    # @id -> 合并后的节点，首次访问时生成
+        self._nodes = []     # 全部节点，按文档顺序
+        self._build(data)
+
+    def _build(self, data):
+        # 路径以链表 (父链, 键或下标) 记录，只在需要报告位置时才格式化成字符串
+        entries = [] # 按文档顺序：(对象, 路径链, @id, 是否为占位对象)
+        stack = [(data, None)]
+        while stack:
+            node, link = stack.pop()
+            if isinstance(node, list):
+                children = [(v, (link, i)) for i, v in enumerate(node) if isinstance(v, (dict, list))]
+            elif isinstance(node, dict):
+                # 只索引实体（带 @id 或 @type 的对象），文档根、地址等普通对象不算节点
+                node_id = node.get("@id")
+                if isinstance(node_id, str):
+                    if _only_keywords(node):
+                        entries.append((node, link, node_id, True))
+                        continue
+                    self._defs.setdefault(node_id, []).append(node)
+                    entries.append((node, link, node_id, False))
+                elif "@type" in node:
+                    entries.append((node, link, None, False))
+                children = [(v, (link, k)) for k, v in node.items() if isinstance(v, (dict, list))]
+            else:
+                continue
+            children.reverse()
+            stack.extend(children)
+
+        # 占位对象在全部定义收集完之后再分类：有定义的是引用；
+        # 没有定义但带 @type 的（如只给出类型和 @id 的作者）把第一处当作该节点的定义
+        promoted = set()
+        for node, link, node_id, stub in entries:
+            if stub and node_id not in self._defs and "@type" in node:
+                self._defs[node_id] = [node]
+                promoted.add(id(node))
+        for node, link, node_id, stub in entries:
+            if stub and id(node) not in promoted:
+                (self.references if node_id in self._defs else self.dangling).append((_format_link(link), node_id))
+                continue
+            self._paths[id(node)] = link
+            self._nodes.append(node)
+            for type_name in type_names(node.get("@type")):
+                self._by_type.setdefault(type_name, []).append(node)
+
+    # ----------------- 查询 -----------------
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, node_id):
+        return node_id in self._defs
+
+    def ids(self):
+        return list(self._defs)
+
+    def nodes(self):
+        return list(self._nodes)
+
+    def get(self, node_id, default=None):
+        # 同一 @id 有多处定义时返回合并后的节点（先出现的属性优先），结果缓存，不要原地修改
+        nodes = self._defs.get(node_id)
+        if not nodes:
+            return default
+        if len(nodes) == 1:
+            return nodes[0]
+        merged = self._merged.get(node_id)
+        if merged is None:
+            merged = {}
+            for node in nodes:
+                for key, value in node.items():
+                    merged.setdefault(key, value)
+            self._merged[node_id] = merged
+        return merged
+
+    def definitions(self, node_id):
+        return list(self._defs.get(node_id, ()))
+
+    def duplicates(self):
+        # {@id: 定义次数}，只包含定义超过一次的节点
+        return {node_id: len(nodes) for node_id, nodes in self._defs.items() if len(nodes) > 1}
+
+    def of_type(self, type_name):
+        # 带 @type 的全部节点（不含指向已定义节点的引用），type_name 可带 schema: 前缀
+        return list(self._by_type.get(local_name(type_name), ()))
+
+    def type_counts(self):
+        return {type_name: len(nodes) for type_name, nodes in sorted(self._by_type.items())}
+
+    def summary(self):
+        # 诊断页展示用的统计：{"nodes", "types", "references"}
+        return {"nodes": len(self._nodes), "types": self.type_counts(), "references": len(self.references)}
+
+    def path_of(self, node):
+        link = self._paths.get(id(node), False)
+        return None if link is False else _format_link(link)
+
+    def is_definition(self, node):
+        # 该对象本身是否作为节点被索引（引用占位对象不是）
+        return id(node) in self._paths
+
+    def is_top_level(self, node):
+        # 根节点、@graph 成员或顶层列表（多个脚本块）中的元素
+        link = self._paths.get(id(node), False)
+        if link is False:
+            return False
+        while link is not None:
+            link, segment = link
+            if segment != "@graph" and not isinstance(segment, int):
+                return False
+        return True
+
+    def resolve(self, value):
+        # 引用替换为定义节点（找不到时原样返回），列表逐个解析；其他值原样返回
+        if isinstance(value, list):
+            return [self.resolve(v) for v in value]
+        if is_reference(value):
+            return self.get(value["@id"], value)
+        return value
+
+    def value(self, node, prop, default=None):
+        # node 可以是节点或 @id；返回解析过引用的属性值，如 graph.value("#product", "offers")
+        if isinstance(node, str):
+            node = self.get(node)
+            if node is None:
+                return default
+        else:
+            node = self.resolve(node)
+        if prop not in node:
+            return default
+        return self.resolve(node[prop])
+
+
+# ----------------- 节点级对比 -----------------
+def diff_nodes(graph1, graph2):
+    # 按 @id 对齐两份文档的节点：{"added": [@id], "removed": [@id], "changed": {@id: 补丁操作}}，
+    # 每个节点只做一次字典查找，节点内部的差异用 diff_json 计算；没有 @id 的节点不参与
+    added = [node_id for node_id in graph2.ids() if node_id not in graph1]
+    removed = [node_id for node_id in graph1.ids() if node_id not in graph2]
+    changed = {}
+    for node_id in graph1.ids():
+        if node_id in graph2:
+            ops = diff_json(graph1.get(node_id), graph2.get(node_id))
+            if ops:
+                changed[node_id] = ops
+    return {"added": added, "removed": removed, "changed": changed}
@@ -0,0 +1,372 @@
+# engine/incremental.py
+# 增量诊断：把文档切分成顶层实体（@graph 成员或顶层列表的元素），记住每个实体在文本中的位置、内容哈希和校验结果。
+# 再次诊断时先用公共前后缀找出编辑区间，只重新解析、校验落在区间内的实体，其余实体直接复用上次的结果；
+# 跨实体的 @id 关系（同一 @id 在多个实体中定义、引用指向其他实体）在合并阶段统一处理，结果与 diagnose_jsonld 完全一致
+import bisect
+import hashlib
+import json
+import re
+from collections import Counter
+from itertools import chain
+
+from .core import check_jsonld_structure, diagnose_jsonld
+from .graph import GraphIndex
+from .schema_validator import dangling_issues, load_schema_index, validate_graph
+
+_WS = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+_BLOCK = 64 * 1024 # 比较公共前后缀时每次比较的字符数
+
+
+class _Unscannable(Exception):
+    # 文本不能按实体切分（结构不符合或有语法错误），改为整体解析
+    pass
+
+
+# ----------------- 文本扫描 -----------------
+def _skip_ws(text, pos):
+    return _WS.match(text, pos).end()
+
+
+def _decode(text, pos):
+    try:
+        return _DECODER.raw_decode(text, pos)
+    except json.JSONDecodeError:
+        raise _Unscannable from None
+
+
+def _scan_array(text, pos):
+    # pos 为 "[" 之后的位置；返回 (元素列表, 跨度列表, "]" 的位置)
+    nodes, spans = [], []
+    pos = _skip_ws(text, pos)
+    if text.startswith("]", pos):
+        return nodes, spans, pos
+    while True:
+        node, end = _decode(text, pos)
+        nodes.append(node)
+        spans.append((pos, end))
+        pos = _skip_ws(text, end)
+        if text.startswith(",", pos):
+            pos = _skip_ws(text, pos + 1)
+        elif text.startswith("]", pos):
+            return nodes, spans, pos
+        else:
+            raise _Unscannable
+
+
+def _scan_window(text, pos, stop, has_prev, has_next):
+    # 重新切分 [pos, stop) 区间：前面紧接上一个未变化的实体（has_prev）或 "["，后面紧接下一个未变化的实体（has_next）或 "]"
+    nodes, spans = [], []
+    expect_comma = has_prev
+    after_comma = False
+    while True:
+        pos = _skip_ws(text, pos)
+        if pos >= stop:
+            break
+        if expect_comma:
+            if text[pos] != ",":
+                raise _Unscannable
+            pos += 1
+            expect_comma, after_comma = False, True
+            continue
+        node, end = _decode(text, pos)
+        if end > stop:
+            raise _Unscannable
+        nodes.append(node)
+        spans.append((pos, end))
+        pos = end
+        expect_comma, after_comma = True, False
+    if pos != stop:
+        raise _Unscannable
+    # 后面还有实体时区间必须以逗号结尾（区间内没有任何内容时除外）；后面是 "]" 时不能以逗号结尾
+    if has_next:
+        valid = after_comma or not (has_prev or nodes)
+    else:
+        valid = not after_comma
+    if not valid:
+        raise _Unscannable
+    return nodes, spans
+
+
+def _scan_document(text):
+    # 返回 (头部键值对, 实体列表, 跨度列表, "[" 之后的位置, "]" 的位置)；
+    # 头部为 None 表示顶层就是列表，否则为顶层对象的 [(键, 值)]，"@graph" 处的值由实体列表代替
+    pos = _skip_ws(text, 0)
+    if text.startswith("[", pos):
+        head = None
+        open_pos = pos + 1
+        nodes, spans, close_pos = _scan_array(text, open_pos)
+        pos = close_pos + 1
+    elif text.startswith("{", pos):
+        head = []
+        nodes = None
+        pos = _skip_ws(text, pos + 1)
+        while not text.startswith("}", pos):
+            key, pos = _decode(text, pos)
+            pos = _skip_ws(text, pos)
+            if not isinstance(key, str) or not text.startswith(":", pos):
+                raise _Unscannable
+            pos = _skip_ws(text, pos + 1)
+            if key == "@graph" and nodes is None and text.startswith("[", pos):
+                open_pos = pos + 1
+                nodes, spans, close_pos = _scan_array(text, open_pos)
+                pos = close_pos + 1
+                head.append((key, None))
+            else:
+                value, pos = _decode(text, pos)
+                # @graph 之后的头部实体在文档顺序上排在 @graph 成员之后，无法与头部一起复用，整体解析
+                if key == "@graph" or (nodes is not None and isinstance(value, (dict, list))):
+                    raise _Unscannable
+                head.append((key, value))
+            pos = _skip_ws(text, pos)
+            if text.startswith(",", pos):
+                pos = _skip_ws(text, pos + 1)
+            elif not text.startswith("}", pos):
+                raise _Unscannable
+        if nodes is None:
+            raise _Unscannable
+        pos += 1
+    else:
+        raise _Unscannable
+    if _skip_ws(text, pos) != len(text):
+        raise _Unscannable
+    return head, nodes, spans, open_pos, close_pos
+
+
+def _common_prefix(a, b):
+    n = min(len(a), len(b))
+    lo = 0
+    while lo + _BLOCK <= n and a[lo:lo + _BLOCK] == b[lo:lo + _BLOCK]:
+        lo += _BLOCK
+    hi = min(lo + _BLOCK, n)
+    while lo < hi: # 在最后一块内二分
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a, b, limit):
+    la, lb = len(a), len(b)
+    lo = 0
+    while lo + _BLOCK <= limit and a[la - lo - _BLOCK:la - lo] == b[lb - lo - _BLOCK:lb - lo]:
+        lo += _BLOCK
+    hi = min(lo + _BLOCK, limit)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[la - mid:la - lo] == b[lb - mid:lb - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _digest(text, start, end):
+    return hashlib.blake2b(text[start:end].encode("utf-8"), digest_size=16).digest()
+
+
+def _rebase(path, prefix):
+    # 单独校验时实体位于 "[k]"，换成它在文档中的位置前缀；根对象的问题路径与整体校验一样记为 "@type"
+    rest = path[path.index("]") + 1:]
+    if not prefix and rest.startswith("."):
+        rest = rest[1:]
+    return prefix + rest or "@type"
+
+
+# ----------------- 实体 -----------------
+class _Unit:
+    __slots__ = ("node", "digest", "summary", "issues", "dangling", "defs", "prefix", "rebased", "rebased_dangling")
+
+    def __init__(self, node, digest, index):
+        # 单独校验一个实体，问题路径相对于 "[0]"；跨实体的关系在合并阶段处理
+        graph = GraphIndex([node])
+        self.node = node
+        self.digest = digest
+        self.summary = graph.summary()
+        self.issues = validate_graph(graph, index)
+        self.dangling = graph.dangling # 实体内找不到定义的引用，可能在其他实体中定义
+        self.defs = frozenset(graph.ids())
+        self.prefix = None
+        self.rebased = self.rebased_dangling = None
+
+    def at(self, prefix):
+        # 返回换算到文档位置的 (问题列表, 找不到定义的引用)；位置不变时直接复用上次的结果
+        if prefix != self.prefix:
+            self.prefix = prefix
+            self.rebased = [{**issue, "path": _rebase(issue["path"], prefix)} for issue in self.issues]
+            self.rebased_dangling = [(_rebase(path, prefix), node_id) for path, node_id in self.dangling]
+        return self.rebased, self.rebased_dangling
+
+
+# ----------------- 增量诊断 -----------------
+class IncrementalDiagnoser:
+    def __init__(self, index=None):
+        self.index = index
+        self.last_text = None
+        self.last_result = None
+        self._reset()
+
+    def _reset(self):
+        self._head = None     # 顶层对象的 [(键, 值)]；None 表示顶层为列表
+        self._head_unit = None
+        self._units = []
+        self._starts = []     # 各实体在 last_text 中的起止位置
+        self._ends = []
+        self._open = self._close = None
+        self._totals = {"nodes": 0, "types": Counter(), "references": 0} # 各实体单独统计之和，随实体增删更新
+
+    def _count(self, units, sign):
+        totals = self._totals
+        for unit in units:
+            summary = unit.summary
+            totals["nodes"] += sign * summary["nodes"]
+            totals["references"] += sign * summary["references"]
+            for type_name, count in summary["types"].items():
+                totals["types"][type_name] += sign * count
+
+    def diagnose(self, text):
+        # 返回与 diagnose_jsonld(text, schema=True) 相同的结果（不含 "graph"），
+        # 额外的 "incremental" 记录 {"units": 实体数, "rechecked": 本次重新校验的实体数, "full": 是否整体重建}
+        if text == self.last_text:
+            return self.last_result
+        self.index = self.index or load_schema_index()
+        try:
+            rechecked = self._update(text) if self._units and self.last_text is not None else None
+            full = rechecked is None
+            if full:
+                rechecked = self._rebuild(text)
+        except _Unscannable:
+            self._reset()
+            result = diagnose_jsonld(text, schema=True)
+            result.pop("graph", None)
+            result["incremental"] = {"units": 0, "rechecked": 0, "full": True}
+        else:
+            result = self._assemble()
+            result["incremental"] = {"units": len(self._units), "rechecked": rechecked, "full": full}
+        self.last_text = text
+        self.last_result = result
+        return result
+
+    def _rebuild(self, text):
+        try:
+            head, nodes, spans, self._open, self._close = _scan_document(text)
+        except _Unscannable:
+            self._reset()
+            raise
+        self._head = head
+        self._head_unit = None if head is None else _Unit({k: v for k, v in head if k != "@graph"}, None, self.index)
+        self._units = [_Unit(node, _digest(text, s, e), self.index) for node, (s, e) in zip(nodes, spans)]
+        self._starts = [s for s, _ in spans]
+        self._ends = [e for _, e in spans]
+        self._totals = {"nodes": 0, "types": Counter(), "references": 0}
+        self._count(([self._head_unit] if self._head_unit else []) + self._units, 1)
+        return len(self._units)
+
+    def _update(self, text):
+        # 只重新扫描编辑区间涉及的实体；编辑落在实体数组之外（如 @context）时返回 None，由调用方整体重建
+        old = self.last_text
+        prefix = _common_prefix(old, text)
+        suffix = _common_suffix(old, text, min(len(old), len(text)) - prefix)
+        old_stop = len(old) - suffix
+        delta = len(text) - len(old)
+        if prefix < self._open or old_stop > self._close:
+            return None
+
+        first = bisect.bisect_right(self._ends, prefix)       # 第一个结束于编辑点之后的实体
+        last = bisect.bisect_left(self._starts, old_stop) - 1 # 最后一个开始于编辑区间结束之前的实体
+        left = self._ends[first - 1] if first else self._open
+        right = self._starts[last + 1] if last + 1 < len(self._units) else self._close
+        try:
+            nodes, spans = _scan_window(text, left, right + delta, first > 0, last + 1 < len(self._units))
+        except _Unscannable:
+            return None
+
+        # 内容哈希未变化的实体（如整段粘贴替换后大部分内容相同）沿用原结果，每个旧实体最多复用一次
+        reusable = {}
+        for unit in self._units[first:last + 1]:
+            reusable.setdefault(unit.digest, []).append(unit)
+        fresh = []
+        rechecked = 0
+        for node, (s, e) in zip(nodes, spans):
+            digest = _digest(text, s, e)
+            candidates = reusable.get(digest)
+            if candidates:
+                fresh.append(candidates.pop(0))
+            else:
+                fresh.append(_Unit(node, digest, self.index))
+                rechecked += 1
+
+        self._count(self._units[first:last + 1], -1)
+        self._count(fresh, 1)
+        self._units[first:last + 1] = fresh
+        self._starts[first:] = [s for s, _ in spans] + [s + delta for s in self._starts[last + 1:]]
+        self._ends[first:] = [e for _, e in spans] + [e + delta for e in self._ends[last + 1:]]
+        self._close += delta
+        return rechecked
+
+    # ----------------- 合并 -----------------
+    def _assemble(self):
+        units = self._units
+        head_unit = self._head_unit
+        if self._head is None:
+            nodes = [unit.node for unit in units]
+            data = nodes
+            prefixes = [f"[{i}]" for i in range(len(units))]
+        else:
+            nodes = [unit.node for unit in units]
+            data = {k: nodes if k == "@graph" else v for k, v in self._head}
+            prefixes = [f"@graph[{i}]" for i in range(len(units))]
+        ordered = ([head_unit] if head_unit else []) + units
+        ordered_prefixes = ([""] if head_unit else []) + prefixes
+
+        # 同一 @id 在多个实体中定义（或只给出类型的占位对象分散在多处）时，这些实体一起重新校验
+        def_counts = Counter(chain.from_iterable(unit.defs for unit in ordered))
+        shared = {node_id for node_id, count in def_counts.items() if count > 1}
+        coupled = [i for i, unit in enumerate(ordered) if shared and not unit.defs.isdisjoint(shared)]
+        coupled_set = set(coupled)
+
+        issue_lists = [None] * len(ordered)
+        dangling_lists = [None] * len(ordered)
+        totals = self._totals
+        stats = {"nodes": totals["nodes"], "types": Counter(totals["types"]), "references": totals["references"]}
+        if coupled:
+            graph = GraphIndex([ordered[i].node for i in coupled])
+            grouped = [[] for _ in coupled]
+            for issue in validate_graph(graph, self.index):
+                k = int(issue["path"][1:issue["path"].index("]")])
+                grouped[k].append({**issue, "path": _rebase(issue["path"], ordered_prefixes[coupled[k]])})
+            dangling_grouped = [[] for _ in coupled]
+            for path, node_id in graph.dangling:
+                k = int(path[1:path.index("]")])
+                dangling_grouped[k].append((_rebase(path, ordered_prefixes[coupled[k]]), node_id))
+            for k, i in enumerate(coupled):
+                issue_lists[i] = grouped[k]
+                dangling_lists[i] = dangling_grouped[k]
+            # 这些实体的统计以一起建立的索引为准，替换掉各自单独统计的部分
+            for i in coupled:
+                summary = ordered[i].summary
+                stats["nodes"] -= summary["nodes"]
+                stats["references"] -= summary["references"]
+                stats["types"].subtract(summary["types"])
+            summary = graph.summary()
+            stats["nodes"] += summary["nodes"]
+            stats["references"] += summary["references"]
+            stats["types"].update(summary["types"])
+
+        for i, unit in enumerate(ordered):
+            if i not in coupled_set:
+                issue_lists[i], dangling_lists[i] = unit.at(ordered_prefixes[i])
+
+        # 实体内找不到定义的引用：在其他实体中有定义的算作引用，否则按整体校验的规则告警
+        dangling = []
+        for path, node_id in chain.from_iterable(dangling_lists):
+            if node_id in def_counts:
+                stats["references"] += 1
+            else:
+                dangling.append((path, node_id))
+        stats["types"] = {type_name: count for type_name, count in sorted(stats["types"].items()) if count > 0}
+
+        issues = list(chain.from_iterable(issue_lists)) + dangling_issues(dangling)
+        return {"valid": True, "data": data, "warnings": check_jsonld_structure(data), "error": None, "issues": issues, "stats": stats}
@@ -0,0 +1,290 @@
+# engine/merge.py
+# 多块合并：把页面中分开的多个 JSON-LD 脚本块（或全站抓取结果）合并成一个 @graph。
+#   - 有 @id 的节点按 @id 去重（哈希表索引，不做两两比较），同一 @id 的属性按输入顺序确定性合并；
+#   - 没有 @id 的顶层节点按规范化哈希去重；
+#   - 嵌套的带 @id 的定义提升为顶层节点，原位置改写为 {"@id": ...} 引用；
+#   - 抓取结果中的相对 @id（如 "#org"）按页面 URL 解析，不同页面的 "#org" 不会被误合并。
+# 属性合并规则：值相同保留一份；@type 取并集；数组视为无序集合取并集；都是普通对象时逐字段合并；
+# 其余冲突按 conflicts 策略处理：first 保留先出现的值（默认），last 使用后出现的值，all 收集为数组
+#
+# 用法示例：
+#   python -m engine.merge page-blocks.json -o merged.jsonld --pretty
+#   python -m engine.merge crawl.jsonl -o site-graph.jsonld --conflicts all
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from urllib.parse import urljoin
+
+from .batch_diagnose import DEFAULT_CHUNK_SIZE, iter_tasks, load_chunk
+from .graph import is_reference
+from .serialize import dump, dumps, dumps_bytes
+from .snapshot_diff import content_hash
+
+DEFAULT_CONTEXT = "https://schema.org"
+CONFLICT_POLICIES = ("first", "last", "all")
+MAX_CONFLICTS = 1000 # 保留的冲突明细条数上限，计数不受限制
+_DECODER = json.JSONDecoder()
+
+
+# ----------------- 输入 -----------------
+def split_documents(text):
+    # 依次解析文本中首尾相接的多个 JSON 值（如从页面复制的多个脚本块），语法错误或嵌套过深时抛出 JSONDecodeError
+    documents = []
+    pos = 0
+    end = len(text)
+    while True:
+        while pos < end and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= end:
+            return documents
+        try:
+            value, pos = _DECODER.raw_decode(text, pos)
+        except RecursionError:
+            raise json.JSONDecodeError("Document is nested too deeply", text, pos) from None
+        documents.append(value)
+
+
+def _canonical(value):
+    # 数组去重用的键：标量区分类型（1 与 true 不同），对象和数组取规范化序列化结果
+    if isinstance(value, (dict, list)):
+        return dumps_bytes(value, sort_keys=True)
+    return (type(value).__name__, value)
+
+
+def _union(current, value):
+    items = list(current) if isinstance(current, list) else [current]
+    seen = {_canonical(v) for v in items}
+    for v in (value if isinstance(value, list) else [value]):
+        key = _canonical(v)
+        if key not in seen:
+            seen.add(key)
+            items.append(v)
+    return items
+
+
+def _is_definition(value):
+    # 带 @id 且有 @ 关键字以外属性的对象；只有 @id / @type 的是引用
+    return isinstance(value.get("@id"), str) and not is_reference(value) and "@graph" not in value
+
+
+# ----------------- 合并 -----------------
+class GraphMerger:
+    def __init__(self, conflicts="first"):
+        if conflicts not in CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy '{conflicts}', expected one of {', '.join(CONFLICT_POLICIES)}")
+        self.conflict_policy = conflicts
+        self.context = None        # 第一个出现的 @context
+        self.contexts = Counter()  # 各种 @context 写法出现的次数
+        self.conflicts = []        # [(@id, 属性路径)]，最多 MAX_CONFLICTS 条
+        self.stats = Counter()     # documents / blocks / merged / duplicates / hoisted / conflicts
+        self._nodes = []           # 输出节点，按首次出现的顺序；有 @id 的节点原地合并
+        self._by_id = {}           # @id -> 节点
+        self._blank = set()        # 没有 @id 的顶层节点的规范化哈希
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def get(self, node_id):
+        return self._by_id.get(node_id)
+
+    def nodes(self):
+        return list(self._nodes)
+
+    def add(self, data, base=None):
+        # 加入一个文档：单个节点、节点列表、带 @graph 的文档或爬虫输出的 {"url", "blocks"} 记录；
+        # base 为页面 URL 时相对 @id 按其解析（爬虫记录自动使用其中的 url）
+        self.stats["documents"] += 1
+        stack = [(data, base)]
+        while stack:
+            value, value_base = stack.pop()
+            if isinstance(value, list):
+                stack.extend((v, value_base) for v in reversed(value))
+            elif isinstance(value, dict):
+                if isinstance(value.get("blocks"), list) and isinstance(value.get("url"), str) and "@type" not in value:
+                    stack.extend((v, value["url"]) for v in reversed(value["blocks"]))
+                    continue
+                context = value.get("@context")
+                if context is not None:
+                    self.contexts[dumps(context)] += 1
+                    if self.context is None:
+                        self.context = context
+                if isinstance(value.get("@graph"), list):
+                    stack.extend((v, value_base) for v in reversed(value["@graph"]))
+                    if not any(k not in ("@context", "@graph", "@id") for k in value):
+                        continue
+                    value = {k: v for k, v in value.items() if k != "@graph"} # 带属性的 @graph 根也是一个节点
+                self.stats["blocks"] += 1
+                self._add_node(value, value_base)
+
+    def _add_node(self, node, base):
+        # 节点本身与其中提升出来的嵌套定义依次并入索引
+        pending = deque([node])
+        while pending:
+            rewritten = self._rewrite(pending.popleft(), base, pending)
+            node_id = rewritten.get("@id")
+            if not isinstance(node_id, str):
+                if not any(not k.startswith("@") or k == "@type" for k in rewritten):
+                    continue # 空对象
+                digest = content_hash(rewritten)
+                if digest in self._blank:
+                    self.stats["duplicates"] += 1
+                    continue
+                self._blank.add(digest)
+                self._nodes.append(rewritten)
+                continue
+            target = self._by_id.get(node_id)
+            if target is None:
+                self._by_id[node_id] = rewritten
+                self._nodes.append(rewritten)
+            else:
+                self.stats["merged"] += 1
+                self._merge_into(target, rewritten, node_id, "")
+
+    def _rewrite(self, root, base, pending):
+        # 非递归复制节点：去掉 @context，解析相对 @id，嵌套定义放入 pending 并在原位置换成引用
+        holder = {}
+        stack = [(root, holder, "root")]
+        while stack:
+            value, parent, key = stack.pop()
+            if isinstance(value, dict):
+                if value is not root and _is_definition(value):
+                    node_id = urljoin(base, value["@id"]) if base else value["@id"]
+                    pending.append(value)
+                    self.stats["hoisted"] += 1
+                    parent[key] = {"@id": node_id}
+                    continue
+                copy = parent[key] = {}
+                for k, v in value.items():
+                    if k == "@context":
+                        continue
+                    if k == "@id" and base and isinstance(v, str):
+                        v = urljoin(base, v)
+                    if isinstance(v, (dict, list)):
+                        copy[k] = None # 先占位，保持键的顺序
+                        stack.append((v, copy, k))
+                    else:
+                        copy[k] = v
+            else:
+                copy = parent[key] = [None] * len(value)
+                for i, v in enumerate(value):
+                    if isinstance(v, (dict, list)):
+                        stack.append((v, copy, i))
+                    else:
+                        copy[i] = v
+        return holder["root"]
+
+    def _merge_into(self, target, node, node_id, path):
+        for key, value in node.items():
+            if key not in target:
+                target[key] = value
+                continue
+            current = target[key]
+            if current == value:
+                continue
+            if key == "@type" or isinstance(current, list) or isinstance(value, list):
+                merged = _union(current, value)
+                target[key] = merged[0] if len(merged) == 1 else merged
+            elif isinstance(current, dict) and isinstance(value, dict) and current.get("@id") == value.get("@id"):
+                self._merge_into(current, value, node_id, f"{path}{key}.")
+            else:
+                self.stats["conflicts"] += 1
+                if len(self.conflicts) < MAX_CONFLICTS:
+                    self.conflicts.append((node_id, f"{path}{key}"))
+                if self.conflict_policy == "last":
+                    target[key] = value
+                elif self.conflict_policy == "all":
+                    target[key] = _union(current, value)
+
+    # ----------------- 输出 -----------------
+    def to_graph(self):
+        return {"@context": self.context if self.context is not None else DEFAULT_CONTEXT, "@graph": self.nodes()}
+
+    def write(self, fp, pretty=False):
+        # fp 为二进制文件对象；@graph 逐个节点编码写出，不在内存中拼接整个文档
+        dump(self.to_graph(), fp, pretty=pretty)
+
+    def summary(self):
+        return {
+            "documents": self.stats["documents"],
+            "blocks": self.stats["blocks"],
+            "nodes": len(self._nodes),
+            "merged": self.stats["merged"],
+            "duplicates": self.stats["duplicates"],
+            "hoisted": self.stats["hoisted"],
+            "conflicts": self.stats["conflicts"],
+            "contexts": len(self.contexts),
+        }
+
+
+def merge_documents(documents, conflicts="first", base=None):
+    merger = GraphMerger(conflicts)
+    for data in documents:
+        merger.add(data, base)
+    return merger
+
+
+# ----------------- 命令行入口 -----------------
+def iter_documents(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    # 目录与 JSONL 按分块读取；单个 .json / .jsonld 文件可包含首尾相接的多个 JSON 值
+    if os.path.isdir(path) or path.lower().endswith(".jsonl"):
+        for kind, payload, _ in iter_tasks(path, chunk_size):
+            docs, failures = load_chunk(kind, payload)
+            for doc_id, e in failures:
+                yield doc_id, None, e
+            for doc_id, text in docs:
+                try:
+                    yield doc_id, split_documents(text), None
+                except json.JSONDecodeError as e:
+                    yield doc_id, None, e
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        try:
+            yield path, split_documents(text), None
+        except json.JSONDecodeError as e:
+            yield path, None, e
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把多个 JSON-LD 块合并为一个 @graph（按 @id 去重）")
+    parser.add_argument("paths", nargs="+", help="JSON / JSON-LD 文件（可含多个块）、每行一个文档的 JSONL（可为爬虫输出）或目录")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，默认标准输出")
+    parser.add_argument("--pretty", action="store_true", help="缩进格式输出")
+    parser.add_argument("--conflicts", default="first", choices=CONFLICT_POLICIES, help="同一 @id 的属性值冲突时的处理方式")
+    parser.add_argument("--base", default=None, help="解析相对 @id 的基准 URL（爬虫记录自动使用其中的 url）")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="每次读取的文档数")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    merger = GraphMerger(args.conflicts)
+    failed = 0
+    for path in args.paths:
+        for doc_id, documents, error in iter_documents(path, args.chunk_size):
+            if error is not None:
+                failed += 1
+                print(f"跳过 {doc_id}: {error}", file=sys.stderr)
+                continue
+            for data in documents:
+                merger.add(data, args.base)
+
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        merger.write(out, pretty=args.pretty)
+        out.write(b"\n")
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    summary = merger.summary()
+    elapsed = time.perf_counter() - start
+    rate = summary["blocks"] / elapsed if elapsed else 0.0
+    print(f"完成：{summary['blocks']} 个块合并为 {summary['nodes']} 个节点（按 @id 合并 {summary['merged']} 次，"
+          f"重复节点 {summary['duplicates']} 个，嵌套定义改写为引用 {summary['hoisted']} 处，属性冲突 {summary['conflicts']} 处，"
+          f"解析失败 {failed} 个，{rate:.0f} 块/秒）", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
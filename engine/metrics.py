@@ -0,0 +1,185 @@
+# engine/metrics.py
+# 轻量计时埋点：按操作名聚合成固定分桶的直方图（次数 / 总耗时 / 最大值 / 分位数估计），
+# 可导出为 Prometheus 文本格式。未启用时 timer() 返回共享的空上下文，开销只有一次函数调用。
+# 通过 enable() 或环境变量 SDA_METRICS=1 启用。
+import bisect
+import os
+import threading
+import time
+from functools import wraps
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_NAME = "sda_operation_seconds"
+
+_enabled = os.environ.get("SDA_METRICS", "").strip() not in ("", "0")
+
+
+# ----------------- 直方图 -----------------
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # 最后一格为 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        # 在所在分桶内线性插值；落在 +Inf 桶时返回观测到的最大值
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                if i == len(self.buckets):
+                    return self.max
+                lower = self.buckets[i - 1] if i else 0.0
+                return min(lower + (self.buckets[i] - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._last_export = 0.0
+
+    def observe(self, op, seconds):
+        with self._lock:
+            histogram = self._histograms.get(op)
+            if histogram is None:
+                histogram = self._histograms[op] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def snapshot(self):
+        # 返回 {操作名: {"count", "sum", "mean", "max", "p50", "p95", "p99"}}，单位为秒
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            return {
+                op: {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "mean": h.sum / h.count if h.count else 0.0,
+                    "max": h.max,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "p99": h.quantile(0.99),
+                }
+                for op, h in histograms
+            }
+
+    # ----------------- Prometheus 导出 -----------------
+    def to_prometheus(self):
+        lines = [
+            f"# HELP {METRIC_NAME} Duration of instrumented operations in seconds.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        with self._lock:
+            for op, h in sorted(self._histograms.items()):
+                label = op.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), h.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{METRIC_NAME}_bucket{{op="{label}",le="{le}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_sum{{op="{label}"}} {h.sum!r}')
+                lines.append(f'{METRIC_NAME}_count{{op="{label}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        # 先写临时文件再原子替换，抓取方不会读到写了一半的文件
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def maybe_write_prometheus(self, path, interval=15.0):
+        # 距上次导出超过 interval 秒时才写文件，适合在每次页面重跑结束时调用
+        now = time.monotonic()
+        if now - self._last_export < interval:
+            return False
+        self._last_export = now
+        self.write_prometheus(path)
+        return True
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ----------------- 计时器 -----------------
+class _Timer:
+    __slots__ = ("op", "start")
+
+    def __init__(self, op):
+        self.op = op
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        REGISTRY.observe(self.op, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = bool(on)
+
+
+def is_enabled():
+    return _enabled
+
+
+def timer(op):
+    # with timer("json.loads"): ...；抛出异常（包括 st.stop / st.rerun）时同样记录耗时
+    return _Timer(op) if _enabled else _NULL_TIMER
+
+
+def record(op, seconds):
+    if _enabled:
+        REGISTRY.observe(op, seconds)
+
+
+def timed(op):
+    # 装饰器版本；是否计时在每次调用时判断，启用状态可以随时切换
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                REGISTRY.observe(op, time.perf_counter() - start)
+        return wrapper
+    return decorator
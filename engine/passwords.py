@@ -0,0 +1,129 @@
+# engine/passwords.py
+# 密码哈希：加盐的 scrypt / PBKDF2（hashlib 自带），参数随哈希值一起保存，调整成本或切换算法后旧哈希仍可校验，
+# 登录成功时按 needs_rehash 透明升级（包括旧版无盐 SHA-256）。
+# KDF 在调用线程上同步计算，调用方（登录表单所在的页面脚本）会等待其完成；hashlib 计算期间释放 GIL，
+# 其他会话的页面脚本照常运行。同时进行的 KDF 计算数由有界信号量限制，避免并发登录时内存与 CPU 占用失控；
+# 近期校验成功的结果带过期时间缓存，重复校验不再付出 KDF 成本。
+# 用户不存在时（stored 为空）同样做一次 KDF 计算再返回 False，响应时间不暴露账号是否存在。
+#
+# 存储格式：
+#   scrypt$<n>$<r>$<p>$<salt>$<hash>
+#   pbkdf2_sha256$<iterations>$<salt>$<hash>
+#   64 位十六进制（旧版无盐 SHA-256）
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+from .cache import MemoryCache
+from .metrics import timed
+
+SCHEMES = ("scrypt", "pbkdf2_sha256")
+_SALT_BYTES = 16
+_HASH_BYTES = 32
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _is_legacy_sha256(stored):
+    return len(stored) == 64 and all(c in "0123456789abcdef" for c in stored.lower())
+
+
+class PasswordHasher:
+    def __init__(self, scheme="scrypt", scrypt_n=2 ** 14, scrypt_r=8, scrypt_p=1, pbkdf2_iterations=600000,
+                 max_concurrent=4, cache_size=1024, cache_ttl=300):
+        # scrypt_n / pbkdf2_iterations 为成本参数；max_concurrent 限制同时进行的 KDF 计算数（scrypt 每次约占 128*n*r 字节内存），
+        # 超出时调用线程排队等待
+        if scheme not in SCHEMES:
+            raise ValueError(f"Unknown password scheme '{scheme}' (expected one of: {', '.join(SCHEMES)})")
+        self.scheme = scheme
+        self.scrypt_params = (scrypt_n, scrypt_r, scrypt_p)
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self.cache_ttl = cache_ttl
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._verified = MemoryCache(max_items=cache_size) if cache_size else None
+        self._cache_secret = os.urandom(32) # 缓存键用进程内随机密钥做 MAC，内存中不保留可离线破解的快速哈希
+        self._dummy = None # 用户不存在时用于校验的占位哈希，首次需要时生成
+
+    # ----------------- KDF 计算 -----------------
+    def _derive(self, scheme, password, salt, params):
+        secret = password.encode("utf-8")
+        if scheme == "scrypt":
+            n, r, p = params
+            return hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=_HASH_BYTES)
+        return hashlib.pbkdf2_hmac("sha256", secret, salt, params[0], dklen=_HASH_BYTES)
+
+    def _hash(self, password):
+        salt = os.urandom(_SALT_BYTES)
+        if self.scheme == "scrypt":
+            params = self.scrypt_params
+        else:
+            params = (self.pbkdf2_iterations,)
+        digest = self._derive(self.scheme, password, salt, params)
+        return "$".join([self.scheme, *map(str, params), _b64encode(salt), _b64encode(digest)])
+
+    def _verify(self, password, stored):
+        if _is_legacy_sha256(stored):
+            return hmac.compare_digest(hashlib.sha256(password.encode("utf-8")).hexdigest(), stored.lower())
+        parts = stored.split("$")
+        try:
+            if parts[0] == "scrypt" and len(parts) == 6:
+                params = tuple(int(x) for x in parts[1:4])
+            elif parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+                params = (int(parts[1]),)
+            else:
+                return False
+            salt, expected = _b64decode(parts[-2]), _b64decode(parts[-1])
+            digest = self._derive(parts[0], password, salt, params)
+        except (ValueError, TypeError):
+            return False # 格式损坏或参数超出范围
+        return hmac.compare_digest(digest, expected)
+
+    # ----------------- 对外接口 -----------------
+    @timed("password.hash")
+    def hash(self, password):
+        with self._slots:
+            return self._hash(password)
+
+    def _verify_dummy(self, password):
+        # 与真实校验相同成本的一次 KDF 计算：首次调用生成占位哈希（成本与一次校验相同），之后对其校验
+        with self._slots:
+            if self._dummy is None:
+                self._dummy = self._hash(password)
+            else:
+                self._verify(password, self._dummy)
+
+    @timed("password.verify")
+    def verify(self, password, stored):
+        # stored 为空（用户不存在）时也付出一次 KDF 成本后返回 False
+        if not stored:
+            self._verify_dummy(password)
+            return False
+        key = None
+        if self._verified is not None:
+            key = hmac.new(self._cache_secret, f"{stored}\0{password}".encode("utf-8"), "blake2b").digest()
+            expires = self._verified.get(key)
+            if expires is not None and expires > time.monotonic():
+                return True
+        with self._slots:
+            ok = self._verify(password, stored)
+        if ok and key is not None:
+            self._verified.set(key, time.monotonic() + self.cache_ttl)
+        return ok
+
+    def needs_rehash(self, stored):
+        # 旧版 SHA-256、其他算法或成本参数与当前配置不同时返回 True
+        parts = stored.split("$")
+        if parts[0] != self.scheme:
+            return True
+        if self.scheme == "scrypt":
+            return tuple(parts[1:4]) != tuple(map(str, self.scrypt_params))
+        return parts[1] != str(self.pbkdf2_iterations)
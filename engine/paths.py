@@ -0,0 +1,133 @@
+# engine/paths.py
+# 字段路径引擎：把 "a.b[0].c" 编译成带类型的片段元组 ("a", "b", 0, "c") 并缓存，
+# 生成（路径 -> 树）与提取（树 -> 路径）共用同一种表示
+import re
+from functools import lru_cache
+
+_SPLIT_RE = re.compile(r'\.|\[(\d+)\]')
+
+# 片段树节点：(_LEAF, 列号) / (_DICT, ((键, 子节点), ...)) / (_LIST, ((下标, 子节点), ...))
+_LEAF, _DICT, _LIST = 0, 1, 2
+
+
+# ----------------- 路径编译 -----------------
+@lru_cache(maxsize=65536)
+def compile_path(path):
+    # 与原 build_nested_json 的切分规则一致：纯数字片段（包括 a.0.b 写法）视为列表下标
+    return tuple(int(p) if p.isdigit() else p for p in _SPLIT_RE.split(path) if p)
+
+
+def format_path(segments, prefix=""):
+    # compile_path 的逆操作：("offers", 0, "price") -> "offers[0].price"
+    path = prefix
+    for seg in segments:
+        if isinstance(seg, int):
+            path = f"{path}[{seg}]"
+        else:
+            path = f"{path}.{seg}" if path else seg
+    return path
+
+
+def format_pattern(segments):
+    # 与 format_path 相同，但列表下标统一写作 "[]"：("offers", 3, "price") -> "offers[].price"，
+    # 用于按字段（而不是具体位置）统计与比较
+    path = ""
+    for seg in segments:
+        if isinstance(seg, int):
+            path += "[]"
+        else:
+            path = f"{path}.{seg}" if path else seg
+    return path
+
+
+# ----------------- 树 -> 路径 -----------------
+def iter_paths(data, leaves_only=False, skip_keywords=False):
+    # 非递归先序遍历，产出 (片段元组, 值)，顺序与原递归实现一致；
+    # leaves_only=False 时与 get_all_paths 一样包含对象字段本身，列表下标不单独算字段；
+    # skip_keywords=True 时跳过 @ 开头的键（@type、@id、@context 等）及其下的内容
+    stack = [((), data)]
+    while stack:
+        segments, value = stack.pop()
+        is_dict = isinstance(value, dict)
+        if is_dict or isinstance(value, list):
+            if not leaves_only and segments and isinstance(segments[-1], str):
+                yield segments, value
+            if not is_dict:
+                items = enumerate(value)
+            elif skip_keywords:
+                items = [(k, v) for k, v in value.items() if k[:1] != "@"]
+            else:
+                items = value.items()
+            stack.extend(reversed([(segments + (k,), v) for k, v in items]))
+        elif segments and (leaves_only or isinstance(segments[-1], str)):
+            yield segments, value
+
+
+# ----------------- 路径 -> 树（固定字段集的批量构建） -----------------
+class TreeBuilder:
+    def __init__(self, paths):
+        # paths：一组字段路径（如 CSV 列名）；编译一次后可对每一行值快速构建嵌套对象
+        self.paths = list(paths)
+        trie = {}
+        kinds = {(): _DICT}
+        for column, path in enumerate(self.paths):
+            segments = compile_path(path)
+            if not segments:
+                raise ValueError(f"Empty field path at column {column}")
+            node = trie
+            for i, seg in enumerate(segments):
+                prefix = segments[:i]
+                kind = _LIST if isinstance(seg, int) else _DICT
+                if kinds.setdefault(prefix, kind) != kind:
+                    raise ValueError(f"Path '{path}' conflicts at '{format_path(prefix)}': mixed list index and dict key")
+                if i == len(segments) - 1:
+                    if seg in node:
+                        raise ValueError(f"Path '{path}' conflicts with another field path")
+                    node[seg] = column
+                else:
+                    child = node.setdefault(seg, {})
+                    if not isinstance(child, dict):
+                        raise ValueError(f"Path '{path}' conflicts at '{format_path(segments[:i + 1])}': value is not a container")
+                    node = child
+        self._root = self._freeze(trie, (), kinds)
+
+    def _freeze(self, node, prefix, kinds):
+        if not isinstance(node, dict):
+            return (_LEAF, node)
+        children = tuple((seg, self._freeze(child, prefix + (seg,), kinds)) for seg, child in node.items())
+        if kinds.get(prefix) == _LIST:
+            return (_LIST, tuple(sorted(children, key=lambda item: item[0])))
+        return (_DICT, children)
+
+    def build(self, values, skip=None):
+        # values：与 paths 一一对应的值序列；skip(value) 为 True 的值（默认：None、空串、NaN）被省略，空容器随之省略
+        skip = skip or is_missing
+        result = _build_node(self._root, values, skip)
+        return {} if result is _MISSING else result
+
+
+_MISSING = object()
+
+
+def is_missing(value):
+    return value is None or value == "" or value != value # value != value 用于识别 NaN
+
+
+def _build_node(node, values, skip):
+    kind, payload = node
+    if kind == _LEAF:
+        value = values[payload]
+        return _MISSING if skip(value) else value
+    if kind == _DICT:
+        result = {}
+        for key, child in payload:
+            value = _build_node(child, values, skip)
+            if value is not _MISSING:
+                result[key] = value
+    else:
+        result = []
+        for _, child in payload:
+            value = _build_node(child, values, skip)
+            if value is not _MISSING:
+                result.append(value)
+    return result if result else _MISSING
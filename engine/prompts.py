@@ -0,0 +1,314 @@
+# engine/prompts.py
+# AI 语料提示词：按 @type 选择模板，模板编译一次成 (文本片段, 字段路径) 序列后对每个实体直接取值拼接，
+# 结构化生成器页与批量生成共用同一套模板。批量生成对目录或 JSONL 中的文档多进程分块渲染，
+# 按输入顺序流式写出 JSONL（每行一个实体的提示词），在途分块数有上限，内存占用与输入规模无关
+#
+# 用法示例：
+#   python -m engine.prompts catalogue.jsonl -o prompts.jsonl --workers 8
+#   python -m engine.prompts crawl.jsonl -o prompts.jsonl --types Product,Article,Event --templates my_prompts.json
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from .batch_diagnose import DEFAULT_CHUNK_SIZE, iter_tasks, load_chunk
+from .graph import iter_entities, type_names
+from .paths import compile_path
+from .serialize import dumps
+
+# 模板写法：{字段路径} 取值，{a,b} 依次尝试多个路径，{路径|过滤器} 取值后经过滤器处理，{*} 为实体本身，{{ / }} 为字面花括号；
+# defaults 以花括号内 | 之前的写法为键，没有默认值的字段缺失时该实体不生成提示词；
+# items 中的字段为列表，每个元素按子模板渲染后用 join 连接（没有可用元素视为缺失）
+PROMPT_TEMPLATES = {
+    "article": {
+        "label": "文章生成",
+        "types": ["Article", "NewsArticle", "BlogPosting"],
+        "template": "请为一篇关于“{headline}”的文章撰写详细的正文。文章发布于 {datePublished|date}，作者是 {author.name}。"
+                    "请在内容中融入以下要点或扩展相关信息：{articleBody|summary}。确保文章结构清晰，语言专业且引人入胜。",
+        "defaults": {"headline": "一个主题", "author.name": "作者", "articleBody": "文章内容概览"},
+    },
+    "product": {
+        "label": "产品描述",
+        "types": ["Product"],
+        "template": "请为“{brand.name}”品牌的“{name}”产品撰写一个吸引人的营销描述。产品特性包括：{description}。"
+                    "当前售价为 {offers.price} {offers.priceCurrency}。描述应突出产品的核心优势和用户价值。",
+        "defaults": {"brand.name": "未知品牌", "name": "产品", "description": "详细描述", "offers.price": "未知价格", "offers.priceCurrency": "CNY"},
+    },
+    "faq": {
+        "label": "常见问题解答",
+        "types": ["FAQPage"],
+        "template": "请生成一份包含以下问答内容的FAQ列表，并确保答案简洁明了：\n\n{mainEntity}",
+        "items": {"mainEntity": {"template": "Q: {question,name}\nA: {acceptedAnswer.text}", "join": "\n\n"}},
+    },
+    "general": {
+        "label": "通用描述",
+        "types": [],
+        "template": "请根据以下结构化数据信息，撰写一份详细的描述或报告：\n\n```json\n{*|json}\n```\n\n请提取关键信息并用自然语言进行阐述。",
+    },
+}
+GENERAL_TEMPLATE = "general" # 没有专用模板的类型使用的模板
+
+_TOKEN_RE = re.compile(r"\{\{|\}\}|\{([^{}]*)\}")
+
+
+# ----------------- 过滤器 -----------------
+def _summary(value):
+    # 正文摘要：第一行的前 100 个字符
+    if isinstance(value, str) and value:
+        return value.splitlines()[0][:100] + "..."
+    return None
+
+
+def _date(value):
+    return value if value else date.today().strftime("%Y-%m-%d")
+
+
+def _json(value):
+    if isinstance(value, dict):
+        value = {k: v for k, v in value.items() if k not in ("@context", "@type")}
+    return dumps(value, pretty=True) if value else None
+
+
+FILTERS = {"summary": _summary, "date": _date, "json": _json}
+
+
+# ----------------- 模板编译与渲染 -----------------
+def _lookup(value, segments):
+    # 按编译后的路径取值；多值属性（如 offers 为列表）按字段名访问时取第一个元素
+    for seg in segments:
+        if isinstance(value, list):
+            if isinstance(seg, int):
+                value = value[seg] if seg < len(value) else None
+                continue
+            value = value[0] if value else None
+        if not isinstance(value, dict) or isinstance(seg, int):
+            return None
+        value = value.get(seg)
+        if value is None:
+            return None
+    return value
+
+
+class PromptTemplate:
+    def __init__(self, spec, name=None):
+        # spec: {"template", "label", "types", "defaults", "items", "join"}，见 PROMPT_TEMPLATES
+        if not isinstance(spec.get("template"), str):
+            raise ValueError(f"Prompt template '{name}' has no 'template' string")
+        self.name = name
+        self.label = spec.get("label", name)
+        self.types = list(spec.get("types", ()))
+        self.join = spec.get("join", "\n\n")
+        defaults = spec.get("defaults", {})
+        items = {path: PromptTemplate(item, f"{name}.{path}") for path, item in spec.get("items", {}).items()}
+
+        # 片段：字面文本 str，或 (候选路径片段元组, 过滤器, 默认值, 子模板)
+        self._parts = []
+        text = spec["template"]
+        literal = []
+        pos = 0
+        for match in _TOKEN_RE.finditer(text):
+            literal.append(text[pos:match.start()])
+            pos = match.end()
+            token = match.group(0)
+            if token in ("{{", "}}"):
+                literal.append(token[0])
+                continue
+            expr, _, filter_name = match.group(1).partition("|")
+            expr = expr.strip()
+            filter_name = filter_name.strip()
+            if filter_name and filter_name not in FILTERS:
+                raise ValueError(f"Unknown filter '{filter_name}' in prompt template '{name}'")
+            candidates = tuple(() if path.strip() == "*" else compile_path(path.strip()) for path in expr.split(","))
+            if literal:
+                self._parts.append("".join(literal))
+                literal = []
+            self._parts.append((candidates, FILTERS.get(filter_name), defaults.get(expr), items.get(expr)))
+        literal.append(text[pos:])
+        if "".join(literal):
+            self._parts.append("".join(literal))
+
+    def render(self, entity):
+        # 返回提示词；没有默认值的字段缺失时返回 None
+        out = []
+        for part in self._parts:
+            if type(part) is str:
+                out.append(part)
+                continue
+            candidates, filter_, default, item = part
+            value = None
+            for segments in candidates:
+                value = _lookup(entity, segments)
+                if value is not None and value != "":
+                    break
+            if item is not None:
+                value = item.render_each(value)
+            elif filter_ is not None:
+                value = filter_(value)
+            if value is None or value == "":
+                if default is None:
+                    return None
+                value = default
+            out.append(value if isinstance(value, str) else str(value))
+        return "".join(out)
+
+    def render_each(self, value):
+        if isinstance(value, dict):
+            value = [value]
+        if not isinstance(value, list):
+            return None
+        rendered = [text for text in (self.render(v) for v in value if isinstance(v, dict)) if text is not None]
+        return self.join.join(rendered) if rendered else None
+
+
+class PromptRenderer:
+    def __init__(self, templates=None, types=None):
+        # templates: {模板名: spec}，默认 PROMPT_TEMPLATES；types: 只为这些类型生成提示词，
+        # 其中没有专用模板的类型使用通用模板。不指定时为所有有专用模板的类型生成
+        self.templates = {name: PromptTemplate(spec, name) for name, spec in (templates or PROMPT_TEMPLATES).items()}
+        self.types = set(types) if types else None
+        self._by_type = {}
+        for template in self.templates.values():
+            for type_name in template.types:
+                self._by_type.setdefault(type_name, template)
+        self._general = self.templates.get(GENERAL_TEMPLATE)
+
+    def template_for(self, type_name):
+        if self.types is not None and type_name not in self.types:
+            return None
+        template = self._by_type.get(type_name)
+        if template is None and self.types is not None:
+            template = self._general
+        return template
+
+    def render_document(self, data):
+        # 对文档中每个顶层实体产出 {"type", "template", "@id"?, "prompt"}；缺少必需字段时 prompt 为 None。
+        # 多类型实体使用第一个有模板的类型
+        for entity in iter_entities(data):
+            for type_name in type_names(entity["@type"]):
+                template = self.template_for(type_name)
+                if template is None:
+                    continue
+                record = {"type": type_name, "template": template.name}
+                if isinstance(entity.get("@id"), str):
+                    record["@id"] = entity["@id"]
+                record["prompt"] = template.render(entity)
+                yield record
+                break
+
+
+_default_renderer = None
+
+
+def default_renderer():
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = PromptRenderer()
+    return _default_renderer
+
+
+# ----------------- 批量生成 -----------------
+def render_docs(docs, renderer):
+    # docs: [(文档 id, 文本)]，返回 (JSONL 文本, 统计)；统计含 documents / failed / prompts / skipped
+    stats = Counter(documents=len(docs))
+    lines = []
+    for doc_id, text in docs:
+        # 解析或渲染失败（包括嵌套过深）时只记为一个失败的文档，不影响同一批的其他文档
+        try:
+            records = list(renderer.render_document(json.loads(text)))
+        except (RecursionError, ValueError):
+            stats["failed"] += 1
+            continue
+        for record in records:
+            if record["prompt"] is None:
+                stats["skipped"] += 1
+                continue
+            stats["prompts"] += 1
+            lines.append(dumps({"id": doc_id, **record}) + "\n")
+    return "".join(lines), stats
+
+
+_worker_renderer = None # 每个子进程编译一次模板
+
+
+def _init_worker(templates, types):
+    global _worker_renderer
+    _worker_renderer = PromptRenderer(templates, types)
+
+
+def run_chunk(task):
+    # 在子进程中渲染一个分块，整块结果以一段文本传回主进程
+    kind, payload, _ = task
+    docs, failures = load_chunk(kind, payload)
+    text, stats = render_docs(docs, _worker_renderer)
+    stats["documents"] += len(failures)
+    stats["failed"] += len(failures)
+    return text, stats
+
+
+def prompt_batch(tasks, workers=None, templates=None, types=None):
+    # 保持有限数量的分块在途，按输入顺序产出每块的 (JSONL 文本, 统计)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(templates, types)
+        for task in tasks:
+            yield run_chunk(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(templates, types)) as pool:
+        running = deque()
+        for task in tasks:
+            running.append(pool.submit(run_chunk, task))
+            if len(running) >= workers * 2:
+                yield running.popleft().result()
+        while running:
+            yield running.popleft().result()
+
+
+def load_templates(path):
+    # 自定义模板文件 {模板名: spec}，与内置模板合并（同名覆盖）
+    with open(path, "r", encoding="utf-8") as f:
+        custom = json.load(f)
+    if not isinstance(custom, dict):
+        raise ValueError(f"Prompt template file must contain an object: {path}")
+    templates = {**PROMPT_TEMPLATES, **custom}
+    PromptRenderer(templates) # 提前编译一次，模板写错时在启动子进程之前报错
+    return templates
+
+
+# ----------------- 命令行入口 -----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="按 @type 为目录或 JSONL 中的 JSON-LD 文档批量生成 AI 提示词")
+    parser.add_argument("path", help="包含 .json/.jsonld 文件的目录，或每行一个文档的 JSONL 文件（可为爬虫输出）")
+    parser.add_argument("-o", "--output", default="-", help="输出 JSONL，每行一个实体的提示词，默认标准输出")
+    parser.add_argument("--types", default=None, help="逗号分隔的类型，没有专用模板的类型使用通用模板；默认为有专用模板的类型")
+    parser.add_argument("--templates", default=None, help="自定义模板 JSON 文件 {模板名: {template, types, defaults, items}}")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="每个任务分块包含的文档数")
+    args = parser.parse_args(argv)
+
+    templates = load_templates(args.templates) if args.templates else None
+    types = [t.strip() for t in args.types.split(",") if t.strip()] if args.types else None
+    start = time.perf_counter()
+    totals = Counter()
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for text, stats in prompt_batch(iter_tasks(args.path, args.chunk_size), workers=args.workers, templates=templates, types=types):
+            if text:
+                out.write(text)
+            totals.update(stats)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    rate = totals["documents"] / elapsed if elapsed else 0.0
+    print(f"完成：{totals['documents']} 个文档，生成 {totals['prompts']} 条提示词，缺少必需字段跳过 {totals['skipped']} 个实体，"
+          f"解析失败 {totals['failed']} 个（{rate:.0f} 文档/秒）", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+# engine/reformat.py
+# 流式格式转换：按词法单元单遍扫描输入，在紧凑（一行）与缩进（indent=2）两种写法之间转换，
+# 不构建对象树，内存占用与文档大小无关，只与嵌套深度有关。字符串和数值按原样保留，
+# 因此对 json.dumps 生成的输入，结果与「解析后再 json.dumps」完全相同。
+# 多个顶层值（如 JSONL）逐行输出；multiple=False 时与 json.loads 一样只接受一个顶层值。标量按 JSON 语法校验（与 json.loads 一样接受 NaN / Infinity），
+# 字符串中的转义序列和控制字符也按 JSON 语法校验，语法错误抛出 json.JSONDecodeError，行列号与位置按字节计。
+#
+# 用法示例：
+#   python -m engine.reformat export.json -o export.min.json
+#   cat export.min.json | python -m engine.reformat --pretty > export.json
+import argparse
+import json
+import re
+import sys
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# 字符串外的一个词法单元：开括号 / 闭括号 / 逗号 / 冒号 / 完整且合法的字符串 / 合法的标量（数值、true、false、null）/
+# 字符串开头（本块内找不到结束引号，或其中有需要逐个检查的非法转义、控制字符时才匹配）/
+# 对象键连同其后的冒号（最常见的组合，合并为一个单元）/ 不合法的标量（或在块末尾被截断、需与下一块拼接后再校验的标量）
+_SCALAR = rb'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null|NaN|-?Infinity'
+_ESCAPE = rb'["\\/bfnrt]|u[0-9a-fA-F]{4}'
+_TOKEN_RE = re.compile(
+    rb'[ \t\r\n]*(?:([\[{])|([\]}])|(,)|(:)|("[^"\\\x00-\x1f]*(?:\\(?:' + _ESCAPE + rb')[^"\\\x00-\x1f]*)*")(?:[ \t\r\n]*(:))?'
+    rb'|((?:' + _SCALAR + rb')(?![^ \t\r\n\[\]{},:"]))|(")|([^ \t\r\n\[\]{},:"]+))', re.S
+)
+_STRING_SPECIAL_RE = re.compile(rb'["\\\x00-\x1f]')
+_ESCAPE_RE = re.compile(_ESCAPE)
+_SCALAR_RE = re.compile(_SCALAR)
+_INDENT = b"  "
+
+# 语法状态：期望值 / 期望对象键 / 期望冒号 / 值之后（期望逗号或闭括号）
+_VALUE, _KEY, _COLON, _AFTER = range(4)
+
+
+class JsonReformatter:
+    def __init__(self, pretty=False, multiple=True):
+        self.pretty = pretty
+        self.multiple = multiple # 是否接受多个顶层值（JSONL）
+        self._stack = [] # 未闭合的容器：b"{" 或 b"["
+        self._state = _VALUE
+        self._pending_open = False # 刚输出开括号，尚未决定是 "[]" 还是换行缩进
+        self._in_string = False
+        self._escape = None # 上一块以字符串中不完整的转义序列结束时暂存的片段（以反斜杠开头）
+        self._escape_at = None
+        self._scalar = None # 上一块以标量结束时暂存的片段，下一块开头可能是它的后续，完整后才校验并输出
+        self._scalar_at = None
+        self._top_level_values = 0
+        # 错误定位：已处理的输入字节数、当前块开头所在行号与该行的起始位置
+        self._offset = 0
+        self._line = 1
+        self._line_start = 0
+        self._chunk = b""
+
+    def _where(self, pos):
+        # 当前块中 pos 处的 (绝对位置, 行号, 列号)
+        chunk = self._chunk
+        lines = chunk.count(b"\n", 0, pos)
+        line_start = self._offset + chunk.rfind(b"\n", 0, pos) + 1 if lines else self._line_start
+        return self._offset + pos, self._line + lines, self._offset + pos - line_start + 1
+
+    def _error(self, message, pos):
+        return self._error_at(message, self._where(pos))
+
+    def _error_at(self, message, where):
+        # 与 json.loads 相同的异常类型和消息格式
+        pos, lineno, colno = where
+        error = json.JSONDecodeError(message, "", 0)
+        error.pos, error.lineno, error.colno = pos, lineno, colno
+        error.args = (f"{message}: line {lineno} column {colno} (char {pos})",)
+        return error
+
+    def _finish_scalar(self):
+        scalar = b"".join(self._scalar)
+        if not _SCALAR_RE.fullmatch(scalar):
+            raise self._error_at("Expecting value", self._scalar_at)
+        self._scalar = None
+        return scalar
+
+    def _check_escape(self, escape, where):
+        # escape：反斜杠开头的完整转义序列；where：反斜杠的 (位置, 行号, 列号)
+        if _ESCAPE_RE.fullmatch(escape, 1):
+            return escape
+        pos, lineno, colno = where
+        if escape[1:2] == b"u": # 与 json.loads 相同，\uXXXX 的错误位置指向 u
+            raise self._error_at("Invalid \\uXXXX escape", (pos + 1, lineno, colno + 1))
+        raise self._error_at("Invalid \\escape", where)
+
+    def _newline(self, depth):
+        return b"\n" + _INDENT * depth
+
+    def _begin_value(self, out, pos):
+        # 新的值开始前的处理：顶层多值换行、空容器判断后补出的换行缩进
+        if self._state == _AFTER and not self._stack:
+            if not self.multiple:
+                raise self._error("Extra data", pos)
+            out.append(b"\n") # 顶层出现下一个值（JSONL）
+            self._top_level_values += 1
+        elif self._state != _VALUE:
+            raise self._error("Unexpected value", pos)
+        if self._pending_open:
+            if self.pretty:
+                out.append(self._newline(len(self._stack)))
+            self._pending_open = False
+
+    def feed(self, chunk):
+        # 处理一块输入字节，返回对应的输出字节
+        out = []
+        pos = 0
+        end = len(chunk)
+        pretty = self.pretty
+        stack = self._stack
+
+        self._chunk = chunk
+        if self._scalar is not None and pos < end:
+            match = _TOKEN_RE.match(chunk, 0)
+            if match and match.lastindex in (7, 9) and match.start(match.lastindex) == 0: # 标量跨块：接上本块开头的部分
+                self._scalar.append(match.group(match.lastindex))
+                pos = match.end()
+            if pos < end:
+                out.append(self._finish_scalar())
+
+        while pos < end:
+            if self._in_string:
+                if self._escape is not None: # 接上跨块的转义序列
+                    escape = self._escape
+                    size = 6 if escape[1:2] == b"u" or (len(escape) == 1 and chunk[pos:pos + 1] == b"u") else 2
+                    take = min(size - len(escape), end - pos)
+                    escape += chunk[pos:pos + take]
+                    pos += take
+                    if len(escape) < size:
+                        self._escape = escape
+                        continue
+                    out.append(self._check_escape(escape, self._escape_at))
+                    self._escape = None
+                    continue
+                match = _STRING_SPECIAL_RE.search(chunk, pos)
+                if match is None:
+                    out.append(chunk[pos:])
+                    pos = end
+                    break
+                j = match.start()
+                if chunk[j] == 0x5C: # 反斜杠：转义序列完整时校验后原样保留，否则暂存到下一块
+                    out.append(chunk[pos:j])
+                    size = 6 if chunk[j + 1:j + 2] == b"u" else 2
+                    if j + size <= end:
+                        out.append(self._check_escape(chunk[j:j + size], self._where(j)))
+                        pos = j + size
+                    else:
+                        self._escape = chunk[j:]
+                        self._escape_at = self._where(j)
+                        pos = end
+                    continue
+                if chunk[j] != 0x22: # 未转义的控制字符（包括换行）
+                    raise self._error("Invalid control character at", j)
+                out.append(chunk[pos:j + 1])
+                pos = j + 1
+                self._in_string = False
+                continue
+
+            for match in _TOKEN_RE.finditer(chunk, pos):
+                group = match.lastindex
+                if group == 6: # 对象键 + 冒号
+                    if self._state != _KEY:
+                        raise self._error("Unexpected ':'", match.start(6))
+                    if self._pending_open:
+                        if pretty:
+                            out.append(self._newline(len(stack)))
+                        self._pending_open = False
+                    out.append(match.group(5) + b": " if pretty else match.group(5) + b":")
+                    self._state = _VALUE
+                elif group == 5 or group == 8: # 字符串
+                    if self._state == _KEY:
+                        if self._pending_open:
+                            if pretty:
+                                out.append(self._newline(len(stack)))
+                            self._pending_open = False
+                        self._state = _COLON
+                    else:
+                        self._begin_value(out, match.start(group))
+                        self._state = _AFTER
+                    out.append(match.group(group))
+                    if group == 8: # 字符串跨块：转入字符串模式处理余下部分
+                        self._in_string = True
+                        pos = match.end()
+                        break
+                elif group == 4: # 冒号
+                    if self._state != _COLON:
+                        raise self._error("Unexpected ':'", match.start(4))
+                    out.append(b": " if pretty else b":")
+                    self._state = _VALUE
+                elif group == 3: # 逗号
+                    if self._state != _AFTER or not stack:
+                        raise self._error("Unexpected ','", match.start(3))
+                    out.append(b"," + self._newline(len(stack)) if pretty else b",")
+                    self._state = _KEY if stack[-1] == b"{" else _VALUE
+                elif group == 7 or group == 9: # 标量
+                    self._begin_value(out, match.start(group))
+                    self._state = _AFTER
+                    if match.end() == end: # 可能在下一块继续，完整后再校验
+                        self._scalar = [match.group(group)]
+                        self._scalar_at = self._where(match.start(group))
+                    elif group == 7:
+                        out.append(match.group(7))
+                    else:
+                        raise self._error("Expecting value", match.start(9))
+                elif group == 1: # 开括号
+                    self._begin_value(out, match.start(1))
+                    opening = match.group(1)
+                    out.append(opening)
+                    stack.append(opening)
+                    self._pending_open = True
+                    self._state = _KEY if opening == b"{" else _VALUE
+                else: # 闭括号
+                    closing = match.group(2)
+                    if not stack or (stack[-1] == b"{") != (closing == b"}"):
+                        raise self._error(f"Unexpected '{closing.decode()}'", match.start(2))
+                    if self._pending_open:
+                        self._pending_open = False # 空容器："[]" / "{}"
+                    elif self._state != _AFTER:
+                        raise self._error(f"Unexpected '{closing.decode()}'", match.start(2))
+                    elif pretty:
+                        out.append(self._newline(len(stack) - 1))
+                    out.append(closing)
+                    stack.pop()
+                    self._state = _AFTER
+            else:
+                break # 剩余部分只有空白
+
+        lines = chunk.count(b"\n")
+        if lines:
+            self._line += lines
+            self._line_start = self._offset + chunk.rfind(b"\n") + 1
+        self._offset += end
+        self._chunk = b""
+        return b"".join(out)
+
+    def close(self):
+        # 输入结束时检查是否完整，返回最后一个尚未输出的标量
+        tail = self._finish_scalar() if self._scalar is not None else b""
+        if self._in_string:
+            raise self._error("Unterminated string", 0) # 包括以不完整的转义序列结束
+        if self._stack:
+            raise self._error(f"Unclosed '{self._stack[-1].decode()}'", 0)
+        if self._state == _VALUE and self._top_level_values == 0:
+            raise self._error("Empty input", 0)
+        if self._state != _AFTER:
+            raise self._error("Unexpected end of input", 0)
+        return tail
+
+
+def iter_reformat(chunks, pretty=False, multiple=True):
+    # chunks：字节块的可迭代对象；逐块产出转换结果
+    reformatter = JsonReformatter(pretty=pretty, multiple=multiple)
+    for chunk in chunks:
+        data = reformatter.feed(chunk)
+        if data:
+            yield data
+    tail = reformatter.close()
+    if tail:
+        yield tail
+
+
+def reformat_text(text, pretty=False, multiple=True):
+    return b"".join(iter_reformat([text.encode("utf-8")], pretty=pretty, multiple=multiple)).decode("utf-8")
+
+
+def _read_chunks(fp, chunk_size=DEFAULT_CHUNK_SIZE):
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+# ----------------- 命令行入口 -----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="流式转换 JSON / JSON-LD 的紧凑与缩进格式")
+    parser.add_argument("path", nargs="?", default="-", help="输入文件，默认标准输入")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，默认标准输出")
+    parser.add_argument("--pretty", action="store_true", help="输出缩进格式（默认输出紧凑格式）")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="每次读取的字节数")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for data in iter_reformat(_read_chunks(source, args.chunk_size), pretty=args.pretty):
+            out.write(data)
+        out.write(b"\n")
+    except ValueError as e:
+        print(f"转换失败：{e}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if out is not sys.stdout.buffer:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+# engine/schema_fields.py
+# 各 Schema 类型的常用字段路径，结构化生成器页面与批量商品目录生成共用
+SCHEMA_FIELDS = {
+    "Product": ["name", "image", "description", "sku", "brand.name", "offers.price", "offers.priceCurrency"],
+    "Article": ["headline", "author.name", "datePublished", "image", "articleBody"],
+    "Organization": ["name", "url", "logo", "contactPoint.telephone", "contactPoint.contactType"],
+    "Event": ["name", "startDate", "endDate", "location.name", "location.address", "organizer.name"],
+    "Person": ["name", "jobTitle", "worksFor.name"],
+    "FAQPage": ["mainEntity[0].question", "mainEntity[0].acceptedAnswer.text"], # 简化处理，只显示第一个Q&A
+    "Review": ["author", "reviewBody", "reviewRating.ratingValue"],
+    "Recipe": ["name", "recipeIngredient", "recipeInstructions", "cookTime"],
+    "Service": ["name", "serviceType", "provider.name", "areaServed"],
+    "SoftwareApplication": ["name", "applicationCategory", "operatingSystem"],
+    "VideoObject": ["name", "description", "uploadDate", "thumbnailUrl"]
+}
@@ -0,0 +1,219 @@
+# engine/schema_validator.py
+# schema.org 校验引擎：把本地词表编译成「类型 → 允许/必填/推荐属性」规则表（继承已展开），单次遍历校验文档
+import hashlib
+import json
+import os
+import pickle
+from functools import lru_cache
+
+from .graph import GraphIndex, local_name as _local_name, type_names as _type_names
+
+VOCAB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "schemaorg-vocab.jsonld")
+CACHE_DIR = os.environ.get("SDA_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "structured_data_assistant")
+
+_ACTION_ANNOTATION_SUFFIXES = ("-input", "-output") # 如 potentialAction 中的 query-input，不属于词表属性
+
+# ----------------- 必填 / 推荐字段（参考 Google 富媒体结果要求，子类型自动继承） -----------------
+REQUIRED_FIELDS = {
+    "Product": ["name"],
+    "Offer": ["price", "priceCurrency"],
+    "Article": ["headline"],
+    "LocalBusiness": ["name", "address"],
+    "Event": ["name", "startDate", "location"],
+    "FAQPage": ["mainEntity"],
+    "Question": ["name", "acceptedAnswer"],
+    "Answer": ["text"],
+    "HowTo": ["name", "step"],
+    "JobPosting": ["title", "description", "datePosted", "hiringOrganization", "jobLocation"],
+    "ImageObject": ["contentUrl"],
+    "VideoObject": ["name", "thumbnailUrl", "uploadDate"],
+    "SoftwareApplication": ["name"],
+    "BreadcrumbList": ["itemListElement"],
+    "Review": ["author"],
+    "Person": ["name"],
+    "Recipe": ["name", "image"],
+}
+
+RECOMMENDED_FIELDS = {
+    "Product": ["image", "description", "sku", "brand", "offers", "aggregateRating", "review"],
+    "Offer": ["availability", "url"],
+    "Article": ["image", "author", "datePublished", "dateModified"],
+    "Organization": ["name", "url", "logo", "sameAs", "contactPoint"],
+    "LocalBusiness": ["telephone", "geo", "openingHoursSpecification", "url"],
+    "Event": ["endDate", "description", "image", "offers", "organizer", "eventStatus"],
+    "JobPosting": ["validThrough", "employmentType", "baseSalary"],
+    "VideoObject": ["description", "contentUrl", "duration"],
+    "SoftwareApplication": ["offers", "aggregateRating", "operatingSystem", "applicationCategory"],
+    "WebSite": ["name", "url"],
+    "ListItem": ["position"],
+    "Review": ["reviewRating", "reviewBody"],
+    "Recipe": ["recipeIngredient", "recipeInstructions", "cookTime"],
+}
+
+
+def _ref_names(value):
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    return [_local_name(v["@id"]) for v in value if isinstance(v, dict) and "@id" in v]
+
+
+# ----------------- 词表编译 -----------------
+def compile_vocabulary(vocab_path=VOCAB_FILE):
+    # 返回可直接 pickle 的规则表：{"types": {类型: (允许属性, 必填, 推荐)}, "properties": {属性: 替代属性或 None}}
+    with open(vocab_path, "r", encoding="utf-8") as f:
+        graph = json.load(f)["@graph"]
+
+    parents = {}
+    property_domains = {}
+    superseded = {}
+    for node in graph:
+        name = _local_name(node["@id"])
+        node_types = node["@type"] if isinstance(node["@type"], list) else [node["@type"]]
+        if "rdfs:Class" in node_types:
+            parents[name] = _ref_names(node.get("rdfs:subClassOf"))
+        if "rdf:Property" in node_types:
+            property_domains[name] = _ref_names(node.get("schema:domainIncludes"))
+            replaced_by = _ref_names(node.get("schema:supersededBy"))
+            superseded[name] = replaced_by[0] if replaced_by else None
+
+    # 展开多重继承：每个类型的祖先集合（含自身）
+    ancestors = {}
+
+    def resolve(name, visiting=()):
+        if name not in ancestors:
+            result = {name}
+            for parent in parents.get(name, []):
+                if parent in parents and parent not in visiting:
+                    result |= resolve(parent, visiting + (name,))
+            ancestors[name] = frozenset(result)
+        return ancestors[name]
+
+    properties_by_domain = {}
+    for prop, domains in property_domains.items():
+        for domain in domains:
+            properties_by_domain.setdefault(domain, set()).add(prop)
+
+    types = {}
+    for name in parents:
+        lineage = resolve(name)
+        allowed = set()
+        required = []
+        recommended = []
+        for ancestor in lineage:
+            allowed |= properties_by_domain.get(ancestor, set())
+            required.extend(f for f in REQUIRED_FIELDS.get(ancestor, []) if f not in required)
+            recommended.extend(f for f in RECOMMENDED_FIELDS.get(ancestor, []) if f not in recommended)
+        recommended = [f for f in recommended if f not in required]
+        types[name] = (frozenset(allowed), tuple(sorted(required)), tuple(sorted(recommended)))
+    return {"types": types, "properties": superseded}
+
+
+def _cache_path(vocab_path, cache_dir):
+    # 缓存键包含词表文件的大小、修改时间以及规则表内容，任一变化都会重新编译
+    stat = os.stat(vocab_path)
+    rules = json.dumps([REQUIRED_FIELDS, RECOMMENDED_FIELDS], sort_keys=True)
+    key = hashlib.sha1(f"{os.path.abspath(vocab_path)}:{stat.st_size}:{stat.st_mtime_ns}:{rules}".encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"schemaorg-index-{key}.pickle")
+
+
+@lru_cache(maxsize=4)
+def load_schema_index(vocab_path=VOCAB_FILE, cache_dir=CACHE_DIR):
+    # 每个进程只加载一次；优先读取磁盘缓存，缓存缺失或不可写时直接编译
+    cache_file = _cache_path(vocab_path, cache_dir)
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    index = compile_vocabulary(vocab_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file) # 原子替换，避免并发进程读到半个文件
+    except OSError:
+        pass
+    return index
+
+
+# ----------------- 文档校验 -----------------
+def validate_jsonld(data, index=None, graph=None):
+    # 返回问题列表：{"level", "path", "message"}，先是各实体的问题（按文档顺序），然后是找不到定义的引用
+    # graph：同一文档的 GraphIndex，可复用调用方已建好的索引，整篇文档只遍历一次
+    graph = graph if graph is not None else GraphIndex(data)
+    return validate_graph(graph, index) + dangling_issues(graph.dangling)
+
+
+def validate_graph(graph, index=None):
+    # 按文档顺序逐个检查节点索引中的实体（含 @graph 与嵌套实体）
+    # 必填字段对所有实体检查；推荐字段只对顶层实体（根节点或 @graph 成员）检查，避免嵌套的作者、机构等产生噪音
+    # 指向已定义节点的引用不重复校验；同一 @id 分多处定义时按合并后的属性检查必填 / 推荐字段，只在第一处带类型的定义报告
+    index = index or load_schema_index()
+    type_rules = index["types"]
+    properties = index["properties"]
+    issues = []
+    for node in graph.nodes():
+        node_types = _type_names(node.get("@type"))
+        if not node_types:
+            continue
+        found = [] # (级别, 属性名或 None, 说明)；有问题时才格式化节点路径
+
+        rules = []
+        for type_name in node_types:
+            rule = type_rules.get(type_name)
+            if rule is None:
+                found.append(("error", None, f"未知的 schema.org 类型 `{type_name}`"))
+            else:
+                rules.append((type_name, rule))
+
+        if rules:
+            allowed = rules[0][1][0] if len(rules) == 1 else frozenset().union(*(r[0] for _, r in rules))
+            type_label = "/".join(t for t, _ in rules)
+            present = set()
+            for key in node:
+                if key.startswith("@"):
+                    continue
+                prop = _local_name(key)
+                present.add(prop)
+                if prop.endswith(_ACTION_ANNOTATION_SUFFIXES):
+                    continue
+                if prop not in properties:
+                    found.append(("error", key, f"未知的 schema.org 属性 `{prop}`"))
+                    continue
+                if prop not in allowed:
+                    found.append(("warning", key, f"属性 `{prop}` 不适用于类型 `{type_label}`"))
+                if properties[prop]:
+                    found.append(("warning", key, f"属性 `{prop}` 已被 `{properties[prop]}` 取代"))
+            node_id = node.get("@id")
+            if isinstance(node_id, str):
+                definitions = graph.definitions(node_id)
+                if len(definitions) > 1:
+                    if next(d for d in definitions if "@type" in d) is not node:
+                        rules = [] # 必填 / 推荐字段已在第一处带类型的定义按合并结果检查过
+                    present.update(_local_name(k) for k in graph.get(node_id) if not k.startswith("@"))
+            for _, (_, required, recommended) in rules:
+                for field in required:
+                    if field not in present:
+                        found.append(("error", None, f"`{type_label}` 缺少必填字段 `{field}`"))
+                if recommended and graph.is_top_level(node):
+                    for field in recommended:
+                        if field not in present:
+                            found.append(("warning", None, f"`{type_label}` 建议包含字段 `{field}`"))
+
+        if found:
+            path = graph.path_of(node)
+            for level, key, message in found:
+                where = (f"{path}.{key}" if path else key) if key else (path or "@type")
+                issues.append({"level": level, "path": where, "message": message})
+    return issues
+
+
+def dangling_issues(dangling):
+    # dangling：[(路径, @id)]。文档内引用（#片段形式的 @id）找不到定义时告警；指向其他页面的绝对 URL 引用是正常用法，不报告
+    return [
+        {"level": "warning", "path": path, "message": f"引用的 `@id` `{node_id}` 未在文档中定义"}
+        for path, node_id in dangling if node_id.startswith("#")
+    ]
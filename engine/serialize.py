@@ -0,0 +1,154 @@
+# engine/serialize.py
+# 序列化层：预览、格式转换、AI 提示词和批量导出统一从这里输出 JSON。
+# 安装了 orjson 时优先使用，否则回退到标准库；两种后端对紧凑 / 缩进两种格式的输出逐字节一致：
+#   紧凑 == json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+#   缩进 == json.dumps(obj, ensure_ascii=False, indent=2)
+# 可用环境变量 SDA_JSON_BACKEND=json 强制使用标准库
+import json
+import os
+
+try:
+    import orjson
+except ImportError: # 可选依赖
+    orjson = None
+
+_INDENT = b"  "
+_backend = None
+
+
+# ----------------- 后端选择 -----------------
+def available_backends():
+    return ["orjson", "json"] if orjson is not None else ["json"]
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        preferred = os.environ.get("SDA_JSON_BACKEND", "").strip().lower()
+        _backend = preferred if preferred in available_backends() else available_backends()[0]
+    return _backend
+
+
+def set_backend(name):
+    global _backend
+    if name not in available_backends():
+        raise ValueError(f"JSON backend '{name}' is not available (installed: {', '.join(available_backends())})")
+    _backend = name
+
+
+# ----------------- 标准库实现 -----------------
+def _json_dumps(obj, pretty, sort_keys):
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2, sort_keys=sort_keys)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys)
+
+
+# ----------------- orjson 实现 -----------------
+def _floats_compatible(obj):
+    # orjson 对 NaN / Infinity 输出 null，对 >=1e16 或 <1e-4 的浮点数使用 1e16 而不是 1e+16 的写法；
+    # 出现这类浮点数时交给标准库，其余数值的最短表示两者相同
+    if type(obj) is float:
+        return obj == 0.0 or 1e-4 <= abs(obj) < 1e16
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        type_ = type(value)
+        if type_ is not dict and type_ is not list and type_ is not tuple:
+            continue
+        for item in (value.values() if type_ is dict else value):
+            item_type = type(item)
+            if item_type is dict or item_type is list or item_type is tuple:
+                stack.append(item)
+            elif item_type is float and not (item == 0.0 or 1e-4 <= abs(item) < 1e16):
+                return False
+    return True
+
+
+def _orjson_dumps(obj, pretty, sort_keys):
+    # 无法保证与标准库一致时返回 None：非字符串键、超出 64 位的整数、孤立代理字符、容器子类等
+    # orjson 会直接抛出 TypeError，由调用方回退
+    if not _floats_compatible(obj):
+        return None
+    option = orjson.OPT_PASSTHROUGH_SUBCLASS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    try:
+        return orjson.dumps(obj, option=option)
+    except TypeError: # orjson.JSONEncodeError 是 TypeError 的子类
+        return None
+
+
+# ----------------- 对外接口 -----------------
+def dumps_bytes(obj, pretty=False, sort_keys=False):
+    # 返回 UTF-8 字节串，适合直接写文件或作为下载内容
+    if get_backend() == "orjson":
+        data = _orjson_dumps(obj, pretty, sort_keys)
+        if data is not None:
+            return data
+    return _json_dumps(obj, pretty, sort_keys).encode("utf-8")
+
+
+def dumps(obj, pretty=False, sort_keys=False):
+    if get_backend() == "orjson":
+        data = _orjson_dumps(obj, pretty, sort_keys)
+        if data is not None:
+            return data.decode("utf-8")
+    return _json_dumps(obj, pretty, sort_keys)
+
+
+def _encode_key(key):
+    if type(key) is str:
+        return dumps_bytes(key)
+    # 非字符串键按标准库规则转换（1 -> "1"，True -> "true"，None -> "null"）
+    return _json_dumps({key: 0}, False, False)[1:-3].encode("utf-8")
+
+
+def _iter_pieces(obj, pretty, level, depth):
+    type_ = type(obj)
+    is_dict = type_ is dict
+    if depth <= 0 or not obj or not (is_dict or type_ is list or type_ is tuple):
+        data = dumps_bytes(obj, pretty=pretty)
+        # 单独编码的值按所在层级补足缩进；字符串中的换行已转义为 \n，不会被误替换
+        yield data.replace(b"\n", b"\n" + _INDENT * level) if pretty and level else data
+        return
+    opening, closing = (b"{", b"}") if is_dict else (b"[", b"]")
+    if pretty:
+        inner = b"\n" + _INDENT * (level + 1)
+        separator, colon = b"," + inner, b": "
+        yield opening + inner
+    else:
+        separator, colon = b",", b":"
+        yield opening
+    for i, item in enumerate(obj.items() if is_dict else obj):
+        if i:
+            yield separator
+        if is_dict:
+            key, item = item
+            yield _encode_key(key) + colon
+        yield from _iter_pieces(item, pretty, level + 1, depth - 1)
+    yield b"\n" + _INDENT * level + closing if pretty else closing
+
+
+def iter_dumps(obj, pretty=False, chunk_size=64 * 1024, stream_depth=2):
+    # 分段产出 UTF-8 字节，拼接结果与 dumps_bytes 完全相同；
+    # 外层 stream_depth 层容器（如顶层对象和其中的 @graph 列表）逐个元素编码，
+    # 导出超大 @graph 时不需要在内存中拼出完整字符串
+    buffer = []
+    size = 0
+    for piece in _iter_pieces(obj, pretty, 0, stream_depth):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def dump(obj, fp, pretty=False):
+    # fp 为二进制文件对象
+    for chunk in iter_dumps(obj, pretty=pretty):
+        fp.write(chunk)
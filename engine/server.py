@@ -0,0 +1,371 @@
+# engine/server.py
+# 本地 HTTP 服务：把生成、诊断、对比和字段路径提取以 JSON 接口提供给 CMS / 发布流水线调用，只依赖标准库（asyncio）。
+# 事件循环只负责收发 HTTP（支持 keep-alive 和管线化请求），请求体的解析、计算和响应序列化都在进程池中完成；
+# 所有进程繁忙时新请求按接口排队，任一批完成后合成一批提交，大量小请求共用一次进程间调用
+#
+# 用法示例：
+#   python -m engine.server --port 8765 --workers 4
+#   curl -s localhost:8765/validate -d '{"text": "{\"@context\": \"https://schema.org\", \"@type\": \"Product\"}", "schema": true}'
+#
+# 接口（POST，请求与响应均为 JSON 对象）：
+#   /generate  {"type", "fields": {字段路径: 值}, "context"?}            -> {"data", "warnings"}
+#   /validate  {"text" 或 "data", "schema"?}                            -> {"valid", "warnings", "issues"?, "error"?}
+#   /diff      {"old" 或 "old_text", "new" 或 "new_text", "nodes"?}     -> {"ops", "nodes"?}
+#   /paths     {"data" 或 "text", "values"?}                            -> {"paths", "values"?}
+#   GET /health、GET /metrics（Prometheus 文本格式，需用 --metrics 或 SDA_METRICS=1 启用计时）
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+
+from . import metrics
+from .batch_diagnose import diagnose_record
+from .core import build_nested_json, flatten_json, get_all_paths
+from .diff import diff_json
+from .serialize import dumps
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH = 64
+BATCH_BYTES = 256 * 1024          # 一批请求体的总大小上限，超过该大小的请求单独提交
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 32 * 1024 * 1024
+IDLE_TIMEOUT = 30                 # keep-alive 连接的空闲超时（秒）
+JSON_TYPE = "application/json; charset=utf-8"
+
+
+# ----------------- 接口实现（在子进程中执行） -----------------
+def _document(request, key, text_key):
+    # 取请求中的 JSON 值：key 为已解析的对象，text_key 为 JSON 文本
+    if key in request:
+        return request[key]
+    if text_key in request:
+        text = request[text_key]
+        if not isinstance(text, str):
+            raise ValueError(f"'{text_key}' must be a string")
+        return json.loads(text)
+    raise ValueError(f"Request must contain '{key}' or '{text_key}'")
+
+
+def handle_generate(request):
+    schema_type = request.get("type")
+    fields = request.get("fields")
+    if not isinstance(schema_type, str) or not schema_type:
+        raise ValueError("'type' must be a non-empty string")
+    if not isinstance(fields, dict):
+        raise ValueError("'fields' must be an object of {field path: value}")
+    warnings = []
+    data = {"@context": request.get("context", "https://schema.org"), "@type": schema_type}
+    data.update(build_nested_json(fields, warn=warnings.append))
+    return {"data": data, "warnings": warnings}
+
+
+def handle_validate(request):
+    if "text" in request:
+        text = request["text"]
+        if not isinstance(text, str):
+            raise ValueError("'text' must be a string")
+    elif "data" in request:
+        text = dumps(request["data"])
+    else:
+        raise ValueError("Request must contain 'text' or 'data'")
+    return diagnose_record(text, bool(request.get("schema", False)))
+
+
+def handle_diff(request):
+    old = _document(request, "old", "old_text")
+    new = _document(request, "new", "new_text")
+    result = {"ops": diff_json(old, new)}
+    if request.get("nodes"):
+        from .graph import GraphIndex, diff_nodes
+        result["nodes"] = diff_nodes(GraphIndex(old), GraphIndex(new))
+    return result
+
+
+def handle_paths(request):
+    data = _document(request, "data", "text")
+    result = {"paths": get_all_paths(data)}
+    if request.get("values"):
+        result["values"] = flatten_json(data)
+    return result
+
+
+HANDLERS = {
+    "generate": handle_generate,
+    "validate": handle_validate,
+    "diff": handle_diff,
+    "paths": handle_paths,
+}
+ROUTES = {f"/{op}": op for op in HANDLERS}
+
+
+def _error(message):
+    return dumps({"error": message}).encode("utf-8")
+
+
+def handle_body(op, body):
+    # 返回 (状态码, 响应体)；任何异常都只转换为这一个请求的 400 / 500，不影响同一批中的其他请求
+    try:
+        request = json.loads(body) if body else {}
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        return 400, _error(f"Invalid JSON body: {e}")
+    except RecursionError:
+        return 400, _error("Invalid JSON body: nested too deeply")
+    if not isinstance(request, dict):
+        return 400, _error("Request body must be a JSON object")
+    try:
+        return 200, dumps(HANDLERS[op](request)).encode("utf-8")
+    except ValueError as e:
+        return 400, _error(str(e))
+    except RecursionError:
+        return 400, _error("Request data is nested too deeply")
+    except Exception as e:
+        return 500, _error(f"{type(e).__name__}: {e}")
+
+
+def run_batch(op, bodies):
+    results = []
+    for body in bodies:
+        try:
+            results.append(handle_body(op, body))
+        except Exception as e: # 兜底：单个请求的意外错误不能让整批失败
+            results.append((500, _error(f"{type(e).__name__}: {e}")))
+    return results
+
+
+def _init_worker():
+    # 子进程启动时预先加载 schema.org 词表，第一个 schema 诊断请求不必等待
+    from .schema_validator import load_schema_index
+    load_schema_index()
+
+
+# ----------------- 微批处理 -----------------
+class MicroBatcher:
+    def __init__(self, pool, slots, max_batch=DEFAULT_MAX_BATCH, batch_bytes=BATCH_BYTES, restart=None):
+        # pool 为 None 时在事件循环所在进程内直接计算；slots 为同时在途的批次数（通常等于进程数）；
+        # restart(旧进程池) 返回新的进程池，子进程意外退出导致进程池损坏时调用，之后的请求提交到新进程池
+        self._pool = pool
+        self._slots = slots
+        self._restart = restart
+        self.max_batch = max_batch
+        self.batch_bytes = batch_bytes
+        self._running = 0
+        self._pending = {} # 接口 -> deque[(请求体, future)]，各接口轮流出批
+        self._tasks = set()
+        self.requests = 0
+        self.batches = 0
+        self.restarts = 0
+
+    def submit(self, op, body):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(op, deque()).append((body, future))
+        self.requests += 1
+        self._dispatch()
+        return future
+
+    def _dispatch(self):
+        # 有空闲的进程时立即提交（低负载下没有额外等待）；否则请求留在队列中，等前一批完成后合并提交
+        while self._running < self._slots and self._pending:
+            op = next(iter(self._pending))
+            queue = self._pending.pop(op)
+            items = []
+            size = 0
+            while queue and len(items) < self.max_batch:
+                body = queue[0][0]
+                if items and size + len(body) > self.batch_bytes:
+                    break
+                items.append(queue.popleft())
+                size += len(body)
+            if queue:
+                self._pending[op] = queue # 放到末尾，其他接口的请求先出批
+            self._running += 1
+            self.batches += 1
+            task = asyncio.ensure_future(self._run(op, items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, op, items):
+        bodies = [body for body, _ in items]
+        pool = self._pool
+        try:
+            if pool is None:
+                results = run_batch(op, bodies)
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(pool, run_batch, op, bodies)
+        except BrokenProcessPool as e:
+            # 子进程意外退出：这一批返回 500（不重试，避免同一请求反复使进程崩溃），
+            # 重建进程池后继续服务；同时在途的其他批次只由第一个发现的批次重建一次
+            results = [(500, _error(f"{type(e).__name__}: {e}"))] * len(items)
+            if self._restart is not None and pool is self._pool:
+                self._pool = self._restart(pool)
+                self.restarts += 1
+        except Exception as e: # 其他进程池异常时整批返回 500
+            results = [(500, _error(f"{type(e).__name__}: {e}"))] * len(items)
+        finally:
+            self._running -= 1
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+        self._dispatch()
+
+
+# ----------------- HTTP 服务 -----------------
+def _response(status, body, content_type=JSON_TYPE, keep_alive=True, extra_headers=()):
+    head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", f"Content-Type: {content_type}", f"Content-Length: {len(body)}"]
+    head.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    head.extend(extra_headers)
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+class EngineServer:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, max_batch=DEFAULT_MAX_BATCH,
+                 idle_timeout=IDLE_TIMEOUT, max_body=MAX_BODY_SIZE):
+        # workers=0 时不启动进程池，在事件循环所在进程内计算（调试或单核环境）
+        self.host = host
+        self.port = port
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_batch = max_batch
+        self.idle_timeout = idle_timeout
+        self.max_body = max_body
+        self.batcher = None
+        self._pool = None
+        self._server = None
+
+    def _restart_pool(self, broken):
+        # 进程池损坏（子进程被杀或崩溃）后换一个新的，子进程在第一次提交时再启动
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._pool
+
+    async def start(self):
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            # 预先启动全部子进程，避免第一批请求承担启动开销
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*[loop.run_in_executor(self._pool, run_batch, "paths", []) for _ in range(self.workers)])
+        self.batcher = MicroBatcher(self._pool, max(1, self.workers), self.max_batch, restart=self._restart_pool)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port, limit=MAX_HEADER_SIZE)
+        self.port = self._server.sockets[0].getsockname()[1] # port=0 时取实际分配的端口
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(_response(431, _error("Request header too large"), keep_alive=False))
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                    headers = {}
+                    for line in lines[1:]:
+                        if line:
+                            name, _, value = line.partition(":")
+                            headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    writer.write(_response(400, _error("Malformed request"), keep_alive=False))
+                    break
+                if "chunked" in headers.get("transfer-encoding", "").lower():
+                    writer.write(_response(411, _error("Chunked request bodies are not supported, send Content-Length"), keep_alive=False))
+                    break
+                if length > self.max_body or length < 0:
+                    writer.write(_response(413, _error(f"Request body exceeds {self.max_body} bytes"), keep_alive=False))
+                    break
+                if length and headers.get("expect", "").lower() == "100-continue":
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                writer.write(await self._dispatch(method, target.split("?", 1)[0], body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body, keep_alive):
+        op = ROUTES.get(path)
+        if op is not None:
+            if method != "POST":
+                return _response(405, _error("Use POST"), keep_alive=keep_alive, extra_headers=("Allow: POST",))
+            start = time.perf_counter()
+            status, payload = await self.batcher.submit(op, body)
+            metrics.record(f"api.{op}", time.perf_counter() - start)
+            return _response(status, payload, keep_alive=keep_alive)
+        if path == "/health" and method == "GET":
+            stats = {"status": "ok", "workers": self.workers, "requests": self.batcher.requests, "batches": self.batcher.batches,
+                     "pool_restarts": self.batcher.restarts}
+            return _response(200, dumps(stats).encode("utf-8"), keep_alive=keep_alive)
+        if path == "/metrics" and method == "GET":
+            return _response(200, metrics.REGISTRY.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4", keep_alive)
+        return _response(404, _error(f"Unknown endpoint: {method} {path}"), keep_alive=keep_alive)
+
+
+# ----------------- 命令行入口 -----------------
+async def serve(host, port, workers, max_batch):
+    server = await EngineServer(host, port, workers=workers, max_batch=max_batch).start()
+    print(f"引擎 HTTP 服务已启动：http://{server.host}:{server.port}（{server.workers} 个计算进程）", file=sys.stderr)
+    # 收到 SIGTERM / SIGINT 时正常退出并关闭进程池，不留下孤儿子进程
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, task.cancel)
+        except (NotImplementedError, RuntimeError): # Windows 不支持
+            pass
+    try:
+        await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="结构化数据引擎 HTTP 服务（生成 / 诊断 / 对比 / 字段路径）")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"监听地址，默认 {DEFAULT_HOST}")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"监听端口，默认 {DEFAULT_PORT}")
+    parser.add_argument("--workers", type=int, default=None, help="计算进程数，默认 CPU 核数；0 表示在服务进程内计算")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="每批最多合并的请求数")
+    parser.add_argument("--metrics", action="store_true", help="记录各接口耗时，可通过 GET /metrics 查看")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        metrics.enable()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_batch))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+# engine/snapshot_diff.py
+# 站点级快照对比：比较两次抓取结果（crawler 输出的 JSONL，url -> JSON-LD 块），找出新增、丢失、变化的页面
+#
+# 旧快照只在内存中保留「url -> (内容哈希, 文件偏移)」索引，新快照逐行流式读取；
+# 内容哈希相同的页面直接跳过，其余页面的结构化差异在进程池中并行计算。
+# 同一快照中重复出现的 URL 两边都以第一次出现的记录为准，重复的 URL 单独报告（duplicate_url）。
+#
+# 用法示例：
+#   python -m engine.snapshot_diff before.jsonl after.jsonl -o changes.jsonl --workers 8
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .diff import diff_json
+from .serialize import dumps, dumps_bytes
+
+DEFAULT_CHUNK_SIZE = 200
+
+
+def content_hash(blocks):
+    # 对 JSON-LD 块做规范化序列化后取哈希，与键顺序、缩进、抓取耗时等无关
+    canonical = dumps_bytes(blocks, sort_keys=True)
+    return hashlib.blake2b(canonical, digest_size=16).digest()
+
+
+# ----------------- 旧快照索引 -----------------
+def build_index(path):
+    # 返回 ({url: (哈希, 行偏移)}, [重复的 url])，同一 URL 出现多次时以第一次为准（与新快照一侧相同）
+    index = {}
+    duplicates = []
+    with open(path, "rb") as f:
+        offset = f.tell()
+        for line in iter(f.readline, b""):
+            if line.strip():
+                record = json.loads(line)
+                url = record["url"]
+                if url in index:
+                    duplicates.append(url)
+                else:
+                    index[url] = (content_hash(record.get("blocks", [])), offset)
+            offset = f.tell()
+    return index, duplicates
+
+
+def _read_blocks(f, offset):
+    f.seek(offset)
+    return json.loads(f.readline()).get("blocks", [])
+
+
+# ----------------- 子进程执行 -----------------
+def diff_chunk(pairs):
+    # pairs: [(url, 旧块列表, 新块列表)]，返回每个页面的差异记录
+    results = []
+    for url, old_blocks, new_blocks in pairs:
+        if not old_blocks:
+            status = "gained"
+        elif not new_blocks:
+            status = "lost"
+        else:
+            status = "changed"
+        results.append({"url": url, "status": status, "ops": diff_json(old_blocks, new_blocks)})
+    return results
+
+
+# ----------------- 快照对比 -----------------
+def diff_snapshots(old_path, new_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    # 产出差异记录：new_page / missing_page / gained / lost / changed / duplicate_url（带 snapshot: old / new）；
+    # 最后产出一条 {"summary": ...}
+    index, old_duplicates = build_index(old_path)
+    seen = set()
+    summary = {"unchanged": 0, "new_page": 0, "missing_page": 0, "gained": 0, "lost": 0, "changed": 0, "duplicate_url": 0}
+    for url in old_duplicates:
+        summary["duplicate_url"] += 1
+        yield {"url": url, "status": "duplicate_url", "snapshot": "old"}
+    workers = workers or os.cpu_count() or 1
+
+    with open(old_path, "rb") as old_file, open(new_path, "rb") as new_file, ProcessPoolExecutor(max_workers=workers) as pool:
+        running = set()
+        pending = []
+
+        def submit():
+            nonlocal pending
+            if pending:
+                running.add(pool.submit(diff_chunk, pending))
+                pending = []
+
+        def collect(return_when):
+            nonlocal running
+            done, running = wait(running, return_when=return_when)
+            for future in done:
+                for result in future.result():
+                    summary[result["status"]] += 1
+                    yield result
+
+        for line in new_file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            url = record["url"]
+            if url in seen:
+                summary["duplicate_url"] += 1
+                yield {"url": url, "status": "duplicate_url", "snapshot": "new"}
+                continue
+            seen.add(url)
+            new_blocks = record.get("blocks", [])
+            entry = index.get(url)
+            if entry is None:
+                summary["new_page"] += 1
+                yield {"url": url, "status": "new_page", "blocks": len(new_blocks)}
+                continue
+            if entry[0] == content_hash(new_blocks):
+                summary["unchanged"] += 1
+                continue
+            pending.append((url, _read_blocks(old_file, entry[1]), new_blocks))
+            if len(pending) >= chunk_size:
+                submit()
+                if len(running) >= workers * 2:
+                    yield from collect(FIRST_COMPLETED)
+        submit()
+        while running:
+            yield from collect(FIRST_COMPLETED)
+
+    for url in sorted(index.keys() - seen):
+        summary["missing_page"] += 1
+        yield {"url": url, "status": "missing_page"}
+    yield {"summary": summary}
+
+
+# ----------------- 命令行入口 -----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="对比两次抓取快照中的 JSON-LD 结构化数据")
+    parser.add_argument("old", help="旧快照 JSONL（crawler 输出）")
+    parser.add_argument("new", help="新快照 JSONL（crawler 输出）")
+    parser.add_argument("-o", "--output", default="-", help="差异报告 JSONL，默认标准输出")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="每个任务分块包含的页面数")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for record in diff_snapshots(args.old, args.new, workers=args.workers, chunk_size=args.chunk_size):
+            out.write(dumps(record) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    summary = record["summary"]
+    print(f"完成：未变化 {summary['unchanged']}，变化 {summary['changed']}，新增结构化数据 {summary['gained']}，"
+          f"丢失结构化数据 {summary['lost']}，新页面 {summary['new_page']}，缺失页面 {summary['missing_page']}，"
+          f"重复 URL {summary['duplicate_url']}"
+          f"（用时 {time.perf_counter() - start:.1f}s）", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
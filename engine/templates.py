@@ -0,0 +1,143 @@
+# engine/templates.py
+# 模板库：一次性加载 templates/ 下的模板文件，预解析 <script> 包裹的 JSON-LD，
+# 按 @type 和字段路径建立索引，文件修改后按 mtime 自动重新加载。
+# 格式错误的文件或模板会被跳过并记录在 errors 中，不影响其他模板；文件修改后重新尝试加载
+import json
+import os
+import threading
+import time
+
+from .core import flatten_json, get_all_paths
+from .extract import extract_jsonld_stream
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+
+
+def parse_template(name, source, script):
+    # 模板内容可以是 <script> 包裹的 JSON-LD，也可以直接是 JSON 文本
+    blocks = extract_jsonld_stream(script) if "<script" in script.lower() else [script]
+    data = json.loads(blocks[0]) if blocks else None
+    nodes = data if isinstance(data, list) else [data]
+    types = []
+    for node in nodes:
+        if isinstance(node, dict):
+            node_type = node.get("@type")
+            types.extend(node_type if isinstance(node_type, list) else [node_type] if node_type else [])
+    # 生成器预填用的扁平字段：取第一个实体，去掉由类型选择器决定的 @context / @type
+    first = nodes[0] if nodes and isinstance(nodes[0], dict) else {}
+    fields = {k: v for k, v in flatten_json(first).items() if k not in ("@context", "@type")}
+    return {
+        "name": name,
+        "source": source,
+        "script": script,
+        "data": data,
+        "types": types,
+        "fields": fields,
+        "paths": sorted(set(get_all_paths(data))),
+    }
+
+
+class TemplateRegistry:
+    def __init__(self, template_dir=TEMPLATE_DIR, check_interval=2.0):
+        # check_interval：两次检查文件 mtime 的最小间隔（秒），避免每次页面重跑都访问磁盘
+        self.template_dir = template_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._files = {} # 文件路径 -> (mtime_ns, [模板名])
+        self._state = ({}, {}, {}) # (模板名 -> 模板, 类型 -> [模板名], 字段路径 -> [模板名])，整体替换，读取时无需加锁
+        self.errors = {} # 文件路径 -> [错误描述]，包括整个文件无法读取和其中个别模板解析失败
+        self._last_check = 0.0
+        self.refresh(force=True)
+
+    # ----------------- 加载与热更新 -----------------
+    def _scan(self):
+        if not os.path.isdir(self.template_dir):
+            return {}
+        return {
+            entry.path: entry.stat().st_mtime_ns
+            for entry in os.scandir(self.template_dir)
+            if entry.is_file() and entry.name.lower().endswith(".json")
+        }
+
+    def refresh(self, force=False):
+        # 只重新解析 mtime 变化的文件；返回本次是否有变化
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+        with self._lock:
+            self._last_check = now
+            current = self._scan()
+            changed = [path for path, mtime in current.items() if self._files.get(path, (None,))[0] != mtime]
+            removed = [path for path in self._files if path not in current]
+            if not changed and not removed:
+                return False
+            # 在副本上重建，全部完成后一次性替换，出错时不会留下更新了一半的索引
+            files = dict(self._files)
+            templates = dict(self._state[0])
+            errors = {path: messages for path, messages in self.errors.items() if path in current and path not in changed}
+            for path in removed:
+                for name in files.pop(path)[1]:
+                    templates.pop(name, None)
+            for path in sorted(changed):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                    if not isinstance(raw, dict):
+                        raise ValueError("template file must be an object of {name: script}")
+                except (OSError, UnicodeDecodeError, ValueError) as e:
+                    # 整个文件无法读取：保留该文件上次成功加载的模板，文件再次修改后重试
+                    errors[path] = [f"{type(e).__name__}: {e}"]
+                    files[path] = (current[path], files.get(path, (None, []))[1])
+                    continue
+                for name in files.pop(path, (None, []))[1]:
+                    templates.pop(name, None)
+                names = []
+                for name, script in raw.items():
+                    try:
+                        if not isinstance(script, str):
+                            raise ValueError("template must be a string")
+                        templates[name] = parse_template(name, path, script)
+                    except (RecursionError, ValueError) as e: # 包括 json.JSONDecodeError
+                        errors.setdefault(path, []).append(f"{name}: {type(e).__name__}: {e}")
+                        continue
+                    names.append(name)
+                files[path] = (current[path], names)
+            self._files = files
+            self._state = (templates, *self._index(templates))
+            self.errors = errors
+            return True
+
+    @staticmethod
+    def _index(templates):
+        by_type = {}
+        by_path = {}
+        for name, template in templates.items():
+            for type_name in set(template["types"]) | {name}:
+                by_type.setdefault(type_name, []).append(name)
+            for path in template["paths"]:
+                by_path.setdefault(path, []).append(name)
+        return by_type, by_path
+
+    # ----------------- 查询 -----------------
+    def names(self):
+        self.refresh()
+        return list(self._state[0])
+
+    def get(self, name):
+        self.refresh()
+        return self._state[0].get(name)
+
+    def by_type(self, type_name):
+        # 模板名或模板中任一实体的 @type 匹配即返回，如 "Organization" 模板的实体类型为 Corporation
+        self.refresh()
+        templates, by_type, _ = self._state
+        return [templates[name] for name in by_type.get(type_name, [])]
+
+    def by_field(self, path):
+        # 查询包含某个字段路径（如 offers.price）的所有模板
+        self.refresh()
+        templates, _, by_path = self._state
+        return [templates[name] for name in by_path.get(path, [])]
+
+    def __len__(self):
+        return len(self._state[0])
@@ -0,0 +1,106 @@
+# engine/users.py
+# 用户存储：SQLite（WAL 模式）按行读写，用户名为主键索引，所有会话共享同一份数据，
+# 每次增删改都在单个事务内完成，多个管理员同时操作不会互相覆盖。
+# 首次启动时自动导入旧版 users.json。
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .metrics import timed
+
+
+class UserStore:
+    def __init__(self, path, legacy_json=None, default_users=None):
+        # legacy_json：旧版 users.json 路径，库为空时导入；default_users：{用户名: {"password", "is_admin"}}，库仍为空时写入，
+        # 也可以是返回该字典的函数，只在需要写入时才调用（初始密码的哈希计算较慢）
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL") # 读写互不阻塞，多进程部署也可共用
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            "username TEXT PRIMARY KEY, password TEXT NOT NULL, is_admin INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        if self.count() == 0:
+            users = {}
+            if legacy_json and os.path.exists(legacy_json):
+                with open(legacy_json, "r", encoding="utf-8") as f:
+                    users = json.load(f)
+            if not users and callable(default_users):
+                default_users = default_users()
+            self._import(users or default_users or {})
+
+    def _import(self, users):
+        now = time.time()
+        rows = [(name, info["password"], int(bool(info.get("is_admin"))), now, now) for name, info in users.items()]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany("INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+
+    def _write(self, sql, params):
+        # 单条写操作：BEGIN IMMEDIATE 立即取得写锁，返回受影响的行数
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rowcount = self._conn.execute(sql, params).rowcount
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return rowcount
+
+    # ----------------- 查询 -----------------
+    @timed("user_store.get")
+    def get(self, username):
+        # 返回 {"username", "password", "is_admin"}，不存在时返回 None
+        with self._lock:
+            row = self._conn.execute("SELECT username, password, is_admin FROM users WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return None
+        return {"username": row[0], "password": row[1], "is_admin": bool(row[2])}
+
+    @timed("user_store.list")
+    def list_users(self):
+        # 返回 [(用户名, 是否管理员)]，按创建顺序
+        with self._lock:
+            rows = self._conn.execute("SELECT username, is_admin FROM users ORDER BY created_at, rowid").fetchall()
+        return [(name, bool(is_admin)) for name, is_admin in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    # ----------------- 修改 -----------------
+    @timed("user_store.add")
+    def add(self, username, password_hash, is_admin=False):
+        # 用户已存在时返回 False
+        now = time.time()
+        return self._write(
+            "INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?, ?)", (username, password_hash, int(bool(is_admin)), now, now)
+        ) == 1
+
+    @timed("user_store.set_password")
+    def set_password(self, username, password_hash):
+        return self._write(
+            "UPDATE users SET password = ?, updated_at = ? WHERE username = ?", (password_hash, time.time(), username)
+        ) == 1
+
+    @timed("user_store.delete")
+    def delete(self, username):
+        # 在同一事务内检查，保证至少保留一个管理员；删除失败（用户不存在或为最后一个管理员）时返回 False
+        return self._write(
+            "DELETE FROM users WHERE username = ? AND "
+            "(is_admin = 0 OR (SELECT COUNT(*) FROM users WHERE is_admin = 1) > 1)",
+            (username,),
+        ) == 1
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,74 @@
+# tests/common.py
+# 测试共用：可复现的随机 JSON-LD 文档与随机修改（同一 seed 结果相同）
+import copy
+import random
+
+TYPES = ("Product", "Offer", "Organization", "Person", "Brand", "ListItem")
+KEYS = ("name", "sku", "price", "url", "description", "brand", "offers", "a/b", "c~d", "中文", "@id")
+SCALARS = ("", "x", "中文 \"引号\" \\ 反斜杠", "https://example.com/p?a=1", 0, -1, 42, 3.25, -0.5, 1e-7, 12345678901234567890, True, False, None)
+
+
+def random_value(rng, depth=0):
+    roll = rng.random()
+    if depth >= 4 or roll < 0.45:
+        return rng.choice(SCALARS)
+    if roll < 0.7:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return random_entity(rng, depth + 1)
+
+
+def random_entity(rng, depth=0):
+    entity = {"@type": rng.choice(TYPES)}
+    if rng.random() < 0.5:
+        entity["@id"] = f"#node-{rng.randint(0, 20)}"
+    for key in rng.sample(KEYS, rng.randint(0, 5)):
+        if key != "@id":
+            entity[key] = random_value(rng, depth)
+    return entity
+
+
+def random_document(rng):
+    # 单个实体，或带 @graph 的文档
+    if rng.random() < 0.5:
+        return {"@context": "https://schema.org", **random_entity(rng)}
+    return {"@context": "https://schema.org", "@graph": [random_entity(rng) for _ in range(rng.randint(0, 6))]}
+
+
+def _containers(value, found):
+    if isinstance(value, dict):
+        found.append(value)
+        for child in value.values():
+            _containers(child, found)
+    elif isinstance(value, list):
+        found.append(value)
+        for child in value:
+            _containers(child, found)
+    return found
+
+
+def mutate(doc, rng, edits=3):
+    # 返回修改后的副本：改值、删字段、加字段、插入 / 删除 / 打乱列表元素
+    doc = copy.deepcopy(doc)
+    for _ in range(edits):
+        target = rng.choice(_containers(doc, []))
+        roll = rng.random()
+        if isinstance(target, dict):
+            keys = [k for k in target if k != "@context"]
+            if keys and roll < 0.4:
+                target[rng.choice(keys)] = random_value(rng, 2)
+            elif keys and roll < 0.6:
+                del target[rng.choice(keys)]
+            else:
+                target[rng.choice(KEYS)] = random_value(rng, 2)
+        else:
+            if target and roll < 0.3:
+                del target[rng.randrange(len(target))]
+            elif target and roll < 0.5:
+                rng.shuffle(target)
+            else:
+                target.insert(rng.randint(0, len(target)), random_value(rng, 2))
+    return doc
+
+
+def seeds(count):
+    return [random.Random(seed) for seed in range(count)]
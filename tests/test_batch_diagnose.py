@@ -0,0 +1,43 @@
+# tests/test_batch_diagnose.py
+# 批量诊断：启用磁盘缓存时，每个文档的结果（包括错误的行列号）与不启用缓存时完全相同
+import pytest
+
+from engine.batch_diagnose import _diagnose_docs, iter_tasks, run_chunk
+
+DOCS = [
+    '{"x": }',
+    '\n\n\n{"x": }',
+    '  {"x": }  ',
+    '{"@context": "https://schema.org", "@type": "Product", "name": "A"}',
+    '\t{"@context": "https://schema.org", "@type": "Product", "name": "A"}\n',
+    '[1, 2',
+    '{"@context": "https://schema.org", "@type": "Product", "offers": {"@type": "Offer", "price": "x"}}',
+]
+
+
+@pytest.mark.parametrize("schema", [False, True])
+def test_cached_matches_uncached(tmp_path, schema):
+    docs = [(f"doc{i}", text) for i, text in enumerate(DOCS)]
+    expected = _diagnose_docs(docs, {"schema": schema, "cache": None})
+    options = {"schema": schema, "cache": str(tmp_path / "cache.db")}
+    assert _diagnose_docs(docs, options) == expected
+    assert _diagnose_docs(docs, options) == expected # 第二次全部命中缓存
+    assert _diagnose_docs(list(reversed(docs)), options) == list(reversed(expected))
+
+
+def test_leading_whitespace_changes_error_position(tmp_path):
+    options = {"schema": False, "cache": str(tmp_path / "cache.db")}
+    first, second = _diagnose_docs([("a", '{"x": }'), ("b", '\n\n\n{"x": }')], options)
+    assert (first["error"]["line"], first["error"]["pos"]) == (1, 6)
+    assert (second["error"]["line"], second["error"]["pos"]) == (4, 9)
+
+
+def test_jsonl_chunks_cached_matches_uncached(tmp_path):
+    path = tmp_path / "export.jsonl"
+    path.write_text("\n".join(DOCS[:1] + DOCS[3:4] + DOCS[5:]) + "\n\n" + DOCS[0], encoding="utf-8")
+    cache = str(tmp_path / "cache.db")
+    plain = [record for task in iter_tasks(str(path), chunk_size=2) for record in run_chunk(task)]
+    for _ in range(2):
+        cached = [record for task in iter_tasks(str(path), chunk_size=2, cache_path=cache) for record in run_chunk(task)]
+        assert cached == plain
+    assert [record["id"] for record in plain] == [f"{path}:{n}" for n in (1, 2, 3, 4, 6)]
@@ -0,0 +1,47 @@
+# tests/test_catalogue.py
+# 商品目录生成：--out-dir 模式的文件命名（命名列缺失或为空时用 row-N，清理后同名时加后缀）与空目录文件的报错
+import json
+import os
+
+import pytest
+
+from engine.catalogue import _safe_filename, generate_catalogue
+
+
+def write_csv(tmp_path, text):
+    path = tmp_path / "products.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("value", [None, "", "   ", "://", "..."])
+def test_safe_filename_falls_back(value):
+    assert _safe_filename(value, "row-3") == "row-3"
+
+
+def test_safe_filename_cleans_urls():
+    assert _safe_filename("https://example.com/p/1?a=b", "row-1") == "example.com_p_1_a_b"
+
+
+def test_out_dir_without_name_column(tmp_path):
+    path = write_csv(tmp_path, "name,sku\nA,1\nB,2\n")
+    out_dir = tmp_path / "out"
+    assert generate_catalogue(path, "Product", out_dir=str(out_dir)) == 2
+    assert sorted(os.listdir(out_dir)) == ["row-1.json", "row-2.json"]
+    text = (out_dir / "row-2.json").read_text(encoding="utf-8")
+    assert text.endswith("}\n")
+    assert json.loads(text) == {"@context": "https://schema.org", "@type": "Product", "name": "B", "sku": "2"}
+
+
+def test_out_dir_with_empty_and_colliding_names(tmp_path):
+    path = write_csv(tmp_path, "name,url\nA,https://example.com/a\nB,\nC,http://example.com/a\nD,https://EXAMPLE.com/A\n")
+    out_dir = tmp_path / "out"
+    assert generate_catalogue(path, "Product", out_dir=str(out_dir), name_column="url", chunk_size=2) == 4
+    assert sorted(os.listdir(out_dir)) == ["EXAMPLE.com_A-3.json", "example.com_a-2.json", "example.com_a.json", "row-2.json"]
+    assert json.loads((out_dir / "row-2.json").read_text(encoding="utf-8"))["name"] == "B"
+
+
+@pytest.mark.parametrize("text", ["", "name,sku\n"])
+def test_empty_catalogue_is_rejected(tmp_path, text):
+    with pytest.raises(ValueError, match="no data rows"):
+        generate_catalogue(write_csv(tmp_path, text), "Product", out_dir=str(tmp_path / "out"))
@@ -0,0 +1,93 @@
+# tests/test_cluster.py
+# 模板簇：近似副本归入同一簇、不同文档各自成簇、代表文档的选择与加入顺序和键顺序无关，numpy 与纯 Python 结果相同
+import pytest
+
+from engine import cluster
+from engine.cluster import ClusterIndex
+
+
+def product(i, name="示例商品", price="99.00"):
+    return {
+        "@context": "https://schema.org", "@type": "Product", "name": name, "sku": f"SKU-{i}",
+        "brand": {"@type": "Brand", "name": "示例品牌"},
+        "offers": {"@type": "Offer", "price": price, "priceCurrency": "CNY", "availability": "https://schema.org/InStock"},
+        "aggregateRating": {"@type": "AggregateRating", "ratingValue": "4.5", "reviewCount": "12"},
+        "image": [f"https://example.com/img/{n}.jpg" for n in range(8)],
+        "description": "同一模板生成的商品详情页",
+        "category": "数码",
+        "url": "https://example.com/p",
+    }
+
+
+def article(i):
+    return {
+        "@context": "https://schema.org", "@type": "Article", "headline": f"完全不同的文章 {i}",
+        "author": {"@type": "Person", "name": f"作者 {i}"}, "datePublished": f"2024-01-{i + 1:02d}",
+        "keywords": [f"k{i}-{n}" for n in range(6)],
+    }
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    # 两种签名比较路径的结果必须相同
+    if request.param == "python":
+        monkeypatch.setattr(cluster, "np", None)
+    elif cluster.np is None:
+        pytest.skip("numpy 未安装")
+    cluster._permutations.cache_clear()
+    yield request.param
+    cluster._permutations.cache_clear()
+
+
+def build(docs, threshold=0.7):
+    index = ClusterIndex(threshold=threshold)
+    for doc_id, data in docs:
+        index.add(doc_id, data)
+    return index
+
+
+def test_near_duplicates_cluster_together(backend):
+    docs = [(f"p{i}", product(i)) for i in range(10)] + [(f"a{i}", article(i)) for i in range(5)]
+    index = build(docs)
+    products = index.cluster_of("p0")
+    assert products["size"] == 10
+    assert products["exact_groups"] == 10
+    assert all(index.cluster_of(f"p{i}") is products for i in range(10))
+    # 互不相似的文章各自成簇
+    assert {index.cluster_of(f"a{i}")["size"] for i in range(5)} == {1}
+    assert len({id(index.cluster_of(f"a{i}")) for i in range(5)}) == 5
+    assert index.summary()["clusters"] == 6
+    assert index.estimate_similarity("p0", "p1") >= 0.7
+    assert index.estimate_similarity("p0", "a0") < 0.3
+
+
+def test_exact_duplicates_ignore_key_order(backend):
+    doc = product(1)
+    reordered = dict(reversed(list(doc.items())))
+    index = build([("x", doc), ("y", reordered)])
+    assert index.is_exact_duplicate("x", "y")
+    assert index.estimate_similarity("x", "y") == 1.0
+    assert index.summary()["exact_groups"] == 1
+
+
+def test_representative_is_deterministic(backend):
+    # 代表文档为最大的完全相同组的第一个文档；组大小相同时取先加入的组
+    docs = [("p1", product(1)), ("p2a", product(2)), ("p3", product(3)), ("p2b", product(2)), ("p2c", product(2))]
+    for order in (docs, list(reversed(docs)), docs[2:] + docs[:2]):
+        index = build(order)
+        first_p2 = next(doc_id for doc_id, _ in order if doc_id.startswith("p2"))
+        assert {index.representative(doc_id) for doc_id, _ in order} == {first_p2}
+    index = build(docs[:1] + docs[2:3])
+    assert index.representative("p3") == "p1"
+    assert build(docs[:1] + docs[2:3]).clusters() == index.clusters() # 同样的输入，同样的结果
+
+
+def test_backends_agree(monkeypatch):
+    docs = [(f"p{i}", product(i, price=str(i % 3))) for i in range(30)] + [(f"a{i}", article(i)) for i in range(10)]
+    expected = build(docs).clusters()
+    monkeypatch.setattr(cluster, "np", None)
+    cluster._permutations.cache_clear()
+    try:
+        assert build(docs).clusters() == expected
+    finally:
+        cluster._permutations.cache_clear()
@@ -0,0 +1,63 @@
+# tests/test_diff.py
+# 结构化差异：diff_json 生成的补丁应用到原文档后必须得到目标文档
+import copy
+
+import pytest
+
+from engine import apply_patch, diff_json, format_patch, pointer_to_path
+
+from .common import mutate, random_document, seeds
+
+
+def roundtrip(a, b):
+    ops = diff_json(a, b)
+    assert apply_patch(copy.deepcopy(a), ops) == b
+    return ops
+
+
+@pytest.mark.parametrize("rng", seeds(300))
+def test_roundtrip_random_edits(rng):
+    a = random_document(rng)
+    b = mutate(a, rng, edits=rng.randint(1, 6))
+    roundtrip(a, b)
+    roundtrip(b, a)
+
+
+@pytest.mark.parametrize("rng", seeds(100))
+def test_roundtrip_unrelated_documents(rng):
+    roundtrip(random_document(rng), random_document(rng))
+
+
+def test_identical_documents_have_no_ops():
+    doc = {"@context": "https://schema.org", "@type": "Product", "offers": [{"sku": "a", "price": "1"}]}
+    assert diff_json(doc, copy.deepcopy(doc)) == []
+
+
+def test_list_items_aligned_by_key():
+    # 在列表开头插入一项时，其余商品按 sku 对齐，只报告真正变化的字段
+    a = {"offers": [{"sku": "a", "price": "1"}, {"sku": "b", "price": "2"}]}
+    b = {"offers": [{"sku": "c", "price": "0"}, {"sku": "a", "price": "1"}, {"sku": "b", "price": "3"}]}
+    assert roundtrip(a, b) == [
+        {"op": "add", "path": "/offers/0", "value": {"sku": "c", "price": "0"}},
+        {"op": "replace", "path": "/offers/2/price", "value": "3", "old": "2"},
+    ]
+
+
+def test_pointer_escaping():
+    a = {"a/b": 1, "c~d": [1]}
+    b = {"a/b": 2, "c~d": [1, 2]}
+    assert [op["path"] for op in roundtrip(a, b)] == ["/a~1b", "/c~0d/1"]
+    assert pointer_to_path("/offers/1/a~1b") == "offers[1].a/b"
+
+
+def test_root_type_change_replaces_document():
+    assert roundtrip(1, [1]) == [{"op": "replace", "path": "", "value": [1], "old": 1}]
+
+
+def test_format_patch():
+    ops = diff_json({"name": "A", "sku": "1"}, {"name": "B", "url": "u"})
+    assert sorted(format_patch(ops)) == sorted([
+        "值不同: `name` (A: `A`, B: `B`)",
+        "仅在片段 A 中存在: `sku` = `1`",
+        "仅在片段 B 中存在: `url` = `u`",
+    ])
@@ -0,0 +1,77 @@
+# tests/test_extract.py
+# JSON-LD 提取：流式扫描与 BeautifulSoup 对照实现结果相同（与切块方式无关），按响应头 / <meta> 声明的编码解码
+import pytest
+
+from engine.extract import charset_from_content_type, extract_jsonld_bs4, iter_jsonld
+
+DOC = '{"@context": "https://schema.org", "@type": "Product", "name": "中文商品 ￥99"}'
+
+PAGE = f"""<!DOCTYPE html>
+<html><head>
+<meta charset="utf-8">
+<script type="application/ld+json">{DOC}</script>
+<!-- <script type="application/ld+json">{{"commented": true}}</script> -->
+<script>var s = "<script type='application/ld+json'>";</script>
+<script data-type="application/ld+json">{{"not": "json-ld"}}</script>
+<SCRIPT TYPE='application/ld+json; charset=utf-8' id="b">[1, 2]</SCRIPT >
+</head><body>
+<script type=application/ld+json>{{"in": "body"}}</script>
+</body></html>"""
+
+
+def extract(html, size, **options):
+    return list(iter_jsonld([html[i:i + size] for i in range(0, len(html), size)], **options))
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 17, 1 << 20])
+def test_stream_matches_bs4(size):
+    blocks = extract(PAGE.encode("utf-8"), size)
+    assert blocks == extract_jsonld_bs4(PAGE)
+    assert blocks == [DOC, "[1, 2]", '{"in": "body"}']
+
+
+@pytest.mark.parametrize("size", [1, 7, 1 << 20])
+def test_head_only(size):
+    assert extract(PAGE.encode("utf-8"), size, head_only=True) == [DOC, "[1, 2]"]
+
+
+def test_data_type_attribute_is_not_json_ld():
+    html = b'<script data-type="application/ld+json">{}</script><script  type = "application/ld+json" data-x="1">{"a": 1}</script>'
+    assert extract(html, 1 << 20) == ['{"a": 1}']
+
+
+@pytest.mark.parametrize("meta", [
+    '<meta charset="gbk">',
+    '<meta charset=GB2312>',
+    '<meta http-equiv="Content-Type" content="text/html; charset=gb2312">',
+])
+@pytest.mark.parametrize("size", [1, 3, 1 << 20])
+def test_meta_charset(meta, size):
+    html = f'<html><head>{meta}<script type="application/ld+json">{DOC}</script></head></html>'.encode("gb18030")
+    assert extract(html, size) == [DOC]
+
+
+def test_header_charset_takes_precedence_over_meta():
+    html = f'<meta charset="utf-8"><script type="application/ld+json">{DOC}</script>'.encode("gbk")
+    assert extract(html, 1 << 20, encoding="GBK") == [DOC]
+    assert extract(html, 1 << 20) != [DOC] # 按页面声明的 UTF-8 解码会乱码
+
+
+def test_defaults_to_utf8():
+    html = f'<script type="application/ld+json">{DOC}</script>'.encode("utf-8")
+    assert extract(html, 4) == [DOC]
+    assert extract(html, 4, encoding="bogus") == [DOC]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("text/html; charset=GBK", "gb18030"),
+    ('text/html; charset="gb2312"', "gb18030"),
+    ("text/html;charset=utf-8", "utf-8"),
+    ("text/html; charset=Shift_JIS", "shift_jis"),
+    ("text/html; charset=utf-16", "utf-8"),
+    ("text/html", None),
+    ("text/html; charset=bogus", None),
+    (None, None),
+])
+def test_charset_from_content_type(value, expected):
+    assert charset_from_content_type(value) == expected
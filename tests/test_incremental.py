@@ -0,0 +1,119 @@
+# tests/test_incremental.py
+# 增量诊断：对同一文档连续编辑时，每一步的结果都与整体诊断 diagnose_jsonld(text, schema=True) 相同
+import json
+
+import pytest
+
+from engine import diagnose_jsonld
+from engine.incremental import IncrementalDiagnoser
+
+from .common import mutate, random_entity, seeds
+
+
+def comparable(result):
+    # 去掉整体诊断特有的 graph 和增量诊断特有的 incremental；异常对象按消息和位置比较
+    result = {k: v for k, v in result.items() if k not in ("graph", "incremental")}
+    error = result.get("error")
+    if isinstance(error, Exception):
+        result["error"] = (type(error).__name__, str(error), getattr(error, "pos", None))
+    return result
+
+
+def check(diagnoser, text):
+    result = diagnoser.diagnose(text)
+    assert comparable(result) == comparable(diagnose_jsonld(text, schema=True))
+    return result["incremental"]
+
+
+def dump(doc):
+    return json.dumps(doc, ensure_ascii=False, indent=2)
+
+
+def edit_sequence(rng, doc):
+    # 逐步编辑 @graph：改一个实体、插入、删除、交换相邻实体、改 @context，每一步产出新的文本
+    graph = doc["@graph"]
+    for _ in range(12):
+        roll = rng.random()
+        if graph and roll < 0.4:
+            i = rng.randrange(len(graph))
+            graph[i] = mutate(graph[i], rng, edits=rng.randint(1, 3))
+        elif roll < 0.6:
+            graph.insert(rng.randint(0, len(graph)), random_entity(rng))
+        elif graph and roll < 0.75:
+            del graph[rng.randrange(len(graph))]
+        elif len(graph) > 1 and roll < 0.9:
+            i = rng.randrange(len(graph) - 1)
+            graph[i], graph[i + 1] = graph[i + 1], graph[i]
+        else:
+            doc["@context"] = rng.choice(["https://schema.org", "http://schema.org", {"@vocab": "https://schema.org/"}])
+        yield dump(doc)
+
+
+@pytest.mark.parametrize("rng", seeds(60))
+def test_edits_match_full_diagnosis(rng):
+    doc = {"@context": "https://schema.org", "@graph": [random_entity(rng) for _ in range(rng.randint(1, 8))]}
+    # 引用其他实体的 @id（含指向不存在实体的引用），让跨实体合并阶段也参与比较
+    for entity in doc["@graph"]:
+        if rng.random() < 0.5:
+            entity["publisher"] = {"@id": f"#node-{rng.randint(0, 25)}"}
+    diagnoser = IncrementalDiagnoser()
+    check(diagnoser, dump(doc))
+    for text in edit_sequence(rng, doc):
+        check(diagnoser, text)
+
+
+@pytest.mark.parametrize("rng", seeds(30))
+def test_top_level_list(rng):
+    nodes = [{"@context": "https://schema.org", **random_entity(rng)} for _ in range(rng.randint(1, 6))]
+    diagnoser = IncrementalDiagnoser()
+    check(diagnoser, dump(nodes))
+    for _ in range(8):
+        i = rng.randrange(len(nodes))
+        nodes[i] = mutate(nodes[i], rng)
+        check(diagnoser, dump(nodes))
+
+
+def test_single_field_edit_rechecks_one_entity():
+    doc = {"@context": "https://schema.org", "@graph": [{"@type": "Product", "name": f"商品 {i}", "sku": str(i)} for i in range(20)]}
+    diagnoser = IncrementalDiagnoser()
+    assert check(diagnoser, dump(doc)) == {"units": 20, "rechecked": 20, "full": True}
+    doc["@graph"][7]["name"] = "改名"
+    assert check(diagnoser, dump(doc)) == {"units": 20, "rechecked": 1, "full": False}
+    doc["@context"] = "http://schema.org"
+    assert check(diagnoser, dump(doc))["full"] is True
+
+
+def test_duplicate_ids_across_entities():
+    doc = {"@context": "https://schema.org", "@graph": [
+        {"@type": "Organization", "@id": "#org", "name": "A"},
+        {"@type": "Product", "name": "P", "brand": {"@id": "#org"}},
+        {"@type": "Product", "name": "Q", "manufacturer": {"@id": "#missing"}},
+    ]}
+    diagnoser = IncrementalDiagnoser()
+    check(diagnoser, dump(doc))
+    doc["@graph"].append({"@type": "Organization", "@id": "#org", "url": "https://example.com"})
+    check(diagnoser, dump(doc))
+    doc["@graph"][1]["@id"] = "#org"
+    check(diagnoser, dump(doc))
+    del doc["@graph"][0]
+    check(diagnoser, dump(doc))
+
+
+def test_syntax_error_and_recovery():
+    doc = {"@context": "https://schema.org", "@graph": [{"@type": "Product", "name": f"商品 {i}"} for i in range(5)]}
+    text = dump(doc)
+    diagnoser = IncrementalDiagnoser()
+    check(diagnoser, text)
+    broken = text.replace('"商品 2"', '"商品 2",', 1)
+    assert check(diagnoser, broken) == {"units": 0, "rechecked": 0, "full": True}
+    assert diagnoser.last_result["valid"] is False
+    check(diagnoser, text)
+    check(diagnoser, text[:-1])
+    check(diagnoser, "")
+    check(diagnoser, text)
+
+
+def test_cached_result_is_reused():
+    text = dump({"@context": "https://schema.org", "@type": "Product", "name": "A"})
+    diagnoser = IncrementalDiagnoser()
+    assert diagnoser.diagnose(text) is diagnoser.diagnose("".join(list(text)))
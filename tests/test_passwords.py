@@ -0,0 +1,84 @@
+# tests/test_passwords.py
+# 密码哈希：哈希 / 校验往返、错误密码、成本参数或算法变化后的升级判断、用户不存在时同样付出 KDF 成本
+import hashlib
+
+import pytest
+
+from engine.passwords import PasswordHasher
+
+FAST = {"scrypt_n": 2 ** 10, "pbkdf2_iterations": 1000}
+
+
+class CountingHasher(PasswordHasher):
+    # 记录 KDF 的计算次数
+    derived = 0
+
+    def _derive(self, *args):
+        self.derived += 1
+        return super()._derive(*args)
+
+
+@pytest.mark.parametrize("scheme", ["scrypt", "pbkdf2_sha256"])
+def test_hash_verify_roundtrip(scheme):
+    hasher = PasswordHasher(scheme=scheme, **FAST)
+    stored = hasher.hash("correct horse 中文")
+    assert stored.startswith(scheme + "$")
+    assert hasher.verify("correct horse 中文", stored)
+    assert not hasher.verify("correct horse", stored)
+    assert not hasher.needs_rehash(stored)
+    assert hasher.hash("correct horse 中文") != stored # 每次加不同的盐
+
+
+@pytest.mark.parametrize("cache_size", [0, 1024])
+def test_wrong_password(cache_size):
+    hasher = PasswordHasher(cache_size=cache_size, **FAST)
+    stored = hasher.hash("secret")
+    assert hasher.verify("secret", stored)
+    assert not hasher.verify("Secret", stored)
+    assert not hasher.verify("", stored)
+    assert not hasher.verify("secret", stored[:-4] + "AAAA")
+
+
+@pytest.mark.parametrize("stored", ["", "scrypt$1$2", "md5$abc$def", "pbkdf2_sha256$x$AA$AA", "scrypt$3$8$1$AA$AA"])
+def test_malformed_hashes_fail(stored):
+    assert not PasswordHasher(**FAST).verify("secret", stored)
+
+
+def test_parameter_upgrade():
+    old = PasswordHasher(scheme="pbkdf2_sha256", pbkdf2_iterations=1000)
+    stored = old.hash("secret")
+    stronger = PasswordHasher(scheme="pbkdf2_sha256", pbkdf2_iterations=2000)
+    assert stronger.verify("secret", stored) # 旧参数的哈希仍可校验
+    assert stronger.needs_rehash(stored)
+    assert not stronger.needs_rehash(stronger.hash("secret"))
+
+    switched = PasswordHasher(scheme="scrypt", **FAST)
+    assert switched.verify("secret", stored)
+    assert switched.needs_rehash(stored)
+    assert PasswordHasher(scheme="scrypt", scrypt_n=2 ** 11).needs_rehash(switched.hash("secret"))
+
+
+def test_legacy_sha256_upgrade():
+    hasher = PasswordHasher(**FAST)
+    legacy = hashlib.sha256("1314".encode("utf-8")).hexdigest()
+    assert hasher.verify("1314", legacy)
+    assert not hasher.verify("1315", legacy)
+    assert hasher.needs_rehash(legacy)
+
+
+def test_unknown_user_costs_one_kdf():
+    # 用户不存在与密码错误的耗时相同：都恰好计算一次 KDF
+    hasher = CountingHasher(cache_size=0, **FAST)
+    stored = hasher.hash("secret")
+    for _ in range(3):
+        hasher.derived = 0
+        assert not hasher.verify("guess", None)
+        assert hasher.derived == 1
+        hasher.derived = 0
+        assert not hasher.verify("guess", stored)
+        assert hasher.derived == 1
+
+
+def test_unknown_scheme_rejected():
+    with pytest.raises(ValueError):
+        PasswordHasher(scheme="md5")
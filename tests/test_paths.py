@@ -0,0 +1,164 @@
+# tests/test_paths.py
+# 字段路径引擎：compile_path / iter_paths / TreeBuilder 与原先逐条正则切分、递归遍历的实现结果一致
+import re
+
+import pytest
+
+from engine import TreeBuilder, build_nested_json, compile_path, flatten_json, format_path, get_all_paths, iter_paths
+
+from .common import random_document, seeds
+
+
+# ----------------- 原实现（对照用） -----------------
+def reference_get_all_paths(data, current_path=""):
+    paths = []
+    if isinstance(data, dict):
+        for k, v in data.items():
+            new_path = f"{current_path}.{k}" if current_path else k
+            paths.append(new_path)
+            paths.extend(reference_get_all_paths(v, new_path))
+    elif isinstance(data, list):
+        for i, item in enumerate(data):
+            paths.extend(reference_get_all_paths(item, f"{current_path}[{i}]"))
+    return paths
+
+
+def reference_flatten_json(data, current_path=""):
+    flat = {}
+    if isinstance(data, dict):
+        for k, v in data.items():
+            flat.update(reference_flatten_json(v, f"{current_path}.{k}" if current_path else k))
+    elif isinstance(data, list):
+        for i, item in enumerate(data):
+            flat.update(reference_flatten_json(item, f"{current_path}[{i}]"))
+    elif current_path:
+        flat[current_path] = data
+    return flat
+
+
+def reference_build_nested_json(flat_dict):
+    # 原 build_nested_json 的正常路径（不含类型冲突时的修复分支）
+    nested = {}
+    for k, v in flat_dict.items():
+        parts = [p for p in re.split(r'\.|\[(\d+)\]', k) if p]
+        current = nested
+        for i, part in enumerate(parts):
+            if part.isdigit():
+                idx = int(part)
+                while len(current) <= idx:
+                    current.append({})
+                if i == len(parts) - 1:
+                    current[idx] = v
+                else:
+                    if not parts[i+1].isdigit() and not isinstance(current[idx], dict):
+                        current[idx] = {}
+                    current = current[idx]
+            elif i == len(parts) - 1:
+                current[part] = v
+            else:
+                current = current.setdefault(part, [] if parts[i+1].isdigit() else {})
+    return nested
+
+
+def prune(value, nested_lists=True):
+    # 去掉空值（None、空串）和空容器，得到 TreeBuilder 构建结果应有的样子；
+    # nested_lists=False 时同时去掉直接嵌套在列表中的列表（原 build_nested_json 用 {} 补位，不支持 a[0][1]）
+    if isinstance(value, dict):
+        value = {k: prune(v, nested_lists) for k, v in value.items()}
+        return {k: v for k, v in value.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        value = [prune(v, nested_lists) for v in value if nested_lists or not isinstance(v, list)]
+        return [v for v in value if v not in (None, "", [], {})]
+    return value
+
+
+# ----------------- 路径编译 -----------------
+@pytest.mark.parametrize("path, segments", [
+    ("name", ("name",)),
+    ("offers[0].price", ("offers", 0, "price")),
+    ("a.b[0][12].c", ("a", "b", 0, 12, "c")),
+    ("a.0.b", ("a", 0, "b")),
+    ("@graph[3].@id", ("@graph", 3, "@id")),
+    ("", ()),
+])
+def test_compile_path(path, segments):
+    assert compile_path(path) == segments
+
+
+@pytest.mark.parametrize("path", ["name", "offers[0].price", "a.b[0][12].c", "@graph[3].@id", "中文[1]"])
+def test_format_path_inverts_compile_path(path):
+    assert format_path(compile_path(path)) == path
+
+
+def test_format_path_prefix():
+    assert format_path(("offers", 0), "root") == "root.offers[0]"
+    assert format_path((0, "name"), "@graph") == "@graph[0].name"
+
+
+# ----------------- 树 -> 路径 -----------------
+@pytest.mark.parametrize("rng", seeds(200))
+def test_paths_match_recursive_reference(rng):
+    doc = random_document(rng)
+    assert get_all_paths(doc) == reference_get_all_paths(doc)
+    assert get_all_paths(doc, "root") == reference_get_all_paths(doc, "root")
+    assert flatten_json(doc) == reference_flatten_json(doc)
+    assert list(flatten_json(doc)) == list(reference_flatten_json(doc))
+
+
+def test_iter_paths_skip_keywords():
+    doc = {"@context": "https://schema.org", "@type": "Product", "name": "A", "offers": [{"@type": "Offer", "price": "1"}]}
+    assert [format_path(s) for s, _ in iter_paths(doc, skip_keywords=True)] == ["name", "offers", "offers[0].price"]
+
+
+def test_deep_nesting_does_not_recurse():
+    depth = 3000 # 超过默认递归上限（1000）
+    doc = leaf = {}
+    for _ in range(depth):
+        leaf["a"] = [{}]
+        leaf = leaf["a"][0]
+    leaf["b"] = 1
+    assert len(get_all_paths(doc)) == depth + 1
+    assert list(flatten_json(doc).values()) == [1]
+
+
+# ----------------- 路径 -> 树 -----------------
+@pytest.mark.parametrize("rng", seeds(200))
+def test_build_matches_reference(rng):
+    doc = prune(random_document(rng), nested_lists=False)
+    flat = flatten_json(doc)
+    assert build_nested_json(flat) == reference_build_nested_json(flat) == doc
+    assert TreeBuilder(flat).build(list(flat.values())) == doc
+
+
+@pytest.mark.parametrize("rng", seeds(200))
+def test_tree_builder_roundtrip(rng):
+    doc = prune(random_document(rng))
+    flat = flatten_json(doc)
+    assert TreeBuilder(flat).build(list(flat.values())) == doc
+
+
+def test_tree_builder_skips_missing_values():
+    builder = TreeBuilder(["name", "offers[0].price", "offers[1].price", "offers[2].price", "brand.name"])
+    assert builder.build(["A", "1", None, float("nan"), ""]) == {"name": "A", "offers": [{"price": "1"}]}
+    # 中间的空位被压缩，不像 build_nested_json 那样补 {}
+    assert builder.build(["A", None, "2", "3", "B"]) == {"name": "A", "offers": [{"price": "2"}, {"price": "3"}], "brand": {"name": "B"}}
+    assert builder.build([None] * 5) == {}
+    assert builder.build(["A", 0, False, "", None], skip=lambda v: v is None) == {"name": "A", "offers": [{"price": 0}, {"price": False}, {"price": ""}]}
+
+
+def test_tree_builder_orders_list_items_by_index():
+    builder = TreeBuilder(["items[10]", "items[2]", "items[0]"])
+    assert builder.build(["c", "b", "a"]) == {"items": ["a", "b", "c"]}
+
+
+@pytest.mark.parametrize("paths", [
+    ["a[0]", "a.b"],
+    ["a.b", "a[0]"],
+    ["a", "a.b"],
+    ["a.b", "a"],
+    ["a", "a"],
+    ["name", ""],
+])
+def test_tree_builder_rejects_conflicting_paths(paths):
+    with pytest.raises(ValueError):
+        TreeBuilder(paths)
@@ -0,0 +1,103 @@
+# tests/test_reformat.py
+# 流式格式转换：任意切块方式下的输出都与「json.loads 后再 json.dumps」相同，非法输入与 json.loads 一样抛出 JSONDecodeError
+import json
+
+import pytest
+
+from engine.reformat import iter_reformat, reformat_text
+
+from .common import random_document, random_value, seeds
+
+CHUNK_SIZES = (1, 2, 3, 7, 1 << 20)
+
+
+def reformat_chunked(text, size, pretty=False, multiple=True):
+    data = text.encode("utf-8")
+    chunks = [data[i:i + size] for i in range(0, len(data), size)]
+    return b"".join(iter_reformat(chunks, pretty=pretty, multiple=multiple)).decode("utf-8")
+
+
+def dumps(value, pretty):
+    return json.dumps(value, indent=2 if pretty else None, separators=None if pretty else (",", ":"), ensure_ascii=False)
+
+
+def decode_error(text, size, multiple=True):
+    with pytest.raises(json.JSONDecodeError) as info:
+        reformat_chunked(text, size, multiple=multiple)
+    return info.value
+
+
+# ----------------- 与 json.loads / json.dumps 一致 -----------------
+@pytest.mark.parametrize("rng", seeds(300))
+def test_matches_json_roundtrip(rng):
+    value = random_document(rng) if rng.random() < 0.7 else random_value(rng)
+    source = json.dumps(value, indent=rng.choice([None, 2, 4]), ensure_ascii=False)
+    for pretty in (False, True):
+        expected = dumps(json.loads(source), pretty)
+        for size in CHUNK_SIZES:
+            assert reformat_chunked(source, size, pretty) == expected
+
+
+def test_reformat_text():
+    assert reformat_text('{ "a" : [ 1 , {} , [ ] ] }') == '{"a":[1,{},[]]}'
+    assert reformat_text('{"a":[1,{},[]]}', pretty=True) == '{\n  "a": [\n    1,\n    {},\n    []\n  ]\n}'
+
+
+def test_strings_and_numbers_kept_verbatim():
+    # 不经过解析：转义写法和数值字面量原样保留
+    source = '["\\u4e2d\\"\\\\", 1.50, 1E+5, -0]'
+    assert reformat_text(source) == '["\\u4e2d\\"\\\\",1.50,1E+5,-0]'
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_multiple_top_level_values(size):
+    assert reformat_chunked(' {"a": [1, 2]}\n{"b": 3}\n 4\n', size) == '{"a":[1,2]}\n{"b":3}\n4'
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_single_value_mode(size):
+    assert reformat_chunked(' {"a": [1, 2]}\n', size, multiple=False) == '{"a":[1,2]}'
+    assert str(decode_error('{"a": 1} {"b": 2}', size, multiple=False)) == "Extra data: line 1 column 10 (char 9)"
+    assert str(decode_error("1\n2", size, multiple=False)) == "Extra data: line 2 column 1 (char 2)"
+
+
+@pytest.mark.parametrize("source", [
+    "[NaN,Infinity,-Infinity,0,-0,1e+5,1E-5,0.0]", "true", "12345", '"x"',
+    '["\\"\\\\\\/\\b\\f\\n\\r\\t\\u00e9\\uABcd\\ud83d\\ude00"]', '{"\\u0041\\n":"\\u0000"}',
+])
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_accepts_what_json_loads_accepts(source, size):
+    json.loads(source)
+    assert reformat_chunked(source, size) == source
+
+
+# ----------------- 非法输入 -----------------
+@pytest.mark.parametrize("source", [
+    '{"a": xyz}', '{"a": 01}', '[1.]', '[-]', '[tru]', '[1e]', '[nulll]', '[.5]', '[+1]', '[1 2x]', '{"a":\n  1x}',
+    '{"a" 1}', '[1,]', '{"a":1,}', '[1', '"abc', '', '[1]]', '{"a":1]', '{1: 2}', '[1 2]',
+    '"a\x01"', '"a\nb"', '{"k\tx": 1}', '["\x1f"]', '"\\x"', '{"a\\q": 1}', '["\\u12G4"]', '["\\u12"]', '"\\', '["ok", "\\',
+])
+def test_rejects_what_json_loads_rejects(source):
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(source)
+    # 错误位置与切块方式无关
+    errors = {str(decode_error(source, size)) for size in (1, 2, 3, 100)}
+    assert len(errors) == 1
+
+
+@pytest.mark.parametrize("source, message", [
+    ('{"a": xyz}', "Expecting value: line 1 column 7 (char 6)"),
+    ('{"a":\n  1x}', "Expecting value: line 2 column 3 (char 8)"),
+    ('[1,]', "Unexpected ']': line 1 column 4 (char 3)"),
+    ('[1', "Unclosed '[': line 1 column 3 (char 2)"),
+    ('', "Empty input: line 1 column 1 (char 0)"),
+    # 字符串的错误与 json.loads 的消息和位置相同
+    ('"a\x01"', "Invalid control character at: line 1 column 3 (char 2)"),
+    ('{"k":\n "a\nb"}', "Invalid control character at: line 2 column 4 (char 9)"),
+    ('"\\x"', "Invalid \\escape: line 1 column 2 (char 1)"),
+    ('["ab\\u12G4"]', "Invalid \\uXXXX escape: line 1 column 6 (char 5)"),
+])
+def test_error_position(source, message):
+    error = decode_error(source, 2)
+    assert str(error) == message
+    assert isinstance(error, ValueError)
@@ -0,0 +1,148 @@
+# tests/test_server.py
+# HTTP 服务：请求体错误只影响该请求、微批处理按提交顺序返回结果、子进程崩溃后重建进程池、keep-alive 管线化请求
+import asyncio
+import json
+import os
+import signal
+import time
+
+import pytest
+
+from engine import server
+from engine.server import EngineServer, MicroBatcher, handle_body, run_batch
+
+PRODUCT = {"@context": "https://schema.org", "@type": "Product", "name": "A"}
+
+
+def request(op_body):
+    return json.dumps(op_body).encode("utf-8")
+
+
+def decode(result):
+    status, body = result
+    return status, json.loads(body)
+
+
+# ----------------- handle_body -----------------
+def test_handle_body_ok():
+    status, payload = decode(handle_body("generate", request({"type": "Product", "fields": {"name": "A", "offers.price": "1"}})))
+    assert status == 200
+    assert payload == {"data": {"@context": "https://schema.org", "@type": "Product", "name": "A", "offers": {"price": "1"}}, "warnings": []}
+    assert decode(handle_body("paths", request({"data": {"a": {"b": 1}}}))) == (200, {"paths": ["a", "a.b"]})
+
+
+@pytest.mark.parametrize("op, body", [
+    ("validate", b"{not json"),
+    ("validate", b"\xff\xfe"),
+    ("validate", b"[1, 2]"),
+    ("validate", b"[" * 100000 + b"]" * 100000),
+    ("diff", request({"old": 1})),
+    ("diff", request({"old_text": "{", "new": 1})),
+    ("generate", request({"type": "", "fields": {}})),
+    ("paths", request({"text": 5})),
+    ("paths", request({"text": "[" * 100000})),
+])
+def test_handle_body_bad_request(op, body):
+    status, payload = decode(handle_body(op, body))
+    assert status == 400
+    assert payload["error"]
+
+
+def test_handle_body_deep_document_text():
+    deep = "[" * 100000 + "]" * 100000
+    status, payload = decode(handle_body("validate", request({"text": deep})))
+    assert status == 200 and payload["valid"] is False # 诊断结果中记为失败，而不是服务端错误
+    status, _ = decode(handle_body("paths", request({"text": deep})))
+    assert status == 400
+
+
+def test_unexpected_error_is_500(monkeypatch):
+    def boom(request):
+        raise RuntimeError("boom")
+    monkeypatch.setitem(server.HANDLERS, "paths", boom)
+    assert decode(handle_body("paths", b"{}")) == (500, {"error": "RuntimeError: boom"})
+
+
+def test_run_batch_isolates_errors():
+    bodies = [request({"data": [1]}), b"{bad", request({"data": {"x": 1}}), b"[]", request({"nothing": 1})]
+    statuses = [status for status, _ in run_batch("paths", bodies)]
+    assert statuses == [200, 400, 200, 400, 400]
+
+
+# ----------------- MicroBatcher -----------------
+def test_batcher_routes_results_in_order():
+    async def main():
+        batcher = MicroBatcher(None, slots=1, max_batch=8)
+        bodies = [request({"data": {f"k{i}": i}}) if i % 3 else b"{bad" for i in range(20)]
+        results = await asyncio.gather(*[batcher.submit("paths", body) for body in bodies])
+        return batcher, bodies, results
+
+    batcher, bodies, results = asyncio.run(main())
+    for i, (status, body) in enumerate(results):
+        if i % 3:
+            assert (status, json.loads(body)) == (200, {"paths": [f"k{i}"]})
+        else:
+            assert status == 400
+    assert batcher.requests == 20
+    assert batcher.batches == 4 # 第一个请求立即执行，其余 19 个按每批 8 个合并
+    assert batcher._running == 0 and not batcher._pending
+
+
+def test_batcher_interleaves_endpoints():
+    async def main():
+        batcher = MicroBatcher(None, slots=1)
+        futures = [batcher.submit("paths" if i % 2 else "validate", request({"data": PRODUCT})) for i in range(10)]
+        return await asyncio.gather(*futures)
+
+    for i, (status, body) in enumerate(asyncio.run(main())):
+        assert status == 200
+        assert ("paths" in json.loads(body)) == bool(i % 2)
+
+
+def test_batcher_restarts_broken_pool():
+    async def main():
+        srv = await EngineServer(port=0, workers=1).start()
+        try:
+            assert (await srv.batcher.submit("paths", b"{}"))[0] == 400
+            broken = srv._pool
+            for pid in list(broken._processes):
+                os.kill(pid, signal.SIGKILL)
+            deadline = time.monotonic() + 10
+            status = 200
+            while status != 500 and time.monotonic() < deadline: # 进程池发现子进程退出后，在途或新提交的批次返回 500
+                status, _ = await srv.batcher.submit("paths", request({"data": {"a": 1}}))
+                await asyncio.sleep(0.05)
+            assert status == 500
+            assert srv._pool is not broken and srv.batcher.restarts == 1
+            # 之后的请求在新进程池中正常处理
+            assert decode(await srv.batcher.submit("paths", request({"data": {"a": 1}}))) == (200, {"paths": ["a"]})
+            health = await srv._dispatch("GET", "/health", b"", True)
+            assert b'"pool_restarts":1' in health
+        finally:
+            await srv.close()
+
+    asyncio.run(main())
+
+
+# ----------------- HTTP -----------------
+def test_http_pipelined_keep_alive():
+    async def main():
+        srv = await EngineServer(port=0, workers=0).start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", srv.port)
+            bodies = [request({"data": {f"k{i}": i}}) for i in range(5)] + [b"{bad"]
+            for body in bodies:
+                writer.write(b"POST /paths HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+            writer.write(b"GET /nope HTTP/1.1\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            data = await reader.read()
+            writer.close()
+            return data
+        finally:
+            await srv.close()
+
+    responses = asyncio.run(main()).split(b"HTTP/1.1 ")[1:]
+    assert [r.split(b" ", 1)[0] for r in responses] == [b"200"] * 5 + [b"400", b"404"]
+    for i, response in enumerate(responses[:5]):
+        assert json.loads(response.split(b"\r\n\r\n", 1)[1]) == {"paths": [f"k{i}"]}
+    assert b"Connection: close" in responses[-1]
@@ -0,0 +1,75 @@
+# tests/test_users.py
+# 用户存储：增删改查、至少保留一个管理员、并发创建同名用户只有一个成功、旧版 users.json 导入
+import json
+import threading
+
+from engine.users import UserStore
+
+
+def test_add_get_and_set_password(tmp_path):
+    store = UserStore(str(tmp_path / "users.db"))
+    assert store.add("alice", "h1", is_admin=True)
+    assert not store.add("alice", "h2") # 已存在
+    assert store.get("alice") == {"username": "alice", "password": "h1", "is_admin": True}
+    assert store.get("bob") is None
+    assert store.set_password("alice", "h3")
+    assert not store.set_password("bob", "h3")
+    assert store.get("alice")["password"] == "h3"
+    store.close()
+
+
+def test_last_admin_cannot_be_deleted(tmp_path):
+    store = UserStore(str(tmp_path / "users.db"), default_users={"root": {"password": "h", "is_admin": True}})
+    store.add("alice", "h")
+    assert not store.delete("root") # 唯一的管理员
+    assert store.delete("alice")
+    assert not store.delete("alice") # 已不存在
+    store.add("admin2", "h", is_admin=True)
+    assert store.delete("root")
+    assert not store.delete("admin2")
+    assert store.list_users() == [("admin2", True)]
+    store.close()
+
+
+def test_concurrent_create_is_unique(tmp_path):
+    # 多个线程、多个连接（模拟多进程部署）同时创建同名用户，只有一个成功
+    path = str(tmp_path / "users.db")
+    stores = [UserStore(path) for _ in range(4)]
+    barrier = threading.Barrier(16)
+    results = {}
+
+    def create(i):
+        barrier.wait()
+        results[i] = stores[i % len(stores)].add("carol", f"h{i}")
+
+    threads = [threading.Thread(target=create, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    winners = [i for i, ok in results.items() if ok]
+    assert len(winners) == 1
+    assert stores[0].count() == 1
+    assert stores[1].get("carol")["password"] == f"h{winners[0]}"
+    for store in stores:
+        store.close()
+
+
+def test_legacy_json_import(tmp_path):
+    legacy = tmp_path / "users.json"
+    legacy.write_text(json.dumps({"Eric": {"password": "abc", "is_admin": True}, "bob": {"password": "def"}}), encoding="utf-8")
+    called = []
+
+    def default_users():
+        called.append(True)
+        return {"x": {"password": "y", "is_admin": True}}
+
+    store = UserStore(str(tmp_path / "users.db"), legacy_json=str(legacy), default_users=default_users)
+    assert store.list_users() == [("Eric", True), ("bob", False)]
+    assert not called # 导入旧版文件后不再计算初始用户
+    store.close()
+    # 库不为空时不再导入
+    legacy.write_text(json.dumps({"mallory": {"password": "z"}}), encoding="utf-8")
+    store = UserStore(str(tmp_path / "users.db"), legacy_json=str(legacy))
+    assert store.get("mallory") is None
+    store.close()
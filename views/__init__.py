@@ -0,0 +1,18 @@
+# views/__init__.py
+# 侧边栏页面：每个页面一个模块，首次打开时才导入（连同其重量级依赖），
+# 模块级常量每个进程只构建一次，脚本重跑时只执行当前页面的 render()
+import importlib
+
+PAGES = {
+    "首页": "home",
+    "结构化生成器": "generator",
+    "管理后台": "admin",
+    "JSON-LD 对比": "compare",
+    "解析诊断": "diagnose",
+    "外部资源": "resources",
+    "高级功能": "advanced",
+}
+
+
+def render_page(page):
+    importlib.import_module(f"{__name__}.{PAGES[page]}").render()
@@ -0,0 +1,98 @@
+# views/admin.py
+# 管理后台
+import streamlit as st
+
+from engine import metrics
+
+from .common import get_user_store, hash_password
+
+
+def render():
+    import pandas as pd # 只有首页表格和管理后台用到 pandas，打开页面时再导入
+
+    user_store = get_user_store()
+    current_user = st.session_state.username
+    current_account = user_store.get(current_user)
+    if not current_account or not current_account["is_admin"]:
+        st.error("🚫 您无权访问后台管理页面")
+        st.stop()
+
+    st.title("🛠 管理后台")
+    st.subheader("👥 用户管理")
+    st.markdown("### 当前所有用户")
+    all_users = user_store.list_users()
+    user_table = pd.DataFrame([
+        {"用户名": k, "是否管理员": "✅" if admin else "❌"} for k, admin in all_users
+    ])
+    st.table(user_table)
+
+    st.markdown("### ➕ 添加新用户")
+    new_user = st.text_input("新用户名", key="new_user_input")
+    new_pass = st.text_input("新密码", type="password", key="new_pass_input")
+    is_admin = st.checkbox("是否设为管理员", key="is_admin_checkbox")
+    if st.button("添加用户"):
+        if not (new_user and new_pass):
+            st.error("请输入完整的用户名和密码")
+        elif not user_store.add(new_user, hash_password(new_pass), is_admin): # 存在性检查与写入在同一条语句中完成
+            st.warning("该用户已存在")
+        else:
+            st.success("用户添加成功！")
+            st.experimental_rerun()
+
+    st.markdown("### 🔑 重置用户密码")
+    users_to_reset = [u for u, _ in all_users if u != current_user]
+    if not users_to_reset:
+        st.info("没有其他用户可供重置密码。")
+    else:
+        reset_user = st.selectbox("选择用户", users_to_reset, key="reset_user_select")
+        new_password_for_reset = st.text_input("新密码", type="password", key="new_password_reset_input")
+        if st.button("重置密码"):
+            if reset_user and new_password_for_reset:
+                if user_store.set_password(reset_user, hash_password(new_password_for_reset)):
+                    st.success(f"用户 `{reset_user}` 的密码已更新！")
+                    st.experimental_rerun()
+                else:
+                    st.warning(f"用户 `{reset_user}` 已不存在，请刷新页面。")
+            else:
+                st.error("请输入新密码。")
+
+
+    st.markdown("### 🗑 删除用户")
+    # 不允许删除当前登录用户；最后一个管理员由 UserStore.delete 在同一事务内拒绝删除
+    deletable_users = [u for u, _ in all_users if u != current_user]
+
+    if deletable_users:
+        delete_user = st.selectbox("选择要删除的用户", deletable_users, key="delete_user_select")
+        if st.button("删除用户", key="delete_user_btn"):
+            if delete_user:
+                if user_store.delete(delete_user):
+                    st.success(f"用户 `{delete_user}` 已删除！")
+                    st.experimental_rerun()
+                else:
+                    st.warning(f"无法删除 `{delete_user}`：用户不存在，或是最后一个管理员账户。")
+            else:
+                st.warning("请选择一个用户进行删除。")
+    else:
+        st.info("没有其他用户可供删除。请确保至少保留一个管理员账户。")
+
+    st.subheader("⏱ 性能监控")
+    if not metrics.is_enabled():
+        st.info("性能埋点未开启（环境变量 SDA_METRICS=0）。")
+    else:
+        stats = metrics.REGISTRY.snapshot()
+        if stats:
+            # 分位数由直方图分桶插值估算，单位为毫秒
+            st.dataframe(pd.DataFrame([
+                {"操作": op, "次数": s["count"], "平均 ms": round(s["mean"] * 1000, 2), "p50 ms": round(s["p50"] * 1000, 2),
+                 "p95 ms": round(s["p95"] * 1000, 2), "p99 ms": round(s["p99"] * 1000, 2), "最大 ms": round(s["max"] * 1000, 2)}
+                for op, s in stats.items()
+            ]), use_container_width=True)
+        else:
+            st.info("暂无数据。")
+        col_export, col_reset = st.columns(2)
+        with col_export:
+            st.download_button("⬇️ 下载 Prometheus 指标", metrics.REGISTRY.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+        with col_reset:
+            if st.button("清空统计", key="reset_metrics_btn"):
+                metrics.REGISTRY.reset()
+                st.experimental_rerun()
@@ -0,0 +1,218 @@
+# views/advanced.py
+# 高级功能
+import json
+
+import streamlit as st
+
+from engine import get_all_paths
+from engine.coverage import FieldCoverage
+from engine.extract import extract_jsonld_stream, parse_jsonld_block
+from engine.merge import CONFLICT_POLICIES, GraphMerger, split_documents
+from engine.metrics import timed, timer
+from engine.reformat import reformat_text
+from engine.serialize import dumps
+
+from .common import get_result_cache, load_json, parse_json_cached
+
+STREAM_CONVERT_THRESHOLD = 1024 * 1024 # 超过该长度的文本在格式转换时走流式转换，不构建对象树
+CONFLICT_LABELS = {"first": "保留先出现的值", "last": "使用后出现的值", "all": "全部保留为数组"}
+
+
+@timed("convert_json")
+def convert_json_text(text, pretty):
+    if len(text) > STREAM_CONVERT_THRESHOLD:
+        return reformat_text(text, pretty=pretty, multiple=False) # 字符串和数值按原样保留；与 json.loads 一样只接受一个顶层值
+    return dumps(parse_json_cached(text), pretty=pretty)
+
+
+@timed("get_all_paths")
+def extract_paths(text):
+    return sorted(list(set(get_all_paths(load_json(text))))) # 去重并排序
+
+
+def count_uploaded(coverage, uploaded_file):
+    # .jsonl 每行一个文档（可为批量抓取输出）；.json / .jsonld 为单个文档，或之前下载的统计结果（直接累加）
+    text = uploaded_file.getvalue().decode("utf-8")
+    if uploaded_file.name.lower().endswith(".jsonl"):
+        for line in text.splitlines():
+            if line.strip():
+                coverage.add_text(line)
+        return
+    try:
+        data = load_json(text)
+    except (json.JSONDecodeError, RecursionError):
+        coverage.add_text(text) # 记为解析失败的文档
+        return
+    if FieldCoverage.is_state(data):
+        coverage.merge(FieldCoverage.from_dict(data))
+    else:
+        coverage.add(data)
+
+
+@timed("merge_graph")
+def merge_pasted(text, conflicts):
+    # 粘贴内容可以是整段 HTML（提取其中的 ld+json 脚本块），也可以是首尾相接的多个 JSON 块；
+    # 返回 (合并后的 JSON 文本, 统计, 冲突明细, 解析失败的块)
+    merger = GraphMerger(conflicts)
+    failures = []
+    if "<script" in text.lower():
+        for i, raw in enumerate(extract_jsonld_stream(text), 1):
+            data, error = parse_jsonld_block(raw)
+            if error:
+                failures.append(f"第 {i} 个脚本块：{error}")
+            else:
+                merger.add(data)
+    else:
+        for data in split_documents(text):
+            merger.add(data)
+    return dumps(merger.to_graph(), pretty=True), merger.summary(), list(merger.conflicts), failures
+
+
+def render():
+    result_cache = get_result_cache()
+
+    st.title("⚙️ 高级功能")
+    st.write("探索一些额外的 JSON-LD 处理工具。")
+
+    st.subheader("JSON-LD 格式转换")
+    st.write("将格式化的 JSON-LD 转换为单行紧凑模式，或反之。")
+    json_to_convert = st.text_area("粘贴您的 JSON-LD 代码", height=250, key="convert_json_input")
+
+    col_compact, col_pretty = st.columns(2)
+    with col_compact:
+        convert_to_compact_btn = st.button("转换为紧凑模式 (一行)")
+    with col_pretty:
+        convert_to_pretty_btn = st.button("转换为美化模式 (格式化)")
+
+    converted_output = ""
+    if convert_to_compact_btn:
+        try:
+            converted_output = convert_json_text(json_to_convert, pretty=False)
+            st.success("已转换为紧凑模式！")
+        except ValueError: # 包括 json.JSONDecodeError
+            st.error("JSON 格式错误，无法转换。")
+        except Exception as e:
+            st.error(f"转换时发生错误: {e}")
+    elif convert_to_pretty_btn:
+        try:
+            converted_output = convert_json_text(json_to_convert, pretty=True)
+            st.success("已转换为美化模式！")
+        except ValueError:
+            st.error("JSON 格式错误，无法转换。")
+        except Exception as e:
+            st.error(f"转换时发生错误: {e}")
+
+    if converted_output:
+        st.text_area("转换结果", value=converted_output, height=200, key="converted_output_area")
+        if st.button("📋 复制转换结果", key="copy_converted_btn"):
+            st.session_state.converted_json_to_copy = converted_output # 存储以便复制
+            st.success("已复制转换结果！")
+
+
+    st.markdown("---")
+    st.subheader("JSON-LD 字段提取")
+    st.write("输入 JSON-LD，提取其所有字段路径。")
+    json_to_extract = st.text_area("粘贴 JSON-LD 代码", height=250, key="extract_json_input")
+    extract_button = st.button("提取字段")
+
+    if extract_button:
+        if not json_to_extract.strip():
+            st.warning("请输入 JSON-LD 代码以提取字段。")
+        else:
+            try:
+                extracted_paths = result_cache.get_or_compute(
+                    "paths", json_to_extract, lambda: extract_paths(json_to_extract)
+                )
+                
+                if extracted_paths:
+                    st.success("已成功提取所有字段路径：")
+                    st.code("\n".join(extracted_paths), language="text")
+                    if st.button("📋 复制提取的字段", key="copy_extracted_fields_btn"):
+                        st.session_state.extracted_fields_to_copy = "\n".join(extracted_paths)
+                        st.success("已复制提取的字段！")
+                else:
+                    st.info("未找到可提取的字段路径。")
+
+            except json.JSONDecodeError:
+                st.error("JSON 格式错误，无法提取字段。")
+            except Exception as e:
+                st.error(f"提取字段时发生错误: {e}")
+
+
+    st.markdown("---")
+    st.subheader("语料字段覆盖率")
+    st.write("上传多个 JSON-LD 文件（.json / .jsonld，或每行一个文档的 .jsonl，可为批量抓取输出），统计每种类型中各字段出现在多少个文档里；"
+             "数组下标统一记为 `[]`。上传之前下载的统计结果可在其基础上继续累加。")
+    coverage = st.session_state.get("field_coverage")
+    coverage_files = st.file_uploader("选择文件", type=["json", "jsonld", "jsonl"], accept_multiple_files=True, key="coverage_files")
+    col_add, col_reset = st.columns(2)
+    with col_add:
+        coverage_add_btn = st.button("统计并累加到当前结果", key="coverage_add_btn")
+    with col_reset:
+        coverage_reset_btn = st.button("清空统计", key="coverage_reset_btn")
+
+    if coverage_reset_btn:
+        st.session_state.pop("field_coverage", None)
+        coverage = None
+    elif coverage_add_btn:
+        if not coverage_files:
+            st.warning("请先选择要统计的文件。")
+        else:
+            coverage = coverage or FieldCoverage()
+            with timer("field_coverage"):
+                for uploaded_file in coverage_files:
+                    try:
+                        count_uploaded(coverage, uploaded_file)
+                    except (UnicodeDecodeError, ValueError) as e:
+                        st.error(f"无法读取 {uploaded_file.name}: {e}")
+            st.session_state.field_coverage = coverage
+
+    if coverage and coverage.types:
+        st.caption(f"累计 {coverage.documents} 个文档，解析失败 {coverage.failed} 个。")
+        coverage_type = st.selectbox(
+            "类型", [name for name, _ in coverage.types.most_common()],
+            format_func=lambda name: f"{name}（{coverage.types[name]} 个文档）", key="coverage_type_select",
+        )
+        st.dataframe(
+            [{"字段路径": row["path"], "文档数": row["documents"], "覆盖率": row["coverage"] * 100} for row in coverage.rows(coverage_type)],
+            column_config={"覆盖率": st.column_config.ProgressColumn("覆盖率", format="%.1f%%", min_value=0, max_value=100)},
+            use_container_width=True, hide_index=True,
+        )
+        st.download_button("⬇️ 下载统计结果", dumps(coverage.to_dict()), file_name="field-coverage.json", mime="application/json")
+    elif coverage:
+        st.info("上传的文档中没有带 @type 的实体。")
+
+
+    st.markdown("---")
+    st.subheader("多块合并为 @graph")
+    st.write("粘贴页面中的多个 JSON-LD 块（首尾相接的 JSON，或直接粘贴整段 HTML），合并为一个 `@graph`："
+             "相同 `@id` 的节点合并属性，没有 `@id` 的重复节点只保留一份，嵌套的带 `@id` 定义改写为引用。")
+    json_to_merge = st.text_area("粘贴 JSON-LD 块或 HTML", height=250, key="merge_json_input")
+    merge_conflicts = st.radio(
+        "属性值冲突时", CONFLICT_POLICIES, format_func=CONFLICT_LABELS.get, horizontal=True, key="merge_conflicts_radio"
+    )
+    if st.button("合并", key="merge_graph_btn"):
+        if not json_to_merge.strip():
+            st.warning("请输入要合并的 JSON-LD 块。")
+        else:
+            try:
+                merged_text, merge_summary, merge_conflict_list, merge_failures = result_cache.get_or_compute(
+                    "merge", json_to_merge, lambda: merge_pasted(json_to_merge, merge_conflicts), params=merge_conflicts
+                )
+                for failure in merge_failures:
+                    st.error(failure)
+                st.success(
+                    f"{merge_summary['blocks']} 个块合并为 {merge_summary['nodes']} 个节点（按 @id 合并 {merge_summary['merged']} 次，"
+                    f"重复节点 {merge_summary['duplicates']} 个，嵌套定义改写为引用 {merge_summary['hoisted']} 处）"
+                )
+                if merge_summary["contexts"] > 1:
+                    st.warning("输入中的 @context 写法不一致，合并结果使用第一个块的 @context。")
+                if merge_conflict_list:
+                    st.info(f"{merge_summary['conflicts']} 处属性值冲突（{CONFLICT_LABELS[merge_conflicts]}）：")
+                    st.dataframe([{"@id": node_id, "属性": path} for node_id, path in merge_conflict_list], use_container_width=True, hide_index=True)
+                st.code(merged_text, language="json")
+                st.download_button("⬇️ 下载合并结果", merged_text, file_name="merged.jsonld", mime="application/ld+json")
+            except json.JSONDecodeError:
+                st.error("JSON 格式错误，无法合并。")
+            except Exception as e:
+                st.error(f"合并时发生错误: {e}")
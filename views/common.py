@@ -0,0 +1,57 @@
+# views/common.py
+# 各页面共用的进程级资源：密码哈希、用户存储、结果缓存、模板库
+import json
+import os
+
+import streamlit as st
+
+from engine.cache import MemoryCache, ResultCache
+from engine.metrics import timed
+from engine.passwords import PasswordHasher
+from engine.users import UserStore
+
+# 运行时数据（用户库）所在目录，默认为当前目录，可用环境变量 SDA_DATA_DIR 指定到仓库以外的位置
+DATA_DIR = os.environ.get("SDA_DATA_DIR") or "."
+USER_FILE = os.path.join(DATA_DIR, "users.json") # 旧版用户文件，首次启动时导入 USER_DB_FILE
+USER_DB_FILE = os.path.join(DATA_DIR, "users.db")
+
+
+# ----------------- 密码哈希函数 -----------------
+# 加盐 scrypt，在调用线程上计算（同时进行的计算数有上限）；旧版 SHA-256 哈希在登录成功时自动升级
+@st.cache_resource
+def get_password_hasher():
+    return PasswordHasher()
+
+
+def hash_password(password):
+    return get_password_hasher().hash(password)
+
+
+# ----------------- 用户存储（进程级，所有会话共享） -----------------
+@st.cache_resource
+def get_user_store():
+    # 初始用户 Eric 的密码也应是哈希过的；只在库为空、需要写入初始用户时才计算
+    def default_users():
+        return {"Eric": {"password": hash_password("1314"), "is_admin": True}}
+    return UserStore(USER_DB_FILE, legacy_json=USER_FILE, default_users=default_users)
+
+
+# ----------------- 结果缓存（进程级，所有会话共享） -----------------
+# 以输入内容哈希为键，输入未变化时重跑页面不再重复解析、诊断和对比；缓存结果只读，不要原地修改
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(MemoryCache(max_items=256, max_bytes=64 * 1024 * 1024))
+
+
+load_json = timed("json.loads")(json.loads)
+
+
+def parse_json_cached(text):
+    return get_result_cache().get_or_compute("parse", text, lambda: load_json(text))
+
+
+# ----------------- 模板库（进程级，文件修改后自动重新加载） -----------------
+@st.cache_resource
+def get_template_registry():
+    from engine.templates import TemplateRegistry # 只有结构化生成器用到，首次打开时再加载模板
+    return TemplateRegistry()
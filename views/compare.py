@@ -0,0 +1,156 @@
+# views/compare.py
+# JSON-LD 对比
+import json
+
+import streamlit as st
+
+from engine import diff_json, find_common_fields, format_patch
+from engine.cluster import DEFAULT_THRESHOLD, ClusterIndex, document_of, fingerprint
+from engine.graph import GraphIndex, diff_nodes
+from engine.metrics import timed
+from engine.serialize import dumps
+
+from .common import get_result_cache, load_json, parse_json_cached
+
+MAX_MEMBER_CHOICES = 1000 # 簇内可选择的页面数上限
+
+
+@timed("diff_json")
+def compute_diff(json_a, json_b):
+    # 两侧都有带 @id 的节点时，额外给出按 @id 对齐的节点级摘要
+    graph_a, graph_b = GraphIndex(json_a), GraphIndex(json_b)
+    node_diff = diff_nodes(graph_a, graph_b) if graph_a.ids() and graph_b.ids() else None
+    return diff_json(json_a, json_b), find_common_fields(json_a, json_b), node_diff
+
+
+@timed("cluster_corpus")
+def build_clusters(text, threshold):
+    # 每行一个文档（爬虫输出的记录以 url 为页面名），返回 (ClusterIndex, {页面: 文档})
+    index = ClusterIndex(threshold=threshold)
+    documents = {}
+    for line_no, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            doc_id, data = document_of(load_json(line), f"第 {line_no} 行")
+            fp = fingerprint(data, index.num_perm)
+        except (RecursionError, ValueError): # 包括 json.JSONDecodeError 与嵌套过深
+            index.documents += 1
+            index.failed += 1
+            continue
+        index.add_fingerprint(doc_id, fp)
+        documents[doc_id] = data
+    return index, documents
+
+
+def render_clusters(result_cache):
+    st.markdown("---")
+    st.subheader("🧩 模板簇对比")
+    st.write("上传批量抓取输出的 JSONL（或每行一个 JSON-LD 文档），完全相同或只有少数字段不同的页面会归为一簇，"
+             "每个页面只需与所在簇的代表页面对比，不必两两比较。")
+    corpus_file = st.file_uploader("选择 JSONL 文件", type=["jsonl"], key="cluster_file")
+    threshold = st.slider("近似重复阈值（字段相似度）", 0.5, 1.0, DEFAULT_THRESHOLD, 0.05, key="cluster_threshold")
+    if corpus_file is None:
+        return
+    try:
+        text = corpus_file.getvalue().decode("utf-8")
+    except UnicodeDecodeError as e:
+        st.error(f"无法读取文件: {e}")
+        return
+    index, documents = result_cache.get_or_compute("cluster", text, lambda: build_clusters(text, threshold), params=threshold)
+
+    summary = index.summary()
+    st.caption(f"{summary['documents']} 个页面（解析失败 {summary['failed']} 个），{summary['exact_groups']} 种不同内容，"
+               f"{summary['clusters']} 个簇，其中 {summary['near_duplicate_clusters']} 个含近似副本。")
+
+    shared_blocks = index.shared_blocks()
+    if shared_blocks:
+        st.markdown("**共用的样板块**（原样出现在多个页面中的顶层实体）")
+        st.dataframe([{"类型": b["type"], "页面数": b["pages"], "示例页面": b["sample"]} for b in shared_blocks[:100]],
+                     use_container_width=True, hide_index=True)
+
+    clusters = index.clusters(min_size=2)
+    if not clusters:
+        st.info("没有发现重复或近似重复的页面。")
+        return
+    cluster = st.selectbox(
+        "选择簇", clusters, key="cluster_select",
+        format_func=lambda c: f"簇 {c['id']}：{c['size']} 个页面，{c['exact_groups']} 种内容，代表页面 {c['representative']}",
+    )
+    representative = cluster["representative"]
+    others = [doc_id for doc_id in cluster["members"] if doc_id != representative]
+    if len(others) > MAX_MEMBER_CHOICES:
+        st.caption(f"簇内页面较多，只列出前 {MAX_MEMBER_CHOICES} 个。")
+    member = st.selectbox("与代表页面对比的页面", others[:MAX_MEMBER_CHOICES], key="cluster_member_select")
+    if member is None:
+        return
+    if index.is_exact_duplicate(representative, member):
+        st.success(f"`{member}` 与代表页面 `{representative}` 的结构化数据完全相同。")
+        return
+    st.caption(f"估计字段相似度 {index.estimate_similarity(representative, member):.0%}")
+    diff_ops = diff_json(documents[representative], documents[member])
+    st.warning(f"与代表页面 `{representative}` 的差异：")
+    for diff in format_patch(diff_ops):
+        st.markdown(f"- {diff}")
+
+
+def render():
+    result_cache = get_result_cache()
+
+    st.title("⚖️ JSON-LD 对比分析")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("JSON-LD 片段 A")
+        json_a_str = st.text_area("在此处粘贴第一个 JSON-LD", height=350, key="json_a_input")
+    with col2:
+        st.subheader("JSON-LD 片段 B")
+        json_b_str = st.text_area("在此处粘贴第二个 JSON-LD", height=350, key="json_b_input")
+
+    compare_button = st.button("🔬 对比 JSON")
+
+    if compare_button:
+        try:
+            json_a = parse_json_cached(json_a_str)
+            json_b = parse_json_cached(json_b_str)
+
+            st.subheader("对比结果")
+
+            # 结构化补丁，列表按 @id / sku / name 对齐
+            diff_ops, common_fields_results, node_diff = result_cache.get_or_compute(
+                "diff", f"{json_a_str}\0{json_b_str}", lambda: compute_diff(json_a, json_b)
+            )
+            diff_results = format_patch(diff_ops)
+
+            if node_diff and (node_diff["added"] or node_diff["removed"] or node_diff["changed"]):
+                st.info(f"按 `@id` 对齐的节点：新增 {len(node_diff['added'])} 个，删除 {len(node_diff['removed'])} 个，修改 {len(node_diff['changed'])} 个。")
+                for node_id in node_diff["added"]:
+                    st.markdown(f"- 新增节点 `{node_id}`")
+                for node_id in node_diff["removed"]:
+                    st.markdown(f"- 删除节点 `{node_id}`")
+                for node_id, ops in node_diff["changed"].items():
+                    st.markdown(f"- 修改节点 `{node_id}`：{len(ops)} 处差异")
+
+            if diff_results:
+                st.warning("发现差异：")
+                for diff in diff_results:
+                    st.markdown(f"- {diff}")
+                st.download_button("⬇️ 下载 JSON Patch", dumps(diff_ops, pretty=True), file_name="jsonld-diff.json", mime="application/json")
+            else:
+                st.success("两个 JSON-LD 片段完全相同。")
+
+            st.markdown("---")
+            st.subheader("共同字段")
+            if common_fields_results:
+                st.markdown("以下字段在两个 JSON 中都存在：")
+                for field in sorted(common_fields_results):
+                    st.markdown(f"- `{field}`")
+            else:
+                st.info("两个 JSON-LD 片段没有共同字段。")
+
+        except json.JSONDecodeError:
+            st.error("请输入有效的 JSON 格式数据。")
+        except Exception as e:
+            st.error(f"处理 JSON 时发生错误: {e}")
+
+    render_clusters(result_cache)
@@ -0,0 +1,67 @@
+# views/diagnose.py
+# 解析诊断
+import streamlit as st
+
+from engine.incremental import IncrementalDiagnoser
+from engine.metrics import timer
+
+
+def get_diagnoser():
+    # 每个会话一个增量诊断器：记住上次的文档，再次诊断时只重新校验改动过的顶层实体；
+    # 不经过进程级结果缓存，否则缓存命中时诊断器的状态不会更新，下次编辑会与过期的文档比较
+    if "diagnoser" not in st.session_state:
+        st.session_state.diagnoser = IncrementalDiagnoser()
+    return st.session_state.diagnoser
+
+
+def diagnose_incremental(text):
+    with timer("diagnose_jsonld"):
+        return get_diagnoser().diagnose(text)
+
+
+def render():
+    st.title("🔍 JSON-LD 解析诊断")
+    st.write("在此处粘贴您的 JSON-LD 代码，我们将帮助您检查其语法有效性。")
+
+    json_to_diagnose = st.text_area("JSON-LD 代码", height=300, key="diagnose_json_input")
+    diagnose_button = st.button("运行诊断")
+    auto_diagnose = st.toggle("修改后自动重新诊断", value=True, key="diagnose_auto")
+
+    if diagnose_button or (auto_diagnose and json_to_diagnose.strip()):
+        if not json_to_diagnose.strip():
+            st.warning("请输入 JSON-LD 代码以进行诊断。")
+        else:
+            try:
+                # 尝试解析 JSON 并检查基本的 JSON-LD 结构；大文档只重新校验改动过的实体，文本未变化时直接复用上次结果
+                result = diagnose_incremental(json_to_diagnose)
+                if result["valid"]:
+                    st.success("🎉 JSON 语法有效！")
+                    for warning in result["warnings"]:
+                        st.warning(warning)
+
+                    # schema.org 词表校验：类型、属性适用性、必填与推荐字段
+                    schema_errors = [i for i in result["issues"] if i["level"] == "error"]
+                    schema_warnings = [i for i in result["issues"] if i["level"] == "warning"]
+                    if schema_errors:
+                        st.error("Schema.org 校验错误：\n" + "\n".join(f"- `{i['path']}`：{i['message']}" for i in schema_errors))
+                    if schema_warnings:
+                        st.warning("Schema.org 校验建议：\n" + "\n".join(f"- `{i['path']}`：{i['message']}" for i in schema_warnings))
+                    if not result["issues"]:
+                        st.success("✅ 已通过 Schema.org 词表校验。")
+
+                    # 多实体文档（@graph / 多个脚本块）：按类型统计节点与 @id 引用
+                    stats = result["stats"]
+                    if stats["nodes"] > 1:
+                        type_summary = "，".join(f"{name} × {count}" for name, count in stats["types"].items())
+                        st.info(f"共 {stats['nodes']} 个节点（{type_summary}），{stats['references']} 处 `@id` 引用。")
+                    incremental = result.get("incremental")
+                    if incremental and not incremental["full"]:
+                        st.caption(f"增量诊断：本次重新校验 {incremental['rechecked']} / {incremental['units']} 个顶层实体。")
+
+                    st.markdown("#### 解析后的数据结构预览：")
+                    st.json(result["data"]) # 显示格式化的JSON
+                else:
+                    st.error(f"❌ JSON 语法错误：\n`{result['error']}`\n请检查您的 JSON 格式。")
+                    st.info("常见错误：缺少逗号、双引号、方括号或花括号不匹配等。")
+            except Exception as e:
+                st.error(f"诊断时发生未知错误: {e}")
@@ -0,0 +1,227 @@
+# views/generator.py
+# 结构化生成器（含 AI 语料提示词生成）
+import json
+from datetime import datetime
+
+import streamlit as st
+
+from engine import build_nested_json
+from engine.metrics import timer
+from engine.prompts import GENERAL_TEMPLATE, default_renderer, render_docs
+from engine.schema_fields import SCHEMA_FIELDS
+from engine.serialize import dumps
+
+from .common import get_template_registry
+
+TEMPLATE_VALUES = {
+    "Article": {
+        "headline": "示例文章标题：探索人工智能的未来",
+        "author.name": "张三",
+        "datePublished": "2024-06-24",
+        "image": "https://example.com/ai_future_image.jpg",
+        "articleBody": "人工智能（AI）正在迅速改变我们的世界，从自动化日常任务到推动科学发现。本文将深入探讨AI的最新进展、未来趋势以及它对社会可能产生的影响。我们将讨论机器学习、深度学习、自然语言处理等关键技术，以及AI在医疗、金融、教育等领域的应用前景。"
+    },
+    "Product": {
+        "name": "智能降噪耳机 Pro",
+        "image": "https://example.com/headphone.jpg",
+        "description": "沉浸式聆听体验，主动降噪技术，超长续航，舒适佩戴。",
+        "sku": "SKU00123",
+        "brand.name": "TechAudio",
+        "offers.price": "199.99",
+        "offers.priceCurrency": "USD"
+    },
+    "FAQPage": {
+        "mainEntity[0].question": "什么是结构化数据？",
+        "mainEntity[0].acceptedAnswer.text": "结构化数据是指按照预定义的数据模型进行组织和存储的数据，通常以表格形式呈现，具有明确的行和列。它易于搜索和分析，例如数据库中的数据。"
+    }
+}
+
+# 模板缺少必需字段时的提示
+PROMPT_HINTS = {
+    "faq": "请在上方结构化数据中输入 FAQ 内容（例如 'mainEntity[0].question' 和 'mainEntity[0].acceptedAnswer.text'），然后选择此选项以生成 FAQ 提示词。",
+    "general": "请在上方输入字段内容以生成通用 AI 提示词。",
+}
+
+SOCIAL_PLATFORMS = {
+    "Facebook": "https://facebook.com/",
+    "Instagram": "https://instagram.com/",
+    "LinkedIn": "https://linkedin.com/in/",
+    "Twitter": "https://twitter.com/",
+    "YouTube": "https://youtube.com/",
+    "WhatsApp": "https://wa.me/"
+}
+
+
+def render():
+    template_registry = get_template_registry()
+
+    st.title("🧱 结构化数据生成器")
+    if template_registry.errors:
+        with st.expander(f"⚠️ {sum(len(m) for m in template_registry.errors.values())} 个模板加载失败，已跳过"):
+            for path, messages in template_registry.errors.items():
+                for message in messages:
+                    st.text(f"{path}: {message}")
+
+    left, right = st.columns([1, 1])
+
+    with left:
+        selected_schema = st.selectbox("选择 Schema 类型", list(SCHEMA_FIELDS.keys()), key="schema_type_select")
+        st.markdown("#### 📌 可用字段（点击选中）")
+        selected_fields = st.multiselect("字段选择", SCHEMA_FIELDS[selected_schema], key="fields_multiselect")
+
+        # 内置示例 + 模板库中 @type 匹配的模板
+        template_choices = (["内置示例"] if selected_schema in TEMPLATE_VALUES else []) + [t["name"] for t in template_registry.by_type(selected_schema)]
+        if len(template_choices) > 1:
+            template_choice = st.selectbox("示例模板来源", template_choices, key="template_choice_select")
+        else:
+            template_choice = template_choices[0] if template_choices else None
+
+        if st.button("🧪 使用示例模板") :
+            if template_choice:
+                if template_choice == "内置示例":
+                    template_values = TEMPLATE_VALUES[selected_schema]
+                else:
+                    template = template_registry.get(template_choice)
+                    template_values = template["fields"] if template else {} # 模板可能在两次重跑之间被删除
+                for k, v in template_values.items():
+                    if k not in selected_fields:
+                         selected_fields.append(k)
+                    st.session_state[f"custom_{k}"] = v if isinstance(v, str) else json.dumps(v, ensure_ascii=False)
+                st.info(f"已加载 {selected_schema} 类型的示例模板。")
+            else:
+                st.warning(f"当前 {selected_schema} 类型没有可用的示例模板。")
+
+
+        st.markdown("#### 🌐 选择社交平台（可多选）")
+        selected_socials = st.multiselect("社交平台", list(SOCIAL_PLATFORMS.keys()), key="socials_multiselect")
+
+        st.markdown("#### ➕ 添加自定义字段")
+        custom_key = st.text_input("字段名（如 brand.color 或 myField[0].subField）", key="custom_key_input")
+        custom_val = st.text_input("字段值", key="custom_val_input")
+        if st.button("添加字段") and custom_key:
+            if custom_key not in selected_fields:
+                selected_fields.append(custom_key)
+            st.session_state[f"custom_{custom_key}"] = custom_val
+            st.success(f"已添加字段 {custom_key}")
+
+    field_inputs = {}
+    with right:
+        st.markdown("#### ✏️ 输入字段内容")
+        for field in selected_fields:
+            default_val = st.session_state.get(f"custom_{field}", "")
+            input_key = f"input_{field.replace('.', '_').replace('[', '_').replace(']', '_')}"
+
+            if "date" in field.lower():
+                try:
+                    default_date_obj = datetime.strptime(str(default_val), "%Y-%m-%d").date() if default_val else datetime.today().date()
+                except ValueError:
+                    default_date_obj = datetime.today().date()
+                val = st.date_input(field, value=default_date_obj, key=input_key).isoformat()
+            elif "url" in field.lower() or "image" in field.lower() or "logo" in field.lower():
+                val = st.text_input(field, value=default_val, placeholder="https://example.com/path", key=input_key)
+                if val and not (val.startswith("http://") or val.startswith("https://")):
+                    st.warning(f"字段 {field} 应为合法 URL (以 http:// 或 https:// 开头)")
+            elif "price" in field.lower() and "currency" not in field.lower():
+                try:
+                    val = st.number_input(field, value=float(default_val) if default_val else 0.0, format="%.2f", key=input_key)
+                except ValueError:
+                    val = st.number_input(field, value=0.0, format="%.2f", key=input_key)
+            elif "ratingValue" in field.lower():
+                 try:
+                    val = st.number_input(field, min_value=1.0, max_value=5.0, value=float(default_val) if default_val else 4.0, step=0.1, key=input_key)
+                 except ValueError:
+                    val = st.number_input(field, min_value=1.0, max_value=5.0, value=4.0, step=0.1, key=input_key)
+            elif "articleBody" in field or "description" in field or "reviewBody" in field or "recipeInstructions" in field:
+                val = st.text_area(field, value=default_val, height=150, key=input_key)
+            else:
+                val = st.text_input(field, value=default_val, key=input_key)
+
+            if val is not None:
+                field_inputs[field] = val
+
+        social_links = []
+        if selected_socials:
+            st.markdown("#### 🔗 填写社交链接")
+            for platform in selected_socials:
+                social_input_key = f"social_{platform.lower()}_input"
+                url = st.text_input(f"{platform} 链接", placeholder=SOCIAL_PLATFORMS[platform], key=social_input_key)
+                if url:
+                    if not (url.startswith("http://") or url.startswith("https://")):
+                        st.warning(f"{platform} 链接需为有效 URL (以 http:// 或 https:// 开头)")
+                    social_links.append(url)
+
+        st.markdown("#### 📄 实时 JSON-LD 模板")
+
+        schema = {
+            "@context": "https://schema.org",
+            "@type": selected_schema
+        }
+        generated_json_data = {}
+        try:
+            filtered_field_inputs = {k: v for k, v in field_inputs.items() if v not in ["", 0.0]}
+            with timer("build_nested_json"):
+                generated_json_data = build_nested_json(filtered_field_inputs, warn=st.warning)
+            schema.update(generated_json_data)
+        except ValueError as e:
+            st.error(f"构建 JSON-LD 时出错: {e}. 请检查您的字段名格式，特别是数组索引。")
+
+
+        if social_links:
+            schema["sameAs"] = [link for link in social_links if link]
+
+        pretty = st.toggle("格式化显示 JSON", value=True, key="pretty_toggle")
+        schema_str = dumps(schema, pretty=pretty)
+        st.code(schema_str, language="json")
+
+        if st.button("📋 复制结构化数据", key="copy_schema_btn"):
+            st.session_state.schema_json = schema_str
+            st.success("已复制，请粘贴到目标位置或富媒体工具")
+            st.text_area("手动复制区（Ctrl+C）", schema_str, height=300, key="manual_copy_area")
+
+    # ----------------- AI 语料提示词生成 (已存在但优化了代码结构) -----------------
+    st.markdown("---")
+    st.subheader("🤖 AI 语料提示词生成")
+
+    renderer = default_renderer()
+    prompt_labels = {template.label: name for name, template in renderer.templates.items()}
+    prompt_type = st.selectbox("选择提示词类型", list(prompt_labels), key="ai_prompt_type_select")
+
+    # 选择的提示词类型与当前 Schema 类型不匹配时使用通用描述模板
+    prompt_template = renderer.templates[prompt_labels[prompt_type]]
+    if selected_schema not in prompt_template.types:
+        prompt_template = renderer.templates[GENERAL_TEMPLATE]
+    ai_prompt = prompt_template.render(schema) or PROMPT_HINTS.get(prompt_template.name, "")
+
+    if ai_prompt:
+        st.text_area("生成的 AI 提示词", ai_prompt, height=250, key="ai_prompt_output")
+        if st.button("📋 复制 AI 提示词", key="copy_ai_prompt_btn"):
+            st.session_state.ai_prompt_to_copy = ai_prompt
+            st.success("AI 提示词已复制！")
+    else:
+        st.info("请选择 Schema 类型并填写相关字段，然后选择提示词类型以生成 AI 提示词。")
+
+    # ----------------- 批量生成提示词 -----------------
+    st.markdown("#### 📦 批量生成提示词")
+    st.write("上传每行一个 JSON-LD 文档的 JSONL 文件（如商品目录批量生成或批量抓取的输出），按 @type 为每个商品、文章、FAQ 页面生成提示词。"
+             "几十万行的文件请使用命令行 `python -m engine.prompts`。")
+    prompt_file = st.file_uploader("选择 JSONL 文件", type=["jsonl"], key="prompt_batch_file")
+    if st.button("批量生成", key="prompt_batch_btn"):
+        if prompt_file is None:
+            st.warning("请先上传 JSONL 文件。")
+        else:
+            try:
+                lines = prompt_file.getvalue().decode("utf-8").splitlines()
+            except UnicodeDecodeError as e:
+                st.error(f"无法读取文件: {e}")
+            else:
+                docs = [(f"{prompt_file.name}:{line_no}", line) for line_no, line in enumerate(lines, 1) if line.strip()]
+                with timer("prompt_batch"):
+                    prompts_text, prompt_stats = render_docs(docs, renderer)
+                st.session_state.prompt_batch_result = (prompts_text, prompt_stats)
+
+    if "prompt_batch_result" in st.session_state:
+        prompts_text, prompt_stats = st.session_state.prompt_batch_result
+        st.caption(f"{prompt_stats['documents']} 个文档，生成 {prompt_stats['prompts']} 条提示词，"
+                   f"缺少必需字段跳过 {prompt_stats['skipped']} 个实体，解析失败 {prompt_stats['failed']} 个。")
+        if prompts_text:
+            st.download_button("⬇️ 下载提示词 (JSONL)", prompts_text, file_name="prompts.jsonl", mime="application/jsonl")
@@ -0,0 +1,30 @@
+# views/home.py
+# 首页
+import streamlit as st
+
+SCHEMA_TYPE_OVERVIEW = [
+    ["Product", "产品结构化", "name, image, sku, brand, offers"],
+    ["Article", "文章结构化", "headline, author, datePublished"],
+    ["Organization", "组织机构", "name, url, logo, contactPoint"],
+    ["Event", "事件", "name, startDate, endDate, location"],
+    ["FAQPage", "常见问答", "mainEntity.question, acceptedAnswer.text"],
+    ["Review", "评价", "author, reviewBody, reviewRating"]
+]
+
+
+def render():
+    import pandas as pd # 只有首页表格和管理后台用到 pandas，打开页面时再导入
+
+    st.title("📊 结构化数据助手")
+
+    st.markdown("""
+    <div style="text-align: center;">
+        <a href="https://search.google.com/test/rich-results" target="_blank">🔍 Google 富媒体测试工具</a> |
+        <a href="https://validator.schema.org/" target="_blank">🧪 Schema.org 验证器</a> |
+        <a href="https://chatgpt.com/" target="_blank">🤖 跳转 ChatGPT</a>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.subheader("📘 常见结构化数据类型一览表")
+    schema_data = pd.DataFrame(SCHEMA_TYPE_OVERVIEW, columns=["Schema 类型", "描述", "字段示例"])
+    st.dataframe(schema_data, use_container_width=True)
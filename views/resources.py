@@ -0,0 +1,36 @@
+# views/resources.py
+# 外部资源
+import streamlit as st
+
+
+def render():
+    st.title("🌐 外部资源")
+    st.write("这里汇集了与结构化数据和 SEO 相关的外部工具和参考资料。")
+
+    st.subheader("官方验证工具")
+    st.markdown("""
+    * **Google 富媒体搜索结果测试工具:** 用于测试您的网页上的结构化数据是否符合 Google 的要求，并查看可能触发的富媒体结果。
+        [🔗 前往](https://search.google.com/test/rich-results)
+    * **Schema.org 验证器:** 官方 Schema.org 验证工具，用于检查您的结构化数据是否遵循 Schema.org 词汇表。
+        [🔗 前往](https://validator.schema.org/)
+    * **Google Search Console (搜索增强报告):** 监控您的网站在 Google 搜索中的表现，包括结构化数据的错误和改进建议。
+        [🔗 前往](https://search.google.com/search-console/about)
+    """)
+
+    st.subheader("参考文档和指南")
+    st.markdown("""
+    * **Schema.org 官方网站:** 结构化数据词汇表的官方来源，包含所有 Schema 类型的详细定义和用法示例。
+        [🔗 前往](https://schema.org/)
+    * **Google 结构化数据指南:** Google 提供的关于如何使用结构化数据以提升搜索结果的详细文档。
+        [🔗 前往](https://developers.google.com/search/docs/appearance/structured-data/intro-structured-data)
+    * **百度结构化数据指南:** 百度搜索引擎的结构化数据相关指南。
+        [🔗 前往](https://ziyuan.baidu.com/rules/37) (可能需要搜索最新链接)
+    """)
+
+    st.subheader("实用工具和社区")
+    st.markdown("""
+    * **ChatGPT / AI 大模型:** 可用于辅助生成或理解结构化数据概念、撰写相关内容。
+        [🔗 前往](https://chatgpt.com/) (或其他您常用的AI平台)
+    * **JSON 在线格式化工具:** 辅助美化和验证 JSON 格式。
+        [🔗 前往](https://jsonformatter.org/json-pretty-print) (或其他常用工具，如 json.cn)
+    """)